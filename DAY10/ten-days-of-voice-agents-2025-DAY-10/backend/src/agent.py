@@ -39,8 +39,9 @@ from livekit.agents import (
     RunContext,
 )
 
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.plugins import murf, google, deepgram
+
+from model_registry import ModelRegistry
 
 # -------------------------
 # Logging
@@ -301,9 +302,9 @@ class GameMasterAgent(Agent):
 # -------------------------
 def prewarm(proc: JobProcess):
     try:
-        proc.userdata["vad"] = silero.VAD.load()
+        ModelRegistry.for_process(proc).prewarm()
     except Exception:
-        logger.warning("VAD prewarm failed; continuing without preloaded VAD.")
+        logger.warning("Model prewarm failed; continuing without preloaded VAD.")
 
 
 async def entrypoint(ctx: JobContext):
@@ -313,6 +314,8 @@ async def entrypoint(ctx: JobContext):
 
     userdata = Userdata()
 
+    models = ModelRegistry.for_process(ctx.proc)
+
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
         llm=google.LLM(model="gemini-2.5-flash"),
@@ -321,8 +324,8 @@ async def entrypoint(ctx: JobContext):
             style="Conversational",
             text_pacing=True,
         ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata.get("vad"),
+        turn_detection=models.turn_detector(),
+        vad=models.get("vad"),
         userdata=userdata,
     )
 
@@ -330,7 +333,7 @@ async def entrypoint(ctx: JobContext):
     await session.start(
         agent=GameMasterAgent(),
         room=ctx.room,
-        room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()),
+        room_input_options=RoomInputOptions(noise_cancellation=models.noise_cancellation()),
     )
 
     await ctx.connect()
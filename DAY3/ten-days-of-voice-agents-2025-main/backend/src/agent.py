@@ -1,6 +1,5 @@
 import logging
 import json
-import os
 import asyncio
 from datetime import datetime
 from typing import Annotated, List
@@ -27,8 +26,10 @@ from livekit.agents import (
     function_tool,
 )
 
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.plugins import murf, google, deepgram
+
+from model_registry import ModelRegistry
+from wellness_store import get_wellness_store
 
 logger = logging.getLogger("wellness-agent")
 load_dotenv(".env.local")
@@ -36,24 +37,31 @@ load_dotenv(".env.local")
 # ======================================================
 # WELLNESS LOG PERSISTENCE
 # ======================================================
-WELLNESS_LOG_FILE = "wellness_log.json"
-
-def load_wellness_history() -> List[dict]:
-    if not os.path.exists(WELLNESS_LOG_FILE):
-        return []
+def build_memory_line(user_id: str) -> str:
     try:
-        with open(WELLNESS_LOG_FILE, "r", encoding="utf-8") as f:
-            return json.load(f)
+        store = get_wellness_store()
+        # history from the old single-user log belongs to whoever connects first
+        store.claim_legacy(user_id)
+        last = store.last_entry(user_id)
+        if not last:
+            return ""
+        week = store.trend(user_id, days=7)
     except Exception as e:
         print(f"Could not load history: {e}")
-        return []
-
-def save_wellness_entry(entry: dict):
-    history = load_wellness_history()
-    history.append(entry)
-    with open(WELLNESS_LOG_FILE, "w", encoding="utf-8") as f:
-        json.dump(history, f, indent=2, ensure_ascii=False)
-    print(f"\nWELLNESS ENTRY SAVED → {entry['date']}")
+        return ""
+
+    last_date = datetime.strptime(last["date"], "%Y-%m-%d").strftime("%A")
+    memory_line = f"Last time on {last_date}, you were feeling {last['mood'].lower()}."
+    if week.checkins > 1:
+        memory_line += (
+            f" You've checked in {week.checkins} times this past week, "
+            f"mostly feeling {week.top_mood()} with {week.top_energy()} energy."
+        )
+    return memory_line + " How does today compare?"
+
+def save_wellness_entry(entry: dict, user_id: str):
+    get_wellness_store().append(entry, user_id=user_id)
+    print(f"\nWELLNESS ENTRY SAVED → {entry['date']} ({user_id or 'anonymous'})")
     print(json.dumps(entry, indent=2))
 
 # ======================================================
@@ -73,6 +81,7 @@ class Userdata:
     wellness: WellnessState = field(default_factory=WellnessState)
     session_start: datetime = field(default_factory=datetime.now)
     memory_line: str = ""  # reference to last session
+    user_id: str = ""  # participant identity the history is keyed by
 
 # ======================================================
 # FUNCTION TOOLS
@@ -124,7 +133,7 @@ async def complete_checkin(ctx: RunContext[Userdata]) -> str:
         "goals": w.goals,
         "summary": f"Feeling {w.mood.lower()} with {w.energy_level.lower()} energy."
     }
-    save_wellness_entry(entry)
+    save_wellness_entry(entry, ctx.userdata.user_id)
 
     recap = (
         f"Here's your check-in for today:\n"
@@ -166,8 +175,8 @@ Be encouraging, gentle, and human. Use light emojis. Today is {datetime.now().st
 # PREWARM
 # ======================================================
 def prewarm(proc: JobProcess):
-    print("Prewarming Silero VAD...")
-    proc.userdata["vad"] = silero.VAD.load()
+    print("Prewarming models...")
+    ModelRegistry.for_process(proc).prewarm()
 
 # ======================================================
 # ENTRYPOINT
@@ -175,15 +184,15 @@ def prewarm(proc: JobProcess):
 async def entrypoint(ctx: JobContext):
     print("\nSTARTING DAY 3 WELLNESS COMPANION")
 
-    # Load past check-in for memory
-    history = load_wellness_history()
-    memory_line = ""
-    if history:
-        last = history[-1]
-        last_date = datetime.strptime(last["date"], "%Y-%m-%d").strftime("%A")
-        memory_line = f"Last time on {last_date}, you were feeling {last['mood'].lower()}. How does today compare?"
+    await ctx.connect(auto_subscribe=True)
+    participant = await ctx.wait_for_participant()
 
-    userdata = Userdata(memory_line=memory_line)
+    # Load this participant's past check-ins for memory
+    memory_line = build_memory_line(participant.identity)
+
+    userdata = Userdata(memory_line=memory_line, user_id=participant.identity)
+
+    models = ModelRegistry.for_process(ctx.proc)
 
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
@@ -193,19 +202,17 @@ async def entrypoint(ctx: JobContext):
             style="Conversational",
             speed=1.0,
         ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
+        turn_detection=models.turn_detector(),
+        vad=models.vad(),
         userdata=userdata,
     )
 
     await session.start(
         agent=WellnessCompanion(memory_line=memory_line),
         room=ctx.room,
-        room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()),
+        room_input_options=RoomInputOptions(noise_cancellation=models.noise_cancellation()),
     )
 
-    await ctx.connect(auto_subscribe=True)
-
     greeting = "Hey there, it's your daily wellness check-in. How are you feeling today?"
     if memory_line:
         greeting = f"Hey again! {memory_line} How are you feeling today?"
@@ -0,0 +1,102 @@
+"""
+Process-level model registry.
+
+Every model an AgentSession needs is built once per worker process and the
+same instance is handed to every job that process runs. Each load is timed
+and, when psutil is installed, the change in resident memory is logged, so
+cold-start cost per model is visible in the worker logs.
+
+VAD and noise cancellation are loaded in ``prewarm``. The turn detector needs
+the job's inference executor, which only exists inside a job, so it is built
+on the first ``entrypoint`` call and reused by every later job in the process.
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+
+from livekit.agents import JobProcess
+from livekit.plugins import noise_cancellation, silero
+from livekit.plugins.turn_detector.multilingual import MultilingualModel
+
+try:
+    import psutil
+except ImportError:  # memory reporting is optional
+    psutil = None
+
+logger = logging.getLogger("agent.models")
+
+USERDATA_KEY = "models"
+
+
+@dataclass(frozen=True)
+class ModelLoadStats:
+    load_seconds: float
+    rss_delta_bytes: Optional[int]  # None without psutil
+
+
+class ModelRegistry:
+    """Lazily-built, memoized models shared by all sessions of one process."""
+
+    def __init__(self) -> None:
+        self._models: Dict[str, Any] = {}
+        self._stats: Dict[str, ModelLoadStats] = {}
+        self._process = psutil.Process() if psutil is not None else None
+
+    @classmethod
+    def for_process(cls, proc: JobProcess) -> "ModelRegistry":
+        registry = proc.userdata.get(USERDATA_KEY)
+        if registry is None:
+            registry = cls()
+            proc.userdata[USERDATA_KEY] = registry
+        return registry
+
+    def _rss(self) -> Optional[int]:
+        return self._process.memory_info().rss if self._process is not None else None
+
+    def _load(self, name: str, factory: Callable[[], Any]) -> Any:
+        if name in self._models:
+            return self._models[name]
+
+        rss_before = self._rss()
+        started = time.perf_counter()
+        model = factory()
+        elapsed = time.perf_counter() - started
+        rss_after = self._rss()
+        rss_delta = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+
+        self._models[name] = model
+        self._stats[name] = ModelLoadStats(elapsed, rss_delta)
+        if rss_delta is None:
+            logger.info("loaded model %s in %.1f ms", name, elapsed * 1000)
+        else:
+            logger.info(
+                "loaded model %s in %.1f ms (rss %+.1f MiB)",
+                name,
+                elapsed * 1000,
+                rss_delta / (1024 * 1024),
+            )
+        return model
+
+    def get(self, name: str) -> Optional[Any]:
+        """Return an already-loaded model, or None if it was never loaded."""
+        return self._models.get(name)
+
+    def vad(self) -> silero.VAD:
+        return self._load("vad", silero.VAD.load)
+
+    def noise_cancellation(self) -> Any:
+        return self._load("noise_cancellation", noise_cancellation.BVC)
+
+    def turn_detector(self) -> MultilingualModel:
+        # The model weights live in the shared inference process; this only
+        # resolves the executor and language config once per worker process.
+        return self._load("turn_detector", MultilingualModel)
+
+    def prewarm(self) -> None:
+        self.vad()
+        self.noise_cancellation()
+
+    def stats(self) -> Dict[str, ModelLoadStats]:
+        return dict(self._stats)
@@ -0,0 +1,215 @@
+"""
+Append-only wellness check-in log.
+
+Check-ins are inserted into a SQLite table running in WAL mode and are never
+rewritten, so saving one costs a single indexed insert no matter how long the
+history is, and concurrent sessions (even in different worker processes)
+cannot lose each other's writes. A torn write from a crash is rolled back by
+SQLite instead of corrupting the log.
+
+History is keyed by participant identity. The ``(user_id, timestamp)`` index
+keeps "last N check-ins" and "trend over the past N days" queries to a range
+scan over that user's rows only, so they stay fast however many users and
+entries the log holds.
+
+The legacy ``wellness_log.json`` array is imported once, the first time the
+store is opened on an empty database. That log was single-user, so its
+check-ins are stored without an owner and handed to the first participant
+identity that connects (``claim_legacy``); ``PRAGMA user_version`` records
+that the claim happened.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+WELLNESS_DB_FILE = "wellness_log.sqlite"
+LEGACY_LOG_FILE = "wellness_log.json"
+
+DEFAULT_USER = ""
+LEGACY_CLAIMED = 1  # PRAGMA user_version once unowned history has been claimed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS wellness_entries (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id TEXT NOT NULL DEFAULT '',
+    date TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    mood TEXT,
+    energy TEXT,
+    goals TEXT, -- JSON encoded list
+    summary TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_wellness_user_ts ON wellness_entries(user_id, timestamp);
+CREATE INDEX IF NOT EXISTS idx_wellness_date ON wellness_entries(date);
+"""
+
+_COLUMNS = "date, timestamp, mood, energy, goals, summary"
+
+
+@dataclass
+class WellnessTrend:
+    days: int
+    checkins: int = 0
+    mood_counts: Dict[str, int] = field(default_factory=dict)
+    energy_counts: Dict[str, int] = field(default_factory=dict)
+
+    def top_mood(self) -> Optional[str]:
+        return Counter(self.mood_counts).most_common(1)[0][0] if self.mood_counts else None
+
+    def top_energy(self) -> Optional[str]:
+        return Counter(self.energy_counts).most_common(1)[0][0] if self.energy_counts else None
+
+
+def _row_to_entry(row: sqlite3.Row) -> dict:
+    return {
+        "date": row["date"],
+        "timestamp": row["timestamp"],
+        "mood": row["mood"],
+        "energy": row["energy"],
+        "goals": json.loads(row["goals"]) if row["goals"] else [],
+        "summary": row["summary"],
+    }
+
+
+class WellnessStore:
+    def __init__(self, db_path: str = WELLNESS_DB_FILE, legacy_path: str = LEGACY_LOG_FILE):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, timeout=10.0)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=FULL")
+        self._conn.executescript(_SCHEMA)
+        self._legacy_claimed = False
+        self._import_legacy(legacy_path)
+
+    def _import_legacy(self, legacy_path: str):
+        if not os.path.exists(legacy_path):
+            return
+        with self._lock, self._conn:
+            if self._conn.execute("SELECT 1 FROM wellness_entries LIMIT 1").fetchone():
+                return
+            try:
+                with open(legacy_path, "r", encoding="utf-8") as f:
+                    history = json.load(f)
+            except Exception as e:
+                print(f"Could not import legacy history: {e}")
+                return
+            self._conn.executemany(
+                f"INSERT INTO wellness_entries (user_id, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                [self._params(entry, DEFAULT_USER) for entry in history],
+            )
+        print(f"Imported {len(history)} check-ins from {legacy_path}")
+
+    def claim_legacy(self, user_id: str) -> int:
+        """Give unowned (legacy, pre-identity) check-ins to ``user_id``.
+
+        Only the first identified participant ever claims them. Returns the rows moved.
+        """
+        if self._legacy_claimed or user_id == DEFAULT_USER:
+            return 0
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                moved = 0
+                if self._conn.execute("PRAGMA user_version").fetchone()[0] < LEGACY_CLAIMED:
+                    moved = self._conn.execute(
+                        "UPDATE wellness_entries SET user_id = ? WHERE user_id = ?",
+                        (user_id, DEFAULT_USER),
+                    ).rowcount
+                    self._conn.execute(f"PRAGMA user_version = {LEGACY_CLAIMED}")
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+            self._legacy_claimed = True
+        if moved:
+            print(f"Assigned {moved} earlier check-ins to {user_id}")
+        return moved
+
+    @staticmethod
+    def _params(entry: dict, user_id: str) -> tuple:
+        return (
+            user_id,
+            entry["date"],
+            entry.get("timestamp", entry["date"]),
+            entry.get("mood"),
+            entry.get("energy"),
+            json.dumps(entry.get("goals", []), ensure_ascii=False),
+            entry.get("summary"),
+        )
+
+    def append(self, entry: dict, user_id: str = DEFAULT_USER) -> int:
+        with self._lock, self._conn:
+            cur = self._conn.execute(
+                f"INSERT INTO wellness_entries (user_id, {_COLUMNS}) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                self._params(entry, user_id),
+            )
+        return cur.lastrowid
+
+    def last_entry(self, user_id: str = DEFAULT_USER) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM wellness_entries WHERE user_id = ? "
+                "ORDER BY timestamp DESC LIMIT 1",
+                (user_id,),
+            ).fetchone()
+        return _row_to_entry(row) if row else None
+
+    def last_entries(self, user_id: str, n: int) -> List[dict]:
+        """Most recent ``n`` check-ins for ``user_id``, newest first."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM wellness_entries WHERE user_id = ? "
+                "ORDER BY timestamp DESC LIMIT ?",
+                (user_id, n),
+            ).fetchall()
+        return [_row_to_entry(r) for r in rows]
+
+    def trend(self, user_id: str, days: int, now: Optional[datetime] = None) -> WellnessTrend:
+        """Mood and energy counts for ``user_id`` over the past ``days`` days."""
+        since = ((now or datetime.now()) - timedelta(days=days)).isoformat()
+        trend = WellnessTrend(days=days)
+        with self._lock:
+            for column, counts in (("mood", trend.mood_counts), ("energy", trend.energy_counts)):
+                rows = self._conn.execute(
+                    f"SELECT LOWER(TRIM({column})) AS value, COUNT(*) AS n FROM wellness_entries "
+                    f"WHERE user_id = ? AND timestamp >= ? AND {column} IS NOT NULL "
+                    "GROUP BY value",
+                    (user_id, since),
+                ).fetchall()
+                counts.update({r["value"]: r["n"] for r in rows})
+            trend.checkins = self._conn.execute(
+                "SELECT COUNT(*) FROM wellness_entries WHERE user_id = ? AND timestamp >= ?",
+                (user_id, since),
+            ).fetchone()[0]
+        return trend
+
+    def entries_on(self, date: str) -> List[dict]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {_COLUMNS} FROM wellness_entries WHERE date = ? ORDER BY id",
+                (date,),
+            ).fetchall()
+        return [_row_to_entry(r) for r in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_store: Optional[WellnessStore] = None
+
+
+def get_wellness_store() -> WellnessStore:
+    """Return the per-process store, opening it on first use."""
+    global _store
+    if _store is None:
+        _store = WellnessStore()
+    return _store
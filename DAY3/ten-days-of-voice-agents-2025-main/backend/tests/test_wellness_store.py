@@ -0,0 +1,68 @@
+import json
+from datetime import datetime, timedelta
+
+import pytest
+
+from wellness_store import WellnessStore
+
+
+def _entry(day: datetime, mood: str, energy: str = "medium") -> dict:
+    return {
+        "date": day.strftime("%Y-%m-%d"),
+        "timestamp": day.isoformat(),
+        "mood": mood,
+        "energy": energy,
+        "goals": ["walk"],
+        "summary": f"Feeling {mood}.",
+    }
+
+
+@pytest.fixture
+def paths(tmp_path):
+    now = datetime.now()
+    legacy = tmp_path / "wellness_log.json"
+    legacy.write_text(
+        json.dumps([_entry(now - timedelta(days=3), "Tired", "low"), _entry(now - timedelta(days=1), "Calm")]),
+        encoding="utf-8",
+    )
+    return str(tmp_path / "wellness.sqlite"), str(legacy)
+
+
+def test_legacy_history_is_claimed_by_first_identity(paths) -> None:
+    db_path, legacy = paths
+    store = WellnessStore(db_path, legacy)
+
+    assert store.claim_legacy("alice") == 2
+    assert store.last_entry("alice")["mood"] == "Calm"
+    assert store.trend("alice", days=7).checkins == 2
+
+    # nobody else inherits it, and a reopened store neither re-imports nor re-claims
+    assert store.claim_legacy("bob") == 0
+    assert store.last_entry("bob") is None
+    store.close()
+
+    reopened = WellnessStore(db_path, legacy)
+    assert reopened.claim_legacy("carol") == 0
+    assert [e["mood"] for e in reopened.last_entries("alice", 5)] == ["Calm", "Tired"]
+    reopened.close()
+
+
+def test_history_is_kept_per_identity(paths) -> None:
+    db_path, legacy = paths
+    store = WellnessStore(db_path, legacy)
+    store.claim_legacy("alice")
+    store.append(_entry(datetime.now(), "Happy", "high"), user_id="bob")
+
+    assert store.last_entry("bob")["mood"] == "Happy"
+    assert store.last_entry("alice")["mood"] == "Calm"
+    assert store.trend("bob", days=7).top_energy() == "high"
+    store.close()
+
+
+def test_anonymous_participant_does_not_claim(paths) -> None:
+    db_path, legacy = paths
+    store = WellnessStore(db_path, legacy)
+
+    assert store.claim_legacy("") == 0
+    assert store.claim_legacy("alice") == 2
+    store.close()
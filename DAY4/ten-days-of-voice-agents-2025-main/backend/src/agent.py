@@ -26,8 +26,9 @@ from livekit.agents import (
     RunContext,
 )
 
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.plugins import murf, google, deepgram
+
+from model_registry import ModelRegistry
 
 # ======================================================
 # CSE KNOWLEDGE BASE (Computer Science)
@@ -174,20 +175,22 @@ User: "teach me back" → Ken listens
 # PREWARM & ENTRYPOINT
 # ======================================================
 def prewarm(proc: JobProcess):
-    print("Prewarming VAD...")
-    proc.userdata["vad"] = silero.VAD.load()
+    print("Prewarming models...")
+    ModelRegistry.for_process(proc).prewarm()
 
 async def entrypoint(ctx: JobContext):
     print("DAY 4 – CSE ACTIVE RECALL COACH STARTED SUCCESSFULLY")
 
     userdata = Userdata()
 
+    models = ModelRegistry.for_process(ctx.proc)
+
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
         llm=google.LLM(model="gemini-2.5-flash"),
         tts=murf.TTS(voice="en-US-matthew", style="Conversational"),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
+        turn_detection=models.turn_detector(),
+        vad=models.vad(),
         userdata=userdata,
     )
 
@@ -196,7 +199,7 @@ async def entrypoint(ctx: JobContext):
     await session.start(
         agent=CSETutor(),
         room=ctx.room,
-        room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()),
+        room_input_options=RoomInputOptions(noise_cancellation=models.noise_cancellation()),
     )
 
     await ctx.connect(auto_subscribe=True)
@@ -3,15 +3,21 @@ import json
 import os
 import asyncio
 from datetime import datetime
-from typing import Annotated, Optional
+from typing import Annotated, List, Optional
 from dataclasses import dataclass, field
 
 from dotenv import load_dotenv
 load_dotenv(".env.local")
 
-from livekit.agents import Agent, AgentSession, JobContext, JobProcess, RoomInputOptions, WorkerOptions, cli, function_tool, RunContext
-from livekit.plugins import murf, deepgram, google, silero, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.agents import Agent, AgentSession, ChatContext, ChatMessage, JobContext, JobProcess, MetricsCollectedEvent, RoomInputOptions, StopResponse, WorkerOptions, cli, function_tool, metrics, RunContext
+from livekit.plugins import murf, deepgram, google
+
+from answer_cache import FAQAnswerCache
+from faq_index import FAQIndex
+from lead_store import LeadStore, shareable
+from lead_writer import LeadWriter
+from slot_calendar import Slot, SlotCalendar
+from model_registry import ModelRegistry
 
 # Load Zomato FAQ
 FAQ_FILE = "shared-data/zomato_faq.json"
@@ -28,16 +34,20 @@ if not os.path.exists(FAQ_FILE):
             {"question": "What is Blinkit?", "answer": "Blinkit is Zomato's quick commerce arm — groceries & essentials delivered in 10 minutes. Acquired in 2022 for $568M."}
         ], f, indent=4)
 
-with open(FAQ_FILE, "r", encoding="utf-8") as f:
-    ZOMATO_FAQ = json.load(f)
+# BM25/cosine index over the FAQ; picks up edits to the JSON file without a restart
+faq_index = FAQIndex(FAQ_FILE)
+# repeat FAQ questions are answered straight from the FAQ, skipping the LLM
+faq_answers = FAQAnswerCache(faq_index)
+
+# Demo calendar: SQLite file shared by all worker processes, bookings are atomic
+slot_calendar = SlotCalendar()
+slot_calendar.ensure_availability()
+SLOTS_TO_OFFER = 4
 
-# Mock Calendar
-AVAILABLE_SLOTS = [
-    "Tomorrow at 11:00 AM IST",
-    "Tomorrow at 3:00 PM IST",
-    "Day after at 10:30 AM IST",
-    "Day after at 4:00 PM IST"
-]
+# one deduplicated record per lead; leads and email drafts are written in batches by a background thread
+os.makedirs("leads", exist_ok=True)
+lead_store = LeadStore()
+lead_writer = LeadWriter(store=lead_store)
 
 @dataclass
 class Lead:
@@ -56,10 +66,13 @@ class UserData:
     session: Optional[AgentSession] = None
     collected_fields: set = field(default_factory=set)
     conversation_ended: bool = False
+    offered_slots: List[Slot] = field(default_factory=list)  # what show_available_slots last read out
+    returning_lead: bool = False  # matched an existing lead record
+    lead_verified: bool = False  # ...and the caller's email matches it
+    pending_field: str = ""  # lead field collect_lead_info just asked for
 
-def save_lead(lead: Lead):
-    data = {
-        "timestamp": datetime.now().isoformat(),
+def lead_record(lead: Lead) -> dict:
+    return {
         "name": lead.name,
         "company": lead.company,
         "email": lead.email,
@@ -67,14 +80,47 @@ def save_lead(lead: Lead):
         "use_case": lead.use_case,
         "team_size": lead.team_size,
         "timeline": lead.timeline,
+        "booked_demo": lead.booked_slot,
+    }
+
+async def recognise_lead(userdata: UserData) -> List[str]:
+    """If we've talked to this person before, fill in what they already told us.
+
+    A company + name match fills everything but contact details; those wait
+    until the caller gives a matching email. Returns the fields that came from
+    the stored record.
+    """
+    lead = userdata.lead
+    if userdata.returning_lead and not lead.email:
+        return []  # already matched; only an email can add more
+    if userdata.lead_verified or not (lead.email or (lead.company and lead.name)):
+        return []
+    found = await lead_store.afind(email=lead.email, company=lead.company, name=lead.name)
+    if not found:
+        return []
+    known = shareable(found, email=lead.email)
+    userdata.returning_lead = True
+    userdata.lead_verified = "email" in known
+    filled = []
+    for name, value in lead_record(lead).items():
+        if not value and known.get(name):
+            setattr(lead, "booked_slot" if name == "booked_demo" else name, known[name])
+            if name != "booked_demo":
+                filled.append(name)
+    userdata.collected_fields.update(f for f, v in lead_record(lead).items() if v and f != "booked_demo")
+    return filled
+
+def save_lead(lead: Lead):
+    data = {
+        "timestamp": datetime.now().isoformat(),
+        **lead_record(lead),
         "booked_demo": lead.booked_slot or "Not booked"
     }
-    os.makedirs("leads", exist_ok=True)
-    with open("leads/zomato_leads.jsonl", "a", encoding="utf-8") as f:
-        f.write(json.dumps(data, ensure_ascii=False) + "\n")
 
     # Follow-up Email Draft
     email_draft = {
+        "email": lead.email,
+        "created_at": data["timestamp"],
         "subject": f"Thanks {lead.name.split()[0] if lead.name else ''} — Let's Get Your Restaurant on Zomato!",
         "body": f"Hi {lead.name.split()[0] if lead.name else 'there'},\n\n"
                 f"Thanks for chatting with me today! I heard you're from {lead.company or 'your company'} and looking to {lead.use_case or 'grow your restaurant business'}.\n\n"
@@ -84,45 +130,92 @@ def save_lead(lead: Lead):
                 f"Looking forward to helping you get more orders!\n"
                 f"Best,\nAarav\nSDR @ Zomato"
     }
-    os.makedirs("email_drafts", exist_ok=True)
-    with open(f"email_drafts/{lead.email or 'unknown'}_{int(datetime.now().timestamp())}.json", "w") as f:
-        json.dump(email_draft, f, indent=2)
-
-    print("\nLEAD SAVED + EMAIL DRAFT CREATED!\n")
-    print(json.dumps(data, indent=2))
+    lead_writer.submit(data, email_draft)
+    print(f"LEAD QUEUED: {lead.name or 'unknown'} ({lead.company or 'no company'}) -> {data['booked_demo']}")
 
 @function_tool
 async def answer_zomato_question(ctx: RunContext[UserData], question: Annotated[str, "User's question about Zomato"]) -> str:
-    question_lower = question.lower()
-    for item in ZOMATO_FAQ:
-        if any(keyword in question_lower for keyword in item["question"].lower().split()):
-            return item["answer"]
+    hit = faq_index.best(question)
+    if hit:
+        return hit[1]["answer"]
     return "That's a great question! Zomato helps restaurants get more orders through our app. We charge only per order — no upfront fees. Want me to explain how it works for your restaurant?"
 
 @function_tool
-async def collect_lead_info(ctx: RunContext[UserData], field: Annotated[str, "name/company/email/role/use_case/team_size/timeline"]) -> str:
+async def collect_lead_info(
+    ctx: RunContext[UserData],
+    field: Annotated[str, "name/company/email/role/use_case/team_size/timeline"],
+    value: Annotated[Optional[str], "The caller's answer for this field, once they have given it"] = None,
+) -> str:
     userdata = ctx.userdata
     field = field.lower().strip()
+    if value and field in lead_record(userdata.lead) and field != "booked_demo":
+        setattr(userdata.lead, field, value.strip())
+        userdata.collected_fields.add(field)
+        userdata.pending_field = ""
+        filled = await recognise_lead(userdata) if field in ("email", "company", "name") else []
+        lead_writer.submit_update(lead_record(userdata.lead))
+        if filled:
+            known = ", ".join(f.replace("_", " ") for f in filled)
+            return f"Saved {field.replace('_', ' ')}. Returning lead! Already on file: {known}. Don't ask for these again."
+        return f"Saved {field.replace('_', ' ')}."
     if field in userdata.collected_fields:
         return f"Got it, you already told me your {field.replace('_', ' ')}."
     
     await ctx.userdata.session.say(f"Sure! What's your {field.replace('_', ' ')}?")
     userdata.collected_fields.add(field)
+    userdata.pending_field = field
     return f"Asking for {field}..."
 
+async def offer_slots(userdata: UserData) -> List[Slot]:
+    slots = await slot_calendar.afree_slots(SLOTS_TO_OFFER)
+    if len(slots) < SLOTS_TO_OFFER:
+        # calendar running dry: open the next days and look again
+        await asyncio.to_thread(slot_calendar.ensure_availability)
+        slots = await slot_calendar.afree_slots(SLOTS_TO_OFFER)
+    userdata.offered_slots = slots
+    return slots
+
+def slot_menu(slots: List[Slot]) -> str:
+    if not slots:
+        return "Our calendar is full right now — I'll have the team email you a time."
+    lines = "\n".join([f"{i+1}. {slot.label()} with {slot.rep}" for i, slot in enumerate(slots)])
+    return f"Here are the available demo slots:\n{lines}\nJust say the number!"
+
 @function_tool
-async def book_demo_slot(ctx: RunContext[UserData], slot_index: Annotated[int, "0-3"]) -> str:
-    if 0 <= slot_index < len(AVAILABLE_SLOTS):
-        slot = AVAILABLE_SLOTS[slot_index]
-        ctx.userdata.lead.booked_slot = slot
-        save_lead(ctx.userdata.lead)  # Save when booking
-        return f"Perfect! I've booked you for {slot}. I'll send a calendar invite to {ctx.userdata.lead.email or 'your email'} shortly!"
-    return "Sorry, that slot isn't available. Say 'show slots' to see options."
+async def book_demo_slot(ctx: RunContext[UserData], slot_index: Annotated[int, "0-based position in the slots last offered (first slot = 0)"]) -> str:
+    userdata = ctx.userdata
+    offered = userdata.offered_slots or await offer_slots(userdata)
+    if not 0 <= slot_index < len(offered):
+        return "Sorry, that slot isn't available. Say 'show slots' to see options."
+    slot = offered[slot_index]
+    if not await slot_calendar.areserve(slot, userdata.lead.email or userdata.lead.name or "unknown"):
+        # someone in another session booked it first
+        fresh = await offer_slots(userdata)
+        return f"Oh no, {slot.label()} was just taken. {slot_menu(fresh)}"
+    userdata.offered_slots = []
+    userdata.lead.booked_slot = f"{slot.label()} with {slot.rep}"
+    save_lead(userdata.lead)  # Save when booking
+    return f"Perfect! I've booked you for {userdata.lead.booked_slot}. I'll send a calendar invite to {userdata.lead.email or 'your email'} shortly!"
 
 @function_tool
 async def show_available_slots(ctx: RunContext[UserData]) -> str:
-    slots = "\n".join([f"{i+1}. {slot}" for i, slot in enumerate(AVAILABLE_SLOTS)])
-    return f"Here are the available demo slots:\n{slots}\nJust say the number!"
+    return slot_menu(await offer_slots(ctx.userdata))
+
+# words that mark the agent's last question as asking for a lead field
+LEAD_PROMPT_WORDS = ("name", "company", "email", "role", "use case", "team", "timeline", "slot")
+
+
+def lead_question_pending(userdata: UserData, turn_ctx: ChatContext) -> bool:
+    """True if the agent is waiting on an answer to a lead-capture question."""
+    if userdata.pending_field:
+        return True
+    for item in reversed(turn_ctx.items):
+        if getattr(item, "type", None) != "message" or item.role != "assistant":
+            continue
+        last = (item.text_content or "").strip().lower()
+        return last.endswith("?") and any(word in last for word in LEAD_PROMPT_WORDS)
+    return False
+
 
 class ZomatoSDR(Agent):
     def __init__(self):
@@ -134,6 +227,7 @@ Your job:
 - Greet warmly and build rapport
 - Answer questions about Zomato using only the provided FAQ
 - Naturally collect: name, company, email, role, use case, team size, timeline
+  (save each answer with collect_lead_info, passing the value; never re-ask fields already on file)
 - Offer to book a demo when interest is shown
 - At the end, summarize and thank them
 
@@ -142,27 +236,69 @@ Be conversational, never robotic. Use Indian English tone.
             tools=[answer_zomato_question, collect_lead_info, book_demo_slot, show_available_slots]
         )
 
+    async def on_user_turn_completed(self, turn_ctx: ChatContext, new_message: ChatMessage) -> None:
+        # A reply to a lead question ("Zomato", "Gold") is for the LLM to save, not an FAQ
+        if lead_question_pending(self.session.userdata, turn_ctx):
+            return
+        # Confident FAQ match: speak the answer now instead of waiting on Gemini
+        answer = faq_answers.answer_for(new_message.text_content or "")
+        if answer:
+            self.session.say(answer)
+            raise StopResponse()
+
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    ModelRegistry.for_process(proc).prewarm()
 
 async def entrypoint(ctx: JobContext):
     userdata = UserData()
-    os.makedirs("leads", exist_ok=True)
+    # outbound calls can pass who we're calling in the job metadata
+    try:
+        hint = json.loads(ctx.job.metadata or "{}")
+    except ValueError:
+        hint = {}
+    if isinstance(hint, dict):
+        for key in ("name", "company", "email"):
+            if hint.get(key):
+                setattr(userdata.lead, key, str(hint[key]))
+                userdata.collected_fields.add(key)
+        await recognise_lead(userdata)
+
+    models = ModelRegistry.for_process(ctx.proc)
 
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
         llm=google.LLM(model="gemini-2.5-flash"),
         tts=murf.TTS(voice="en-IN-aarav", style="Friendly", speed=1.05),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
+        turn_detection=models.turn_detector(),
+        vad=models.vad(),
         userdata=userdata,
     )
     userdata.session = session
 
-    await session.start(agent=ZomatoSDR(), room=ctx.room, room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()))
+    @session.on("metrics_collected")
+    def _on_metrics(ev: MetricsCollectedEvent):
+        if isinstance(ev.metrics, metrics.LLMMetrics) and ev.metrics.ttft > 0:
+            faq_answers.record_llm_ttft(ev.metrics.ttft)
+
+    async def log_faq_stats():
+        print(f"FAQ direct answers: {faq_answers.stats()}")
+
+    ctx.add_shutdown_callback(log_faq_stats)
+    # write out any leads still queued before the worker goes away
+    ctx.add_shutdown_callback(lead_writer.aflush)
+
+    await session.start(agent=ZomatoSDR(), room=ctx.room, room_input_options=RoomInputOptions(noise_cancellation=models.noise_cancellation()))
     await ctx.connect(auto_subscribe=True)
 
     await asyncio.sleep(1)
+    if userdata.returning_lead:
+        first_name = userdata.lead.name.split()[0] if userdata.lead.name else "there"
+        await session.say(
+            f"Namaste {first_name}! Aarav from Zomato Partner Team again — great to reconnect! "
+            "Shall we pick up where we left off?",
+            allow_interruptions=True
+        )
+        return
     await session.say(
         "Namaste! This is Aarav from Zomato Partner Team! Thanks for stopping by!\n\n"
         "Are you a restaurant owner or do you help manage one? I'd love to show you how thousands of restaurants are getting more orders with Zomato!",
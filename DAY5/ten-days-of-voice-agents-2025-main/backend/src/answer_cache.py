@@ -0,0 +1,110 @@
+"""
+Direct answers for repeat FAQ questions.
+
+Most callers ask the same handful of questions. When a finished user turn is
+a confident FAQ match, the agent speaks the FAQ answer itself and skips the
+LLM round trip for that turn.
+
+Transcripts are normalised (lowercase, punctuation, stopwords and plural
+endings dropped) so "What's Zomato Gold?" and "what is zomato gold" share one
+cache entry. Entries live in an LRU with a TTL and are also dropped when the
+FAQ file is reloaded. Misses (no confident answer) are cached too, so ordinary
+conversation doesn't re-query the index on every turn.
+
+Only turns that read as questions are eligible: a question mark or opening
+question word, or at least MIN_CONTENT_TERMS content words. A bare "Zomato"
+or "Gold" is usually an answer to something the agent asked, not an FAQ.
+"""
+
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+from faq_index import FAQIndex, tokenize
+
+DIRECT_ANSWER_SCORE = 0.5  # well above FAQIndex.min_score: only clear FAQ questions skip the LLM
+MAX_QUESTION_WORDS = 12  # longer turns usually carry more than one ask; leave them to the LLM
+DEFAULT_LLM_TTFT = 0.6  # seconds, until real LLM metrics have been observed
+MIN_CONTENT_TERMS = 2  # without a question form, a turn needs this many content words
+
+QUESTION_WORDS = frozenset(
+    """what whats what's how who whom whose why when where which is are do does did
+    can could will would should tell explain""".split()
+)
+_WORD_RE = re.compile(r"[a-z']+")
+
+
+def normalize_question(text: str) -> str:
+    return " ".join(dict.fromkeys(tokenize(text)))
+
+
+def is_question(text: str) -> bool:
+    """Question mark, opening question word, or enough content words to be a query."""
+    text = (text or "").strip().lower()
+    if "?" in text:
+        return True
+    words = _WORD_RE.findall(text)
+    if words and words[0] in QUESTION_WORDS:
+        return True
+    return len(set(tokenize(text))) >= MIN_CONTENT_TERMS
+
+
+class FAQAnswerCache:
+    def __init__(self, index: FAQIndex, maxsize: int = 512, ttl: float = 900.0):
+        self.index = index
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[float, int, Optional[str]]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.direct_answers = 0
+        self.latency_saved = 0.0
+        self._llm_ttft = DEFAULT_LLM_TTFT
+
+    def record_llm_ttft(self, seconds: float):
+        """Feed observed LLM time-to-first-token; used to estimate latency saved."""
+        self._llm_ttft = 0.8 * self._llm_ttft + 0.2 * seconds
+
+    def _lookup_index(self, text: str) -> Optional[str]:
+        if len(text.split()) > MAX_QUESTION_WORDS:
+            return None
+        hit = self.index.best(text)
+        if hit is None or hit[0] < DIRECT_ANSWER_SCORE:
+            return None
+        return hit[1]["answer"]
+
+    def answer_for(self, text: str) -> Optional[str]:
+        """FAQ answer to speak directly for this user turn, or None to let the LLM respond."""
+        key = normalize_question(text)
+        if not key or not is_question(text):
+            return None
+        self.index.check_for_changes()
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now and entry[1] == self.index.version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            answer = entry[2]
+        else:
+            self.misses += 1
+            answer = self._lookup_index(text)
+            self._entries[key] = (now + self.ttl, self.index.version, answer)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        if answer is not None:
+            self.direct_answers += 1
+            self.latency_saved += self._llm_ttft
+        return answer
+
+    def stats(self) -> Dict[str, float]:
+        lookups = self.hits + self.misses
+        return {
+            "lookups": lookups,
+            "cache_hits": self.hits,
+            "cache_hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "direct_answers": self.direct_answers,
+            "llm_latency_saved_s": round(self.latency_saved, 2),
+            "entries": len(self._entries),
+        }
@@ -0,0 +1,184 @@
+"""
+FAQ retrieval for the Zomato SDR.
+
+The FAQ file is compiled once into BM25-weighted, L2-normalised term vectors,
+one set for the FAQ questions and one for the answers. They are stored
+column-wise as NumPy postings: term -> (faq rows, weights). A caller's question
+is scored by cosine similarity against every FAQ (70% question match, 30%
+answer match) in one vectorised pass over just the postings of its own terms,
+so the cost tracks the number of matching entries, not the size of the FAQ.
+Stopwords never count.
+
+The index reloads itself when the JSON file changes on disk.
+"""
+
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger("agent")
+
+_TOKEN_RE = re.compile(r"[a-z0-9₹]+")
+
+STOPWORDS = frozenset(
+    """a an and are as at be by can could do does did for from how i if in into is it its
+    me my of on or our so that the their them then there these they this to us was we
+    what when where which who why will with would you your s tell about please""".split()
+)
+
+K1 = 1.2
+B = 0.75
+QUESTION_WEIGHT = 0.7
+MIN_SCORE = 0.05  # cosine floor; off-topic questions score ~0
+RELOAD_CHECK_SECONDS = 2.0
+
+
+def _stem(tok: str) -> str:
+    if len(tok) > 4 and tok.endswith("ies"):
+        return tok[:-3] + "y"
+    if len(tok) > 3 and tok.endswith("s") and not tok.endswith("ss"):
+        return tok[:-1]
+    return tok
+
+
+def tokenize(text: str) -> List[str]:
+    return [_stem(t) for t in _TOKEN_RE.findall((text or "").lower()) if t not in STOPWORDS]
+
+
+FieldPostings = Tuple[Dict[str, float], Dict[str, Tuple[np.ndarray, np.ndarray]]]
+
+
+def _field_postings(docs: List[List[str]]) -> FieldPostings:
+    """BM25 term weights per document, L2-normalised, stored as term -> (rows, weights)."""
+    n = len(docs)
+    tfs = [Counter(d) for d in docs]
+    lengths = np.array([len(d) for d in docs], dtype=np.float32)
+    avgdl = float(lengths.mean()) if n else 0.0
+    df = Counter(tok for tf in tfs for tok in tf)
+    idf = {tok: float(np.log(1.0 + (n - d + 0.5) / (d + 0.5))) for tok, d in df.items()}
+
+    rows: Dict[str, List[int]] = {}
+    weights: Dict[str, List[float]] = {}
+    norms = np.zeros(n, dtype=np.float32)
+    for i, tf in enumerate(tfs):
+        length_norm = K1 * (1 - B + B * lengths[i] / avgdl) if avgdl else K1
+        for tok, f in tf.items():
+            w = idf[tok] * f * (K1 + 1) / (f + length_norm)
+            rows.setdefault(tok, []).append(i)
+            weights.setdefault(tok, []).append(w)
+            norms[i] += w * w
+    norms = np.sqrt(norms)
+    norms[norms == 0] = 1.0
+
+    postings = {}
+    for tok, r in rows.items():
+        idx = np.asarray(r, dtype=np.int32)
+        postings[tok] = (idx, np.asarray(weights[tok], dtype=np.float32) / norms[idx])
+    return idf, postings
+
+
+def _cosine(tokens: List[str], field: FieldPostings, n: int) -> np.ndarray:
+    idf, postings = field
+    scores = np.zeros(n, dtype=np.float32)
+    # words this field has never seen get the rarest-term idf: they still count
+    # against the match instead of being silently dropped from the query
+    unseen_idf = float(np.log(1.0 + (n + 0.5) / 0.5))
+    q_weights = {t: idf.get(t, unseen_idf) * c for t, c in Counter(tokens).items()}
+    q_norm = float(np.sqrt(sum(w * w for w in q_weights.values())))
+    for t, qw in q_weights.items():
+        if t in postings:
+            rows, w = postings[t]
+            scores[rows] += w * (qw / q_norm)
+    return scores
+
+
+class FAQIndex:
+    def __init__(self, path: str, min_score: float = MIN_SCORE):
+        self.path = path
+        self.min_score = min_score
+        self._lock = threading.Lock()
+        self._signature = None
+        self._checked_at = 0.0
+        self.version = 0  # bumped on every rebuild, so caches of answers can tell they are stale
+        self.entries: List[Dict] = []
+        self._questions: FieldPostings = ({}, {})
+        self._answers: FieldPostings = ({}, {})
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _stat(self):
+        st = os.stat(self.path)
+        return st.st_mtime_ns, st.st_size
+
+    def reload(self):
+        """(Re)build the index from disk."""
+        signature = self._stat()
+        with open(self.path, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        self._build([e for e in entries if e.get("question") and e.get("answer")])
+        self._signature = signature
+        self.version += 1
+        logger.info(f"FAQ index built: {len(self.entries)} entries, {len(self._questions[1])} question terms")
+
+    def _maybe_reload(self):
+        now = time.monotonic()
+        if now - self._checked_at < RELOAD_CHECK_SECONDS:
+            return
+        with self._lock:
+            if now - self._checked_at < RELOAD_CHECK_SECONDS:
+                return
+            self._checked_at = now
+            try:
+                signature = self._stat()
+            except OSError:
+                # missing or mid-replace: keep serving the last good index
+                if self._signature is not None:
+                    logger.warning(f"FAQ file {self.path} is unavailable; keeping the previous index")
+                self._signature = None
+                return
+            if signature == self._signature:
+                return
+            try:
+                self.reload()
+            except (OSError, ValueError):
+                # don't retry the same broken file on every question
+                self._signature = signature
+                logger.exception(f"FAQ reload from {self.path} failed; keeping the previous index")
+
+    def _build(self, entries: List[Dict]):
+        questions = _field_postings([tokenize(e["question"]) for e in entries])
+        answers = _field_postings([tokenize(e["answer"]) for e in entries])
+        # swap in one go so concurrent searches see either the old or the new index
+        self.entries, self._questions, self._answers = entries, questions, answers
+
+    def search(self, question: str, k: int = 3) -> List[Tuple[float, Dict]]:
+        """Top `k` FAQ entries by cosine similarity, best first, above the confidence threshold."""
+        self._maybe_reload()
+        entries, questions, answers = self.entries, self._questions, self._answers
+        tokens = tokenize(question)
+        if not entries or not tokens:
+            return []
+        scores = QUESTION_WEIGHT * _cosine(tokens, questions, len(entries))
+        scores += (1.0 - QUESTION_WEIGHT) * _cosine(tokens, answers, len(entries))
+
+        k = min(k, len(entries))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.lexsort((top, -scores[top]))]
+        return [(float(scores[i]), entries[i]) for i in top if scores[i] >= self.min_score]
+
+    def check_for_changes(self):
+        """Reload if the FAQ file changed (rate-limited to one stat per few seconds)."""
+        self._maybe_reload()
+
+    def best(self, question: str) -> Optional[Tuple[float, Dict]]:
+        hits = self.search(question, k=1)
+        return hits[0] if hits else None
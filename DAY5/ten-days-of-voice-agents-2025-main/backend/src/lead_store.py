@@ -0,0 +1,163 @@
+"""
+Deduplicated lead store.
+
+One row per person, keyed by a hash of their normalised email, or of
+company + name while no email is known. The key is the table's primary key,
+so "have we talked to this person before" is a single index probe and stays
+flat as the lead base grows. A second index on the company hash finds earlier
+rows for a company.
+
+Writes are upserts that merge field by field: a non-empty incoming value
+replaces the stored one, and an empty value keeps it. A lead that first gave
+company + name and later an email is re-keyed onto the email, merging into any
+row that email already had. Repeat bookings and return callers therefore
+update one record instead of piling up duplicates.
+
+A match on company + name alone is not proof of identity. `shareable`
+withholds stored contact details unless the caller gave the same email. A
+different email given after such a match starts a row of its own and does not
+replace the stored one. Otherwise anyone who knows a name and a company could
+redirect that lead's follow-ups.
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import threading
+from typing import Dict, Iterable, List, Optional
+
+LEADS_DB = "leads/leads.sqlite"
+
+LEAD_FIELDS = ("name", "company", "email", "role", "use_case", "team_size", "timeline", "booked_demo")
+CONTACT_FIELDS = frozenset({"email"})  # only reused once the caller's own email matches
+
+
+def _norm(value: Optional[str]) -> str:
+    return " ".join((value or "").lower().split())
+
+
+def _hash(value: str) -> str:
+    return hashlib.blake2b(value.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def lead_key(email: str = "", company: str = "", name: str = "") -> Optional[str]:
+    """Stable identity for a lead: email if known, else company + name."""
+    if _norm(email):
+        return "e:" + _hash(_norm(email))
+    if _norm(company) and _norm(name):
+        return "c:" + _hash(_norm(company) + "|" + _norm(name))
+    return None
+
+
+def company_key(company: str) -> Optional[str]:
+    return _hash(_norm(company)) if _norm(company) else None
+
+
+def shareable(known: Dict, email: str = "") -> Dict:
+    """Stored lead fields that may be reused for a caller who gave `email`.
+
+    Contact details are dropped unless `email` matches the stored one.
+    """
+    verified = bool(_norm(email)) and _norm(email) == _norm(known.get("email"))
+    return {f: known.get(f) or "" for f in LEAD_FIELDS if verified or f not in CONTACT_FIELDS}
+
+
+class LeadStore:
+    def __init__(self, path: str = LEADS_DB):
+        self.path = path
+        self._local = threading.local()
+        conn = self._conn()
+        conn.executescript(
+            f"""
+            CREATE TABLE IF NOT EXISTS leads (
+                lead_key TEXT PRIMARY KEY,
+                company_key TEXT,
+                {", ".join(f"{f} TEXT NOT NULL DEFAULT ''" for f in LEAD_FIELDS)},
+                first_seen TEXT NOT NULL DEFAULT (datetime('now')),
+                last_seen TEXT NOT NULL DEFAULT (datetime('now')),
+                touches INTEGER NOT NULL DEFAULT 1
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_leads_company ON leads (company_key);
+            """
+        )
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            self._local.conn = conn
+        return conn
+
+    def find(self, email: str = "", company: str = "", name: str = "") -> Optional[Dict]:
+        """Existing lead for this email (or company + name), if any."""
+        conn = self._conn()
+        for key in (lead_key(email=email), lead_key(company=company, name=name)):
+            if key is None:
+                continue
+            row = conn.execute("SELECT * FROM leads WHERE lead_key = ?", (key,)).fetchone()
+            if row is not None:
+                return dict(row)
+        # someone known by email who now only gives company + name
+        if not _norm(email) and _norm(name):
+            for row in self.find_by_company(company, limit=50):
+                if _norm(row["name"]) == _norm(name):
+                    return row
+        return None
+
+    def find_by_company(self, company: str, limit: int = 5) -> List[Dict]:
+        key = company_key(company)
+        if key is None:
+            return []
+        rows = self._conn().execute(
+            "SELECT * FROM leads WHERE company_key = ? ORDER BY last_seen DESC LIMIT ?", (key, limit)
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    def _upsert(self, conn: sqlite3.Connection, record: Dict):
+        key = lead_key(record.get("email", ""), record.get("company", ""), record.get("name", ""))
+        if key is None:
+            return
+        values = [record.get(f) or "" for f in LEAD_FIELDS]
+        merge = ", ".join(f"{f} = CASE WHEN excluded.{f} != '' THEN excluded.{f} ELSE leads.{f} END" for f in LEAD_FIELDS)
+        conn.execute(
+            f"INSERT INTO leads (lead_key, company_key, {', '.join(LEAD_FIELDS)}) "
+            f"VALUES (?, ?, {', '.join('?' * len(LEAD_FIELDS))}) "
+            f"ON CONFLICT (lead_key) DO UPDATE SET {merge}, "
+            "company_key = COALESCE(excluded.company_key, leads.company_key), "
+            "last_seen = datetime('now'), touches = leads.touches + 1",
+            [key, company_key(record.get("company", ""))] + values,
+        )
+        # lead was known by company + name before giving an email: fold that row in.
+        # A row already keyed by some other email is a different identity and is left alone.
+        old_key = lead_key(company=record.get("company", ""), name=record.get("name", ""))
+        if key.startswith("e:") and old_key is not None:
+            old = conn.execute("SELECT * FROM leads WHERE lead_key = ?", (old_key,)).fetchone()
+            if old is not None:
+                fill = ", ".join(f"{f} = CASE WHEN {f} = '' THEN ? ELSE {f} END" for f in LEAD_FIELDS)
+                conn.execute(
+                    f"UPDATE leads SET {fill}, first_seen = MIN(first_seen, ?), touches = touches + ? "
+                    "WHERE lead_key = ?",
+                    [old[f] for f in LEAD_FIELDS] + [old["first_seen"], old["touches"], key],
+                )
+                conn.execute("DELETE FROM leads WHERE lead_key = ?", (old_key,))
+
+    def upsert_many(self, records: Iterable[Dict]):
+        """Merge a batch of (possibly partial) lead records in one transaction."""
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for record in records:
+                self._upsert(conn, record)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def upsert(self, record: Dict):
+        self.upsert_many([record])
+
+    async def afind(self, email: str = "", company: str = "", name: str = "") -> Optional[Dict]:
+        return await asyncio.to_thread(self.find, email, company, name)
@@ -0,0 +1,181 @@
+"""
+Background writer for leads and follow-up email drafts.
+
+Tools only enqueue records, so a booking never waits on disk. One writer thread
+per process drains the queue in batches (up to `batch_size` records or
+`flush_interval` seconds, whichever comes first). Each batch is one append and
+one fsync per file (group commit).
+
+Drafts are packed into a single append-only file (one JSON line per draft)
+instead of one tiny file per lead. A sidecar index of
+``email <TAB> offset <TAB> length`` lines lets ``get_draft`` seek straight to
+a lead's latest draft.
+
+When given a ``LeadStore``, every lead record and partial update in a batch is
+also merged into it in one transaction.
+
+Call ``flush``/``aflush`` on shutdown; anything still queued is written then.
+"""
+
+import asyncio
+import json
+import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional, Tuple
+
+from lead_store import LeadStore
+
+try:
+    import fcntl
+except ImportError:  # Windows: batches from one process are still serialised
+    fcntl = None
+
+LEADS_FILE = "leads/zomato_leads.jsonl"
+DRAFTS_FILE = "email_drafts/drafts.jsonl"
+
+
+@contextmanager
+def _locked(f):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _line(record: Dict) -> bytes:
+    return (json.dumps(record, ensure_ascii=False) + "\n").encode("utf-8")
+
+
+class LeadWriter:
+    def __init__(
+        self,
+        leads_path: str = LEADS_FILE,
+        drafts_path: str = DRAFTS_FILE,
+        batch_size: int = 256,
+        flush_interval: float = 0.25,
+        store: Optional[LeadStore] = None,
+    ):
+        self.store = store
+        self.leads_path = leads_path
+        self.drafts_path = drafts_path
+        self.index_path = drafts_path + ".idx"
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue: "queue.Queue[Tuple[str, object]]" = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._index_read_upto = 0
+        self._index_lock = threading.Lock()
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            with self._start_lock:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, name="lead-writer", daemon=True)
+                    self._thread.start()
+
+    def submit(self, lead: Dict, draft: Optional[Dict] = None):
+        """Queue a lead record (and its email draft) for writing. Never blocks on disk."""
+        self._queue.put(("lead", lead))
+        if draft is not None:
+            self._queue.put(("draft", draft))
+        self._ensure_thread()
+
+    def submit_update(self, partial: Dict):
+        """Queue a partial lead update (only merged into the store, not logged)."""
+        if self.store is not None:
+            self._queue.put(("update", partial))
+            self._ensure_thread()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until everything queued so far is on disk."""
+        done = threading.Event()
+        self._queue.put(("flush", done))
+        self._ensure_thread()
+        return done.wait(timeout)
+
+    async def aflush(self):
+        await asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size and batch[-1][0] != "flush":
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            leads = [rec for kind, rec in batch if kind == "lead"]
+            drafts = [rec for kind, rec in batch if kind == "draft"]
+            try:
+                if self.store is not None:
+                    self.store.upsert_many(rec for kind, rec in batch if kind in ("lead", "update"))
+                self._write(leads, drafts)
+            except Exception as e:
+                print(f"Lead writer failed to persist {len(leads)} leads / {len(drafts)} drafts: {e}")
+            for kind, rec in batch:
+                if kind == "flush":
+                    rec.set()
+
+    def _write(self, leads: List[Dict], drafts: List[Dict]):
+        if leads:
+            os.makedirs(os.path.dirname(self.leads_path) or ".", exist_ok=True)
+            with open(self.leads_path, "ab") as f, _locked(f):
+                f.write(b"".join(_line(rec) for rec in leads))
+                f.flush()
+                os.fsync(f.fileno())
+        if drafts:
+            os.makedirs(os.path.dirname(self.drafts_path) or ".", exist_ok=True)
+            entries = []
+            with open(self.drafts_path, "ab") as f, _locked(f):
+                offset = f.seek(0, os.SEEK_END)
+                chunks = []
+                for rec in drafts:
+                    data = _line(rec)
+                    entries.append(f"{rec.get('email') or 'unknown'}\t{offset}\t{len(data)}\n")
+                    chunks.append(data)
+                    offset += len(data)
+                f.write(b"".join(chunks))
+                f.flush()
+                os.fsync(f.fileno())
+                # written under the pack lock, so index lines stay in pack order
+                with open(self.index_path, "a", encoding="utf-8") as idx:
+                    idx.write("".join(entries))
+                    idx.flush()
+                    os.fsync(idx.fileno())
+
+    def _refresh_index(self):
+        try:
+            with open(self.index_path, "rb") as idx:
+                idx.seek(self._index_read_upto)
+                for raw in idx:
+                    if not raw.endswith(b"\n"):
+                        break
+                    self._index_read_upto += len(raw)
+                    parts = raw.decode("utf-8").rstrip("\n").split("\t")
+                    if len(parts) == 3:
+                        self._index[parts[0]] = (int(parts[1]), int(parts[2]))
+        except FileNotFoundError:
+            pass
+
+    def get_draft(self, email: str) -> Optional[Dict]:
+        """Latest email draft written for `email`, read with one seek."""
+        with self._index_lock:
+            self._refresh_index()
+            pos = self._index.get(email or "unknown")
+        if pos is None:
+            return None
+        with open(self.drafts_path, "rb") as f:
+            f.seek(pos[0])
+            return json.loads(f.read(pos[1]))
@@ -0,0 +1,153 @@
+"""
+Demo slot calendar shared by every SDR session.
+
+Slots live in a local SQLite file (WAL mode), so all worker processes see the
+same calendar. Each row is one rep's half-hour interval; UNIQUE(rep, starts_at)
+keeps a rep from being offered twice for the same time. Free slots are found
+through a partial index on start time that only covers free rows, so listing
+the next few open slots is one index range scan (O(log n)) however many slots
+are already booked.
+
+Booking uses optimistic locking. Every slot carries a version, and a
+reservation only succeeds if the slot is still free at the version the caller
+was shown. If two sessions race for the same slot, exactly one UPDATE matches
+and the other gets a conflict and fresh alternatives.
+"""
+
+import asyncio
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime, time, timedelta, timezone
+from typing import List, Optional, Sequence
+
+CALENDAR_FILE = "shared-data/demo_calendar.sqlite"
+
+IST = timezone(timedelta(hours=5, minutes=30))
+REPS = ("Aarav", "Priya")
+WORKDAY_START = time(10, 0)
+WORKDAY_END = time(18, 0)
+SLOT_MINUTES = 30
+HORIZON_DAYS = 7
+
+
+@dataclass(frozen=True)
+class Slot:
+    id: int
+    rep: str
+    starts_at: datetime  # UTC
+    version: int
+
+    def label(self, now: Optional[datetime] = None) -> str:
+        local = self.starts_at.astimezone(IST)
+        today = (now or datetime.now(timezone.utc)).astimezone(IST).date()
+        days = (local.date() - today).days
+        day = "Today" if days == 0 else "Tomorrow" if days == 1 else local.strftime("%A %d %b")
+        return f"{day} at {local.strftime('%I:%M %p').lstrip('0')} IST"
+
+
+def _ts(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _parse_ts(value: str) -> datetime:
+    return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc)
+
+
+class SlotCalendar:
+    def __init__(self, path: str = CALENDAR_FILE, reps: Sequence[str] = REPS):
+        self.path = path
+        self.reps = tuple(reps)
+        self._local = threading.local()
+        self._init_schema()
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10.0, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL;")
+            conn.execute("PRAGMA synchronous=NORMAL;")
+            self._local.conn = conn
+        return conn
+
+    def _init_schema(self):
+        conn = self._conn()
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS demo_slots (
+                id INTEGER PRIMARY KEY,
+                rep TEXT NOT NULL,
+                starts_at TEXT NOT NULL,
+                ends_at TEXT NOT NULL,
+                status TEXT NOT NULL DEFAULT 'free',
+                booked_by TEXT,
+                booked_at TEXT,
+                version INTEGER NOT NULL DEFAULT 0,
+                UNIQUE (rep, starts_at)
+            );
+            CREATE INDEX IF NOT EXISTS idx_demo_slots_free
+                ON demo_slots (starts_at, rep) WHERE status = 'free';
+            """
+        )
+
+    def ensure_availability(self, now: Optional[datetime] = None, days: int = HORIZON_DAYS):
+        """Open working-hour slots for every rep up to `days` ahead (idempotent)."""
+        now = now or datetime.now(timezone.utc)
+        start_day = now.astimezone(IST).date()
+        rows = []
+        for offset in range(days + 1):
+            day = start_day + timedelta(days=offset)
+            if day.weekday() >= 5:
+                continue
+            t = datetime.combine(day, WORKDAY_START, IST)
+            end = datetime.combine(day, WORKDAY_END, IST)
+            while t < end:
+                nxt = t + timedelta(minutes=SLOT_MINUTES)
+                if t > now:
+                    rows.extend((rep, _ts(t), _ts(nxt)) for rep in self.reps)
+                t = nxt
+        conn = self._conn()
+        conn.execute("BEGIN")
+        try:
+            conn.executemany(
+                "INSERT OR IGNORE INTO demo_slots (rep, starts_at, ends_at) VALUES (?, ?, ?)", rows
+            )
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def free_slots(self, limit: int = 4, after: Optional[datetime] = None, distinct_times: bool = True) -> List[Slot]:
+        """Earliest free slots after `after` (default: now), one rep per time unless asked otherwise."""
+        after = after or datetime.now(timezone.utc)
+        cur = self._conn().execute(
+            "SELECT id, rep, starts_at, version FROM demo_slots "
+            "WHERE status = 'free' AND starts_at > ? ORDER BY starts_at, rep",
+            (_ts(after),),
+        )
+        slots: List[Slot] = []
+        seen_times = set()
+        for row in cur:
+            if distinct_times and row[2] in seen_times:
+                continue
+            seen_times.add(row[2])
+            slots.append(Slot(id=row[0], rep=row[1], starts_at=_parse_ts(row[2]), version=row[3]))
+            if len(slots) >= limit:
+                break
+        cur.close()
+        return slots
+
+    def reserve(self, slot: Slot, booked_by: str) -> bool:
+        """Book `slot` if it is still free at the version it was offered with."""
+        cur = self._conn().execute(
+            "UPDATE demo_slots SET status = 'booked', booked_by = ?, booked_at = datetime('now'), "
+            "version = version + 1 WHERE id = ? AND version = ? AND status = 'free'",
+            (booked_by, slot.id, slot.version),
+        )
+        return cur.rowcount == 1
+
+    async def afree_slots(self, limit: int = 4) -> List[Slot]:
+        return await asyncio.to_thread(self.free_slots, limit)
+
+    async def areserve(self, slot: Slot, booked_by: str) -> bool:
+        return await asyncio.to_thread(self.reserve, slot, booked_by)
@@ -0,0 +1,69 @@
+import json
+
+import pytest
+
+from answer_cache import FAQAnswerCache, is_question, normalize_question
+from faq_index import FAQIndex
+
+FAQ = [
+    {"question": "Do you have Zomato Gold?", "answer": "Yes! Zomato Gold gives free delivery."},
+    {"question": "What is Blinkit?", "answer": "Blinkit is Zomato's quick commerce arm."},
+    {"question": "How can restaurants join Zomato?", "answer": "Go to zomato.com/partner."},
+]
+
+
+@pytest.fixture
+def cache(tmp_path):
+    path = tmp_path / "faq.json"
+    path.write_text(json.dumps(FAQ), encoding="utf-8")
+    return FAQAnswerCache(FAQIndex(str(path)))
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["What is Blinkit?", "what is blinkit", "Blinkit?", "tell me about zomato gold", "restaurants join zomato"],
+)
+def test_questions_are_eligible(text) -> None:
+    assert is_question(text)
+
+
+@pytest.mark.parametrize("text", ["Zomato", "Gold", "blinkit.", "  "])
+def test_single_keyword_replies_are_not_questions(text) -> None:
+    assert not is_question(text)
+
+
+def test_single_keyword_reply_is_left_to_the_llm(cache) -> None:
+    assert cache.answer_for("Blinkit") is None
+    assert cache.answer_for("What is Blinkit?") == "Blinkit is Zomato's quick commerce arm."
+
+
+def test_same_question_different_wording_hits_cache(cache) -> None:
+    assert normalize_question("What's Zomato Gold?") == normalize_question("what is zomato gold")
+    first = cache.answer_for("Do you have Zomato Gold?")
+    second = cache.answer_for("do you have zomato gold")
+    assert first == second == "Yes! Zomato Gold gives free delivery."
+    assert cache.stats()["cache_hits"] == 1
+    assert cache.stats()["direct_answers"] == 2
+
+
+def test_faq_reload_invalidates_cached_answers(cache, tmp_path) -> None:
+    assert cache.answer_for("What is Blinkit?") == "Blinkit is Zomato's quick commerce arm."
+    path = tmp_path / "faq.json"
+    path.write_text(json.dumps([{"question": "What is Blinkit?", "answer": "Ten-minute grocery delivery."}]), encoding="utf-8")
+    cache.index.reload()
+
+    assert cache.answer_for("What is Blinkit?") == "Ten-minute grocery delivery."
+
+
+def test_misses_are_cached_and_lru_is_bounded(tmp_path) -> None:
+    path = tmp_path / "faq.json"
+    path.write_text(json.dumps(FAQ), encoding="utf-8")
+    cache = FAQAnswerCache(FAQIndex(str(path)), maxsize=2)
+
+    assert cache.answer_for("what time does the cricket start?") is None
+    assert cache.answer_for("what time does the cricket start") is None
+    assert cache.stats()["cache_hits"] == 1
+
+    cache.answer_for("What is Blinkit?")
+    cache.answer_for("How can restaurants join Zomato?")
+    assert cache.stats()["entries"] == 2
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+import faq_index
+from faq_index import FAQIndex
+
+FAQ = [
+    {"question": "What is Zomato Gold?", "answer": "A paid membership with free delivery and dining offers."},
+    {"question": "How do restaurants list on Zomato?", "answer": "Sign up on the partner dashboard and upload your menu."},
+    {"question": "What commission does Zomato charge?", "answer": "Commission depends on the plan, usually 18 to 25 percent."},
+]
+
+
+def _write(path, entries) -> None:
+    path.write_text(json.dumps(entries), encoding="utf-8")
+
+
+@pytest.fixture
+def faq_file(tmp_path, monkeypatch):
+    # check the file on every search instead of every few seconds
+    monkeypatch.setattr(faq_index, "RELOAD_CHECK_SECONDS", 0.0)
+    path = tmp_path / "faq.json"
+    _write(path, FAQ)
+    return path
+
+
+def test_best_match_ranks_by_question(faq_file) -> None:
+    index = FAQIndex(str(faq_file))
+    score, entry = index.best("how much commission do you charge restaurants?")
+    assert entry["question"] == "What commission does Zomato charge?"
+    assert score >= faq_index.MIN_SCORE
+
+
+def test_stopwords_and_off_topic_questions_match_nothing(faq_file) -> None:
+    index = FAQIndex(str(faq_file))
+    assert index.search("what is the") == []
+    assert index.best("weather in paris tomorrow") is None
+
+
+def test_deleted_file_keeps_previous_index(faq_file) -> None:
+    index = FAQIndex(str(faq_file))
+    faq_file.unlink()
+
+    hit = index.best("what is zomato gold")
+    assert hit is not None and hit[1]["question"] == "What is Zomato Gold?"
+    assert index.version == 1
+
+
+def test_broken_rewrite_keeps_previous_index_until_fixed(faq_file) -> None:
+    index = FAQIndex(str(faq_file))
+    faq_file.write_text('[{"question": "half written', encoding="utf-8")
+    assert index.best("what is zomato gold")[1]["question"] == "What is Zomato Gold?"
+
+    _write(faq_file, FAQ + [{"question": "Does Zomato deliver groceries?", "answer": "Groceries come through Blinkit."}])
+    assert index.best("do you deliver groceries")[1]["answer"] == "Groceries come through Blinkit."
+    assert index.version == 2
+
+
+def test_recreated_file_is_reloaded(faq_file) -> None:
+    index = FAQIndex(str(faq_file))
+    faq_file.unlink()
+    index.search("gold")
+    _write(faq_file, [{"question": "What is Hyperpure?", "answer": "Zomato's supplies business for restaurants."}])
+
+    assert index.best("what is hyperpure")[1]["question"] == "What is Hyperpure?"
+    assert len(index) == 1
@@ -0,0 +1,74 @@
+import pytest
+
+from lead_store import LeadStore, lead_key, shareable
+
+
+@pytest.fixture
+def store(tmp_path):
+    return LeadStore(str(tmp_path / "leads.sqlite"))
+
+
+def _count(store: LeadStore) -> int:
+    return store._conn().execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+
+def test_lead_key_normalises_email_and_needs_company_and_name() -> None:
+    assert lead_key(email=" Priya@Example.com ") == lead_key(email="priya@example.com")
+    assert lead_key(company="Spice Route", name="") is None
+    assert lead_key(company="Spice  Route", name="Priya") == lead_key(company="spice route", name="PRIYA")
+
+
+def test_repeat_upserts_merge_into_one_record(store) -> None:
+    store.upsert({"email": "priya@example.com", "name": "Priya", "role": "Owner"})
+    store.upsert({"email": "PRIYA@example.com", "role": "", "timeline": "next month"})
+
+    lead = store.find(email="priya@example.com")
+    assert _count(store) == 1
+    assert lead["role"] == "Owner"  # empty value keeps the stored one
+    assert lead["timeline"] == "next month"
+    assert lead["touches"] == 2
+
+
+def test_company_and_name_lead_is_rekeyed_onto_email(store) -> None:
+    store.upsert({"company": "Spice Route", "name": "Priya", "use_case": "more orders"})
+    store.upsert({"company": "Spice Route", "name": "Priya", "email": "priya@example.com"})
+
+    assert _count(store) == 1
+    lead = store.find(email="priya@example.com")
+    assert lead["use_case"] == "more orders"
+    assert lead["touches"] == 2
+
+
+def test_email_lead_found_again_by_company_and_name(store) -> None:
+    store.upsert({"company": "Spice Route", "name": "Priya", "email": "priya@example.com"})
+    store.upsert({"company": "Spice Route", "name": "Arjun", "email": "arjun@example.com"})
+
+    assert store.find(company="spice route", name="priya")["email"] == "priya@example.com"
+    assert store.find(company="Spice Route", name="Meera") is None
+    assert len(store.find_by_company("Spice Route")) == 2
+
+
+def test_record_without_identity_is_ignored(store) -> None:
+    store.upsert_many([{"name": "Priya"}, {"company": "Spice Route"}])
+    assert _count(store) == 0
+
+
+def test_company_and_name_match_withholds_contact_details(store) -> None:
+    store.upsert({"company": "Spice Route", "name": "Priya", "email": "priya@example.com", "role": "Owner"})
+    known = store.find(company="Spice Route", name="Priya")
+
+    assert "email" not in shareable(known)
+    assert "email" not in shareable(known, email="someone@else.com")
+    assert shareable(known)["role"] == "Owner"
+    assert shareable(known, email=" PRIYA@example.com")["email"] == "priya@example.com"
+
+
+def test_different_email_never_replaces_a_stored_one(store) -> None:
+    store.upsert({"company": "Spice Route", "name": "Priya", "email": "priya@example.com", "role": "Owner"})
+    # someone matched by company + name gives another address
+    store.upsert({"company": "Spice Route", "name": "Priya", "email": "priya@other.com", "timeline": "soon"})
+
+    assert _count(store) == 2
+    original = store.find(email="priya@example.com")
+    assert (original["role"], original["timeline"], original["touches"]) == ("Owner", "", 1)
+    assert store.find(email="priya@other.com")["role"] == ""
@@ -0,0 +1,104 @@
+import json
+import os
+
+import pytest
+
+import lead_writer
+from lead_store import LeadStore
+from lead_writer import LeadWriter
+
+
+@pytest.fixture
+def writer(tmp_path):
+    # a long interval, so only the batch limit or a flush ends a batch
+    return LeadWriter(
+        leads_path=str(tmp_path / "leads" / "leads.jsonl"),
+        drafts_path=str(tmp_path / "drafts" / "drafts.jsonl"),
+        flush_interval=5.0,
+    )
+
+
+def _lines(path: str) -> list:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_queued_records_are_group_committed(writer, monkeypatch) -> None:
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(lead_writer.os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd))
+
+    for i in range(100):
+        writer.submit({"email": f"lead{i}@example.com", "name": f"Lead {i}"})
+    assert writer.flush(timeout=10)
+
+    assert [rec["name"] for rec in _lines(writer.leads_path)] == [f"Lead {i}" for i in range(100)]
+    assert len(synced) == 1  # one append and one fsync for the whole batch
+
+
+def test_batch_size_caps_a_batch(tmp_path, monkeypatch) -> None:
+    synced = []
+    real_fsync = os.fsync
+    monkeypatch.setattr(lead_writer.os, "fsync", lambda fd: synced.append(fd) or real_fsync(fd))
+    writer = LeadWriter(leads_path=str(tmp_path / "leads.jsonl"), drafts_path=str(tmp_path / "d.jsonl"), batch_size=10, flush_interval=5.0)
+
+    for i in range(30):
+        writer.submit({"email": f"lead{i}@example.com"})
+    assert writer.flush(timeout=10)
+
+    assert len(_lines(writer.leads_path)) == 30
+    assert len(synced) == 3
+
+
+def test_flush_drains_everything_queued_before_it(writer) -> None:
+    writer.submit({"email": "a@example.com"}, {"email": "a@example.com", "subject": "Hi A"})
+    writer.submit({"email": "b@example.com"})
+    assert writer.flush(timeout=10)
+
+    assert writer._queue.empty()
+    assert [rec["email"] for rec in _lines(writer.leads_path)] == ["a@example.com", "b@example.com"]
+
+
+@pytest.mark.asyncio
+async def test_aflush_drains_from_async_code(writer) -> None:
+    writer.submit({"email": "a@example.com"})
+    await writer.aflush()
+    assert len(_lines(writer.leads_path)) == 1
+
+
+def test_get_draft_seeks_to_the_latest_draft(writer) -> None:
+    writer.submit({"email": "a@example.com"}, {"email": "a@example.com", "subject": "first"})
+    writer.submit({"email": "b@example.com"}, {"email": "b@example.com", "subject": "for b"})
+    assert writer.flush(timeout=10)
+    assert writer.get_draft("a@example.com")["subject"] == "first"
+
+    writer.submit({"email": "a@example.com"}, {"email": "a@example.com", "subject": "second"})
+    assert writer.flush(timeout=10)
+
+    assert writer.get_draft("a@example.com")["subject"] == "second"
+    assert writer.get_draft("b@example.com")["subject"] == "for b"
+    assert writer.get_draft("nobody@example.com") is None
+    with open(writer.index_path, encoding="utf-8") as idx:
+        assert len(idx.readlines()) == 3
+
+
+def test_draft_index_is_read_by_another_process(writer) -> None:
+    writer.submit({"email": "a@example.com"}, {"email": "a@example.com", "subject": "hello"})
+    assert writer.flush(timeout=10)
+
+    reader = LeadWriter(leads_path=writer.leads_path, drafts_path=writer.drafts_path)
+    assert reader.get_draft("a@example.com")["subject"] == "hello"
+
+
+def test_lead_records_and_updates_are_merged_into_the_store(tmp_path) -> None:
+    store = LeadStore(str(tmp_path / "leads.sqlite"))
+    writer = LeadWriter(leads_path=str(tmp_path / "leads.jsonl"), drafts_path=str(tmp_path / "d.jsonl"), store=store)
+
+    writer.submit_update({"company": "Spice Route", "name": "Priya"})
+    writer.submit_update({"company": "Spice Route", "name": "Priya", "role": "Owner"})
+    writer.submit({"company": "Spice Route", "name": "Priya", "email": "priya@example.com"})
+    assert writer.flush(timeout=10)
+
+    lead = store.find(email="priya@example.com")
+    assert lead["role"] == "Owner"
+    assert len(_lines(writer.leads_path)) == 1  # updates are not logged
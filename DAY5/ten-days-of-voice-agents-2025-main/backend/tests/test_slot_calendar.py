@@ -0,0 +1,65 @@
+import threading
+from datetime import datetime, timezone
+
+import pytest
+
+from slot_calendar import SlotCalendar
+
+MONDAY = datetime(2025, 6, 2, 3, 0, tzinfo=timezone.utc)  # 08:30 IST, before the workday
+
+
+@pytest.fixture
+def path(tmp_path):
+    path = str(tmp_path / "calendar.sqlite")
+    SlotCalendar(path, reps=("Aarav", "Priya")).ensure_availability(now=MONDAY, days=1)
+    return path
+
+
+def test_only_one_of_two_callers_gets_the_same_slot(path) -> None:
+    first, second = SlotCalendar(path), SlotCalendar(path)  # e.g. two worker processes
+    slot = first.free_slots(limit=1, after=MONDAY)[0]
+    assert second.free_slots(limit=1, after=MONDAY)[0] == slot
+
+    assert first.reserve(slot, "lead-a") is True
+    assert second.reserve(slot, "lead-b") is False  # same version, already taken
+
+    remaining = first.free_slots(limit=50, after=MONDAY, distinct_times=False)
+    assert slot.id not in {s.id for s in remaining}
+    # the other rep at the same time is still bookable
+    assert any(s.starts_at == slot.starts_at and s.rep != slot.rep for s in remaining)
+
+
+def test_concurrent_reservations_have_exactly_one_winner(path) -> None:
+    slot = SlotCalendar(path).free_slots(limit=1, after=MONDAY)[0]
+    calendars = [SlotCalendar(path) for _ in range(8)]
+    barrier = threading.Barrier(len(calendars))
+    results = []
+
+    def book(calendar: SlotCalendar, who: str) -> None:
+        barrier.wait()
+        results.append(calendar.reserve(slot, who))
+
+    threads = [threading.Thread(target=book, args=(c, f"lead-{i}")) for i, c in enumerate(calendars)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results.count(True) == 1
+    assert slot.id not in {s.id for s in SlotCalendar(path).free_slots(limit=50, after=MONDAY, distinct_times=False)}
+
+
+def test_stale_version_is_rejected(path) -> None:
+    calendar = SlotCalendar(path)
+    slot = calendar.free_slots(limit=1, after=MONDAY)[0]
+    calendar._conn().execute("UPDATE demo_slots SET version = version + 1 WHERE id = ?", (slot.id,))
+
+    assert calendar.reserve(slot, "lead-a") is False
+    fresh = calendar.free_slots(limit=1, after=MONDAY)[0]
+    assert fresh.id == slot.id and calendar.reserve(fresh, "lead-a") is True
+
+
+def test_free_slots_are_working_hours_one_rep_per_time(path) -> None:
+    slots = SlotCalendar(path).free_slots(limit=4, after=MONDAY)
+    assert len({s.starts_at for s in slots}) == 4
+    assert slots[0].label(now=MONDAY) == "Today at 10:00 AM IST"
@@ -5,8 +5,6 @@
 
 import logging
 import os
-import sqlite3
-from datetime import datetime
 from typing import Annotated, Optional
 from dataclasses import dataclass
 
@@ -29,8 +27,10 @@ from livekit.agents import (
     RunContext,
 )
 
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.plugins import murf, google, deepgram
+
+from fraud_repository import AsyncFraudRepository, FraudCase, FraudRepository
+from model_registry import ModelRegistry
 
 logger = logging.getLogger("agent")
 load_dotenv(".env.local")
@@ -39,84 +39,33 @@ load_dotenv(".env.local")
 # 💾 1. DATABASE SETUP (SQLite)
 # ======================================================
 
-DB_FILE = "fraud_db.sqlite"
-
-@dataclass
-class FraudCase:
-    userName: str
-    securityIdentifier: str
-    cardEnding: str
-    transactionName: str
-    transactionAmount: str
-    transactionTime: str
-    transactionSource: str
-    case_status: str = "pending_review"
-    notes: str = ""
-
-
-def get_db_path():
-    return os.path.join(os.path.dirname(__file__), DB_FILE)
-
-
-def get_conn():
-    path = get_db_path()
-    conn = sqlite3.connect(path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    return conn
+# Schema, migrations and indexes live in fraud_repository (shared with database.py)
+repo = FraudRepository()
+async_repo = AsyncFraudRepository(repo)
+
+SAMPLE_CASES = [
+    {
+        "userName": "John", "securityIdentifier": "12345", "cardEnding": "4242",
+        "transactionName": "ABC Industry", "transactionAmount": "$450.00",
+        "transactionTime": "2:30 AM EST", "transactionSource": "alibaba.com",
+        "case_status": "pending_review", "notes": "Automated flag: High value transaction.",
+    },
+    {
+        "userName": "Sarah", "securityIdentifier": "99887", "cardEnding": "1199",
+        "transactionName": "Unknown Crypto Exchange", "transactionAmount": "$2,100.00",
+        "transactionTime": "4:15 AM PST", "transactionSource": "online_transfer",
+        "case_status": "pending_review", "notes": "Automated flag: Unusual location.",
+    },
+]
 
 
 def seed_database():
-    """Create SQLite DB and insert sample rows if empty."""
-    conn = get_conn()
-    cur = conn.cursor()
-
-    # ✅ FIXED SQL — CLEAN, NO BROKEN LINES
-    cur.execute(
-        """
-        CREATE TABLE IF NOT EXISTS fraud_cases (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            userName TEXT NOT NULL,
-            securityIdentifier TEXT,
-            cardEnding TEXT,
-            transactionName TEXT,
-            transactionAmount TEXT,
-            transactionTime TEXT,
-            transactionSource TEXT,
-            case_status TEXT DEFAULT 'pending_review',
-            notes TEXT DEFAULT '',
-            created_at TEXT DEFAULT (datetime('now')),
-            updated_at TEXT DEFAULT (datetime('now'))
-        )
-        """
-    )
-
-    cur.execute("SELECT COUNT(1) FROM fraud_cases")
-    if cur.fetchone()[0] == 0:
-        sample_data = [
-            (
-                "John", "12345", "4242",
-                "ABC Industry", "$450.00", "2:30 AM EST", "alibaba.com",
-                "pending_review", "Automated flag: High value transaction."
-            ),
-            (
-                "Sarah", "99887", "1199",
-                "Unknown Crypto Exchange", "$2,100.00", "4:15 AM PST", "online_transfer",
-                "pending_review", "Automated flag: Unusual location."
-            )
-        ]
-        cur.executemany(
-            """
-            INSERT INTO fraud_cases (
-                userName, securityIdentifier, cardEnding, transactionName,
-                transactionAmount, transactionTime, transactionSource, case_status, notes
-            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-            sample_data,
-        )
-        conn.commit()
-        print(f"✅ SQLite DB seeded at {DB_FILE}")
-
-    conn.close()
+    """Insert sample rows if empty and score any unscored pending cases."""
+    if repo.seed_if_empty(SAMPLE_CASES):
+        print(f"✅ SQLite DB seeded at {os.path.basename(repo.db_path)}")
+    scored = repo.refresh_risk()
+    if scored:
+        print(f"✅ Risk-scored {scored} pending cases")
 
 
 # Initialize DB on load
@@ -138,41 +87,27 @@ class Userdata:
 async def lookup_customer(
     ctx: RunContext[Userdata],
     name: Annotated[str, Field(description="The name the user provides")],
+    card_ending: Annotated[
+        Optional[str],
+        Field(description="Last 4 digits of the card, if the user gave them"),
+    ] = None,
 ) -> str:
     """Lookup a customer in SQLite DB."""
-    print(f"🔎 LOOKING UP: {name}")
+    print(f"🔎 LOOKING UP: {name}" + (f" / card {card_ending}" if card_ending else ""))
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-
-        cur.execute(
-            "SELECT * FROM fraud_cases WHERE LOWER(userName) = LOWER(?) LIMIT 1",
-            (name,),
-        )
-        row = cur.fetchone()
-        conn.close()
+        # indexed, case-insensitive; the riskiest pending case comes first
+        case = await async_repo.find_customer(name, card_ending)
 
-        if not row:
+        if not case:
             return "User not found in the fraud database. Please repeat the name."
 
-        record = dict(row)
-        ctx.userdata.active_case = FraudCase(
-            userName=record["userName"],
-            securityIdentifier=record["securityIdentifier"],
-            cardEnding=record["cardEnding"],
-            transactionName=record["transactionName"],
-            transactionAmount=record["transactionAmount"],
-            transactionTime=record["transactionTime"],
-            transactionSource=record["transactionSource"],
-            case_status=record["case_status"],
-            notes=record["notes"],
-        )
+        ctx.userdata.active_case = case
 
         return (
             f"Record Found.\n"
-            f"User: {record['userName']}\n"
-            f"Security ID (Expected): {record['securityIdentifier']}\n"
-            f"Transaction: {record['transactionAmount']} at {record['transactionName']} ({record['transactionSource']})\n"
+            f"User: {case.userName}\n"
+            f"Security ID (Expected): {case.securityIdentifier}\n"
+            f"Transaction: {case.transactionAmount} at {case.transactionName} ({case.transactionSource})\n"
             f"Ask user for their Security Identifier now."
         )
 
@@ -191,40 +126,26 @@ async def resolve_fraud_case(
         return "Error: No active case selected."
 
     case = ctx.userdata.active_case
-    case.case_status = status
-    case.notes = notes
 
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-
-        cur.execute(
-            """
-            UPDATE fraud_cases
-            SET case_status = ?, notes = ?, updated_at = datetime('now')
-            WHERE userName = ?
-            """,
-            (case.case_status, case.notes, case.userName),
-        )
-        conn.commit()
-
-        # Confirm updated row
-        cur.execute("SELECT * FROM fraud_cases WHERE userName = ?", (case.userName,))
-        updated_row = dict(cur.fetchone())
-        conn.close()
+        updated_at = await async_repo.update_status(case.id, status, notes)
+        if updated_at is None:
+            return f"Error: Case {case.id} was not found in the DB, nothing was updated."
 
+        case.case_status = status
+        case.notes = notes
         print(f"✅ CASE UPDATED: {case.userName} -> {status}")
 
         if status == "confirmed_fraud":
             return (
                 f"Fraud confirmed. Card ending {case.cardEnding} is now BLOCKED. "
                 f"A replacement card will be issued.\n"
-                f"DB Updated At: {updated_row['updated_at']}"
+                f"DB Updated At: {updated_at}"
             )
         else:
             return (
                 f"Transaction marked SAFE. Restrictions lifted.\n"
-                f"DB Updated At: {updated_row['updated_at']}"
+                f"DB Updated At: {updated_at}"
             )
 
     except Exception as e:
@@ -242,7 +163,7 @@ class FraudAgent(Agent):
             Follow strict security protocol:
 
             1. Greeting + ask for first name.
-            2. Immediately call lookup_customer(name).
+            2. Immediately call lookup_customer(name). If they give their card's last 4 digits, pass them as card_ending.
             3. Ask for Security Identifier.
             4. If correct → continue. If incorrect → end call politely.
             5. Explain suspicious transaction.
@@ -259,7 +180,7 @@ class FraudAgent(Agent):
 # ======================================================
 
 def prewarm(proc: JobProcess):
-    proc.userdata["vad"] = silero.VAD.load()
+    ModelRegistry.for_process(proc).prewarm()
 
 
 async def entrypoint(ctx: JobContext):
@@ -270,6 +191,8 @@ async def entrypoint(ctx: JobContext):
 
     userdata = Userdata()
 
+    models = ModelRegistry.for_process(ctx.proc)
+
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
         llm=google.LLM(model="gemini-2.5-flash"),
@@ -278,15 +201,15 @@ async def entrypoint(ctx: JobContext):
             style="Conversational",
             text_pacing=True,
         ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
+        turn_detection=models.turn_detector(),
+        vad=models.vad(),
         userdata=userdata,
     )
 
     await session.start(
         agent=FraudAgent(),
         room=ctx.room,
-        room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()),
+        room_input_options=RoomInputOptions(noise_cancellation=models.noise_cancellation()),
     )
 
     await ctx.connect()
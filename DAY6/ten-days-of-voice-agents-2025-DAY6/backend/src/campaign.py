@@ -0,0 +1,232 @@
+"""
+Outbound fraud-alert campaign.
+
+Drains `pending_review` cases from fraud_cases instead of waiting for
+customers to call in. Pending cases sit in an in-memory max-heap keyed by
+exposure: transaction amount, plus RISK_WEIGHT dollars scaled by risk_score
+(see risk.py), plus AGE_WEIGHT dollars for every hour the case has been
+waiting. Age grows at the same rate for every case, so heap order never goes
+stale. New cases are picked up incrementally (id > last seen)
+through the partial pending index.
+
+Up to `concurrency` calls run at once. A case is claimed (pending_review ->
+dialing) with a conditional UPDATE before it is dialled, so several runners can
+share one database without calling a customer twice. Every finished call is
+recorded on its case with FraudRepository.record_call: the new status, one more
+call_attempts and last_call_outcome (the verdict, NO_ANSWER or CALL_FAILED).
+Unanswered and failed calls go back to pending_review for the next run (ids
+already seen are not polled again, so they are not redialled in this one).
+
+`SimulatedCallee` stands in for the phone line. A real dialer only needs to be
+an async callable taking a FraudCase and returning (status, notes), or None for
+no answer.
+
+    python campaign.py --concurrency 50 --time-scale 0.01
+"""
+
+import argparse
+import asyncio
+import heapq
+import random
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+from fraud_repository import PENDING, AsyncFraudRepository, FraudCase, FraudRepository
+
+AGE_WEIGHT = 100.0  # dollars of priority per hour a case has waited
+RISK_WEIGHT = 5000.0  # dollars of priority for a risk_score of 1.0
+REFRESH_INTERVAL = 5.0  # seconds between polls for newly flagged cases
+STALE_CLAIM_MINUTES = 10  # 'dialing' rows older than this are from a crashed runner
+
+NO_ANSWER = "no_answer"
+CALL_FAILED = "failed"  # the dialer raised
+UNRESOLVED = (NO_ANSWER, CALL_FAILED)
+
+Outcome = Optional[Tuple[str, str]]
+Callee = Callable[[FraudCase], Awaitable[Outcome]]
+
+def _epoch(timestamp: Optional[str]) -> float:
+    """Seconds since epoch for a stored timestamp (naive values are UTC)."""
+    try:
+        dt = datetime.fromisoformat(timestamp)
+    except (TypeError, ValueError):
+        return time.time()
+    return (dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)).timestamp()
+
+
+def case_priority(amount: float, created_at: float, risk_score: float = 0.0) -> float:
+    """amount + RISK_WEIGHT * risk + AGE_WEIGHT * age_hours, minus the `now` term common to every case."""
+    return amount + RISK_WEIGHT * risk_score - AGE_WEIGHT * created_at / 3600.0
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+class CampaignMetrics:
+    """Per-minute throughput, backlog depth and time-to-resolution."""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.per_minute: Counter = Counter()
+        self.outcomes: Counter = Counter()
+        self.resolution_times: List[float] = []  # flagged -> resolved, seconds
+        self.call_times: List[float] = []  # dial -> outcome recorded, seconds
+        self.in_flight = 0
+        self.backlog = 0
+
+    def record(self, outcome: str, created_at: float, call_seconds: float):
+        self.per_minute[int((time.monotonic() - self.started) // 60)] += 1
+        self.outcomes[outcome] += 1
+        self.call_times.append(call_seconds)
+        if outcome not in UNRESOLVED:
+            self.resolution_times.append(max(0.0, time.time() - created_at))
+
+    def snapshot(self) -> Dict[str, float]:
+        elapsed = time.monotonic() - self.started
+        resolved = sorted(self.resolution_times)
+        calls = sorted(self.call_times)
+        current_minute = int(elapsed // 60)
+        return {
+            "elapsed_s": round(elapsed, 1),
+            "resolved": len(resolved),
+            "no_answer": self.outcomes[NO_ANSWER],
+            "failed": self.outcomes[CALL_FAILED],
+            "confirmed_fraud": self.outcomes["confirmed_fraud"],
+            "confirmed_safe": self.outcomes["confirmed_safe"],
+            "in_flight": self.in_flight,
+            "backlog": self.backlog,
+            "last_minute_throughput": self.per_minute[current_minute],
+            "avg_per_minute": round(sum(self.per_minute.values()) / max(elapsed / 60, 1 / 60), 1),
+            "ttr_p50_s": round(_percentile(resolved, 0.5), 1),
+            "ttr_p95_s": round(_percentile(resolved, 0.95), 1),
+            "call_p50_s": round(_percentile(calls, 0.5), 2),
+        }
+
+
+class SimulatedCallee:
+    """Local stand-in for the phone line: random answer, verdict and talk time."""
+
+    def __init__(
+        self,
+        answer_rate: float = 0.85,
+        fraud_rate: float = 0.3,
+        talk_time: Tuple[float, float] = (30.0, 120.0),
+        time_scale: float = 1.0,
+        seed: Optional[int] = None,
+    ):
+        self.answer_rate = answer_rate
+        self.fraud_rate = fraud_rate
+        self.talk_time = talk_time
+        self.time_scale = time_scale
+        self._rng = random.Random(seed)
+
+    async def __call__(self, case: FraudCase) -> Outcome:
+        await asyncio.sleep(self._rng.uniform(*self.talk_time) * self.time_scale)
+        if self._rng.random() > self.answer_rate:
+            return None
+        if self._rng.random() < self.fraud_rate:
+            return "confirmed_fraud", f"Outbound call: customer did not make {case.transactionName} charge."
+        return "confirmed_safe", f"Outbound call: customer confirmed {case.transactionName} charge."
+
+
+class CampaignRunner:
+    def __init__(
+        self,
+        callee: Callee,
+        concurrency: int = 20,
+        repository: Optional[FraudRepository] = None,
+        refresh_interval: float = REFRESH_INTERVAL,
+    ):
+        self.callee = callee
+        self.concurrency = concurrency
+        # one database thread serialises every call on the shared connection
+        self.repo = AsyncFraudRepository(repository or FraudRepository())
+        self.refresh_interval = refresh_interval
+        self.metrics = CampaignMetrics()
+        self._heap: List[Tuple[float, int, float]] = []  # (-priority, id, created_at)
+        self._last_id = 0
+
+    async def _fetch_new(self) -> int:
+        """Push pending cases added since the last poll onto the heap, risk-scored."""
+        rows = await self.repo.pending_after(self._last_id)
+        for case_id, amount, risk_score, created_at in rows:
+            created = _epoch(created_at)
+            priority = case_priority(amount or 0.0, created, risk_score or 0.0)
+            heapq.heappush(self._heap, (-priority, case_id, created))
+        if rows:
+            self._last_id = rows[-1][0]
+        self.metrics.backlog = len(self._heap)
+        return len(rows)
+
+    async def _worker(self, stop: asyncio.Event):
+        while not stop.is_set():
+            if not self._heap:
+                await asyncio.sleep(0.05)
+                continue
+            _, case_id, created_at = heapq.heappop(self._heap)
+            self.metrics.backlog = len(self._heap)
+            case = await self.repo.claim(case_id)
+            if case is None:  # resolved inbound or claimed by another runner meanwhile
+                continue
+
+            self.metrics.in_flight += 1
+            dialled = time.monotonic()
+            try:
+                outcome = await self.callee(case)
+                call_outcome = outcome[0] if outcome else NO_ANSWER
+            except Exception as e:
+                print(f"❌ Call for case {case_id} failed: {e}")
+                outcome, call_outcome = None, CALL_FAILED
+            try:
+                if outcome is None:
+                    await self.repo.record_call(case.id, call_outcome, PENDING, case.notes)
+                else:
+                    await self.repo.record_call(case.id, call_outcome, *outcome)
+            finally:
+                self.metrics.in_flight -= 1
+            self.metrics.record(call_outcome, created_at, time.monotonic() - dialled)
+
+    async def run(self, until_drained: bool = True, report_every: float = 60.0) -> Dict[str, float]:
+        """Dial pending cases until the backlog is empty (or forever, polling for new ones)."""
+        stop = asyncio.Event()
+        await self.repo.release_stale_claims(STALE_CLAIM_MINUTES)
+        await self._fetch_new()
+        workers = [asyncio.create_task(self._worker(stop)) for _ in range(self.concurrency)]
+        last_poll = last_report = time.monotonic()
+        try:
+            while True:
+                await asyncio.sleep(0.1)
+                now = time.monotonic()
+                if now - last_poll >= self.refresh_interval:
+                    await self._fetch_new()
+                    last_poll = now
+                if now - last_report >= report_every:
+                    print(f"📈 CAMPAIGN: {self.metrics.snapshot()}")
+                    last_report = now
+                if until_drained and not self._heap and self.metrics.in_flight == 0:
+                    if await self._fetch_new() == 0 and not self._heap:
+                        break
+        finally:
+            stop.set()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return self.metrics.snapshot()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run an outbound fraud-alert campaign")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--time-scale", type=float, default=1.0, help="scale simulated talk time")
+    parser.add_argument("--report-every", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    runner = CampaignRunner(
+        SimulatedCallee(time_scale=args.time_scale, seed=args.seed), concurrency=args.concurrency
+    )
+    summary = asyncio.run(runner.run(report_every=args.report_every))
+    print(f"✅ CAMPAIGN DONE: {summary}")
@@ -1,18 +1,30 @@
 """
 SQLite Database Module for Fraud Alert System
 Handles all database operations for fraud cases
+
+FraudDatabase keeps its original API but stores everything through
+fraud_repository, the same migration-versioned schema the agent uses. Case ids
+here are the external references ("FC001"), held in the case_ref column. A
+fraud_cases.db left by the old standalone schema is imported once on startup.
 """
 
-import sqlite3
-import json
 import os
-from datetime import datetime
-from typing import List, Optional, Dict, Any
 from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+from fraud_repository import (
+    DATABASE_PATH,
+    IMPORT_CHUNK_SIZE,
+    PENDING,
+    AsyncFraudRepository,
+    FraudRepository,
+    ProgressCallback,
+)
+from fraud_repository import FraudCase as StoredCase
 
 # Get absolute path to database file (same directory as this script)
 SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
-DATABASE_PATH = os.path.join(SCRIPT_DIR, "fraud_cases.db")
+LEGACY_DATABASE_PATH = os.path.join(SCRIPT_DIR, "fraud_cases.db")
 
 
 @dataclass
@@ -38,83 +50,40 @@ class FraudCase:
 
 
 class FraudDatabase:
-    """SQLite Database handler for fraud cases"""
+    """SQLite Database handler for fraud cases
+
+    A thin adapter over FraudRepository: one tuned connection per process,
+    indexed lookups, and trigger-maintained status counts for get_statistics.
+    """
 
     def __init__(self, db_path: str = DATABASE_PATH):
         self.db_path = db_path
+        self.repo = FraudRepository(db_path)
         self.init_database()
 
+    def close(self) -> None:
+        self.repo.close()
+
     def init_database(self) -> None:
-        """Initialize the database with fraud cases table"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-
-            # Create fraud cases table
-            cursor.execute(
-                """
-                CREATE TABLE IF NOT EXISTS fraud_cases (
-                    id TEXT PRIMARY KEY,
-                    userName TEXT NOT NULL,
-                    securityIdentifier TEXT,
-                    cardEnding TEXT NOT NULL,
-                    cardType TEXT,
-                    transactionName TEXT,
-                    transactionAmount TEXT,
-                    transactionTime TEXT,
-                    transactionLocation TEXT,
-                    transactionCategory TEXT,
-                    transactionSource TEXT,
-                    status TEXT DEFAULT 'pending',
-                    securityQuestion TEXT,
-                    securityAnswer TEXT,
-                    outcome TEXT DEFAULT 'pending',
-                    outcomeNote TEXT,
-                    createdAt TEXT,
-                    lastUpdated TEXT,
-                    UNIQUE(cardEnding)
-                )
-                """
-            )
+        """Initialize the database (schema migrations run in FraudRepository)"""
+        if self.db_path == DATABASE_PATH and os.path.exists(LEGACY_DATABASE_PATH):
+            count = self.repo.import_cases(LEGACY_DATABASE_PATH, replace=False)
+            os.replace(LEGACY_DATABASE_PATH, LEGACY_DATABASE_PATH + ".migrated")
+            print(f"✅ Imported {count} cases from {os.path.basename(LEGACY_DATABASE_PATH)}")
 
         print("✅ Database initialized successfully")
 
+    def _stored(self, case_id: str) -> Optional[StoredCase]:
+        case = self.repo.get_by_ref(case_id)
+        if case is None and str(case_id).isdigit():
+            case = self.repo.get_case(int(case_id))
+        return case
+
     def add_fraud_case(self, case: FraudCase) -> bool:
         """Add a new fraud case to the database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                cursor.execute(
-                    """
-                    INSERT INTO fraud_cases 
-                    (id, userName, securityIdentifier, cardEnding, cardType, 
-                     transactionName, transactionAmount, transactionTime, 
-                     transactionLocation, transactionCategory, transactionSource,
-                     status, securityQuestion, securityAnswer, outcome, outcomeNote,
-                     createdAt, lastUpdated)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """,
-                    (
-                        case.id,
-                        case.userName,
-                        case.securityIdentifier,
-                        case.cardEnding,
-                        case.cardType,
-                        case.transactionName,
-                        case.transactionAmount,
-                        case.transactionTime,
-                        case.transactionLocation,
-                        case.transactionCategory,
-                        case.transactionSource,
-                        case.status,
-                        case.securityQuestion,
-                        case.securityAnswer,
-                        case.outcome,
-                        case.outcomeNote,
-                        case.createdAt,
-                        datetime.now().isoformat(),
-                    ),
-                )
+            if self.repo.add_case(asdict(case)) is None:
+                raise ValueError(f"case {case.id} already exists")
 
             print(f"✅ Added fraud case: {case.id}")
             return True
@@ -125,20 +94,8 @@ class FraudDatabase:
     def get_fraud_case_by_card(self, card_ending: str) -> Optional[FraudCase]:
         """Get fraud case by card ending digits"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-
-                cursor.execute(
-                    "SELECT * FROM fraud_cases WHERE cardEnding = ?",
-                    (card_ending,),
-                )
-
-                row = cursor.fetchone()
-
-            if row:
-                return self._row_to_fraud_case(row)
-            return None
+            case = self.repo.get_by_card(card_ending)
+            return self._to_fraud_case(case) if case else None
         except Exception as e:
             print(f"❌ Error getting fraud case: {e}")
             return None
@@ -146,20 +103,17 @@ class FraudDatabase:
     def get_fraud_case_by_id(self, case_id: str) -> Optional[FraudCase]:
         """Get fraud case by ID"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-
-                cursor.execute(
-                    "SELECT * FROM fraud_cases WHERE id = ?",
-                    (case_id,),
-                )
-
-                row = cursor.fetchone()
-
-            if row:
-                return self._row_to_fraud_case(row)
+            case = self._stored(case_id)
+            return self._to_fraud_case(case) if case else None
+        except Exception as e:
+            print(f"❌ Error getting fraud case: {e}")
             return None
+
+    def get_fraud_case_by_username(self, username: str) -> Optional[FraudCase]:
+        """Get fraud case by username (case-insensitive)"""
+        try:
+            case = self.repo.find_customer(username)
+            return self._to_fraud_case(case) if case else None
         except Exception as e:
             print(f"❌ Error getting fraud case: {e}")
             return None
@@ -167,14 +121,7 @@ class FraudDatabase:
     def get_all_fraud_cases(self) -> List[FraudCase]:
         """Get all fraud cases from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.row_factory = sqlite3.Row
-                cursor = conn.cursor()
-
-                cursor.execute("SELECT * FROM fraud_cases")
-                rows = cursor.fetchall()
-
-            return [self._row_to_fraud_case(row) for row in rows]
+            return [self._to_fraud_case(case) for case in self.repo.all_cases()]
         except Exception as e:
             print(f"❌ Error getting all fraud cases: {e}")
             return []
@@ -184,17 +131,9 @@ class FraudDatabase:
     ) -> bool:
         """Update fraud case status and outcome"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                cursor.execute(
-                    """
-                    UPDATE fraud_cases 
-                    SET status = ?, outcome = ?, outcomeNote = ?, lastUpdated = ?
-                    WHERE id = ?
-                    """,
-                    (status, outcome, note, datetime.now().isoformat(), case_id),
-                )
+            case = self._stored(case_id)
+            if case is None or self.repo.update_status(case.id, status, note, outcome) is None:
+                raise LookupError(f"no fraud case {case_id}")
 
             print(
                 f"✅ Updated fraud case {case_id}: status={status}, outcome={outcome}"
@@ -207,9 +146,9 @@ class FraudDatabase:
     def delete_fraud_case(self, case_id: str) -> bool:
         """Delete a fraud case"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM fraud_cases WHERE id = ?", (case_id,))
+            case = self._stored(case_id)
+            if case is not None:
+                self.repo.delete_case(case.id)
 
             print(f"✅ Deleted fraud case: {case_id}")
             return True
@@ -220,9 +159,7 @@ class FraudDatabase:
     def clear_all_cases(self) -> bool:
         """Clear all fraud cases from database"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM fraud_cases")
+            self.repo.clear()
 
             print("✅ Cleared all fraud cases")
             return True
@@ -230,18 +167,31 @@ class FraudDatabase:
             print(f"❌ Error clearing database: {e}")
             return False
 
+    def import_cases(
+        self,
+        input_file: str,
+        replace: bool = True,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None,
+    ) -> int:
+        """Load cases from .jsonl/.csv/.json in one transaction (see FraudRepository.import_cases)"""
+        return self.repo.import_cases(input_file, replace, chunk_size, progress)
+
+    def export_cases(
+        self,
+        output_file: str,
+        fmt: Optional[str] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None,
+    ) -> int:
+        """Stream all cases to JSONL, CSV or JSON (see FraudRepository.export_cases)"""
+        return self.repo.export_cases(output_file, fmt, chunk_size, progress)
+
     def export_to_json(self, output_file: str = "fraud_cases_backup.json") -> bool:
         """Export all fraud cases to JSON for backup"""
         try:
-            cases = self.get_all_fraud_cases()
-            data = {
-                "fraud_cases": [asdict(case) for case in cases],
-            }
-
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-
-            print(f"✅ Exported {len(cases)} cases to {output_file}")
+            count = self.export_cases(output_file, fmt="json")
+            print(f"✅ Exported {count} cases to {output_file}")
             return True
         except Exception as e:
             print(f"❌ Error exporting to JSON: {e}")
@@ -250,18 +200,8 @@ class FraudDatabase:
     def import_from_json(self, input_file: str) -> bool:
         """Import fraud cases from JSON file"""
         try:
-            with open(input_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            self.clear_all_cases()
-
-            for case_data in data.get("fraud_cases", []):
-                case = FraudCase(**case_data)
-                self.add_fraud_case(case)
-
-            print(
-                f"✅ Imported {len(data.get('fraud_cases', []))} cases from {input_file}"
-            )
+            count = self.import_cases(input_file)
+            print(f"✅ Imported {count} cases from {input_file}")
             return True
         except Exception as e:
             print(f"❌ Error importing from JSON: {e}")
@@ -270,60 +210,45 @@ class FraudDatabase:
     def get_statistics(self) -> Dict[str, Any]:
         """Get database statistics"""
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-
-                cursor.execute("SELECT COUNT(*) FROM fraud_cases")
-                total = cursor.fetchone()[0]
-
-                cursor.execute(
-                    "SELECT COUNT(*) FROM fraud_cases WHERE status = 'confirmed_fraud'"
-                )
-                fraud_count = cursor.fetchone()[0]
-
-                cursor.execute(
-                    "SELECT COUNT(*) FROM fraud_cases WHERE status = 'confirmed_safe'"
-                )
-                safe_count = cursor.fetchone()[0]
-
-                cursor.execute(
-                    "SELECT COUNT(*) FROM fraud_cases WHERE status = 'pending'"
-                )
-                pending_count = cursor.fetchone()[0]
+            counts = self.repo.statistics()
 
             return {
-                "total_cases": total,
-                "confirmed_fraud": fraud_count,
-                "confirmed_safe": safe_count,
-                "pending": pending_count,
+                "total_cases": sum(counts.values()),
+                "confirmed_fraud": counts.get("confirmed_fraud", 0),
+                "confirmed_safe": counts.get("confirmed_safe", 0),
+                "pending": counts.get(PENDING, 0),
             }
         except Exception as e:
             print(f"❌ Error getting statistics: {e}")
             return {}
 
     @staticmethod
-    def _row_to_fraud_case(row: sqlite3.Row) -> FraudCase:
-        """Convert database row to FraudCase object"""
+    def _to_fraud_case(case: StoredCase) -> FraudCase:
+        """Convert a repository case to this module's FraudCase"""
         return FraudCase(
-            id=row["id"],
-            userName=row["userName"],
-            securityIdentifier=row["securityIdentifier"],
-            cardEnding=row["cardEnding"],
-            cardType=row["cardType"],
-            transactionName=row["transactionName"],
-            transactionAmount=row["transactionAmount"],
-            transactionTime=row["transactionTime"],
-            transactionLocation=row["transactionLocation"],
-            transactionCategory=row["transactionCategory"],
-            transactionSource=row["transactionSource"],
-            status=row["status"],
-            securityQuestion=row["securityQuestion"],
-            securityAnswer=row["securityAnswer"],
-            createdAt=row["createdAt"],
-            outcome=row["outcome"],
-            outcomeNote=row["outcomeNote"] if row["outcomeNote"] else "",
+            id=case.case_ref or str(case.id),
+            userName=case.userName,
+            securityIdentifier=case.securityIdentifier,
+            cardEnding=case.cardEnding,
+            cardType=case.cardType,
+            transactionName=case.transactionName,
+            transactionAmount=case.transactionAmount,
+            transactionTime=case.transactionTime,
+            transactionLocation=case.transactionLocation,
+            transactionCategory=case.transactionCategory,
+            transactionSource=case.transactionSource,
+            status="pending" if case.case_status == PENDING else case.case_status,
+            securityQuestion=case.securityQuestion,
+            securityAnswer=case.securityAnswer,
+            createdAt=case.created_at,
+            outcome=case.outcome,
+            outcomeNote=case.notes if case.notes else "",
         )
 
 
+# Awaitable facade for agent tools: ``await async_db.get_fraud_case_by_card("4242")``
+AsyncFraudDatabase = AsyncFraudRepository
+
 # Initialize database instance
 db = FraudDatabase()
+async_db = AsyncFraudDatabase(db)
@@ -0,0 +1,646 @@
+"""
+Fraud case repository shared by the agent, database.py, the campaign runner and risk.py.
+
+There is one fraud_cases schema, evolved by the ordered steps in MIGRATIONS
+(the applied count is kept in PRAGMA user_version). A table still in
+database.py's old standalone layout is converted on first open. Each process
+holds one tuned connection (WAL, synchronous=NORMAL, statement cache) behind a
+lock.
+AsyncFraudRepository runs every call on a single database thread, so agent
+tools never block the event loop on SQLite.
+
+Indexes follow the hot queries:
+  idx_fraud_cases_name_card   identity lookup, userName is COLLATE NOCASE
+  idx_fraud_cases_card        lookup by card ending alone
+  idx_fraud_cases_ref         external case ids (e.g. "FC001"), unique
+  idx_fraud_cases_pending     campaign polling, pending rows only
+  idx_fraud_cases_risk        riskiest pending cases first
+  idx_fraud_cases_unparsed    rows risk.ingest_new still has to parse
+Per-status counts live in fraud_case_stats, kept current by triggers for
+single-row writes and recounted once after bulk imports and deletes.
+"""
+
+import asyncio
+import contextlib
+import csv
+import functools
+import itertools
+import json
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, fields
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import risk
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DATABASE_PATH = os.path.join(SCRIPT_DIR, "fraud_db.sqlite")
+
+PENDING = "pending_review"
+LEGACY_STATUSES = {"pending": PENDING}  # database.py's FraudDatabase said "pending"
+
+IMPORT_CHUNK_SIZE = 5000
+ProgressCallback = Callable[[int], None]
+
+
+@dataclass
+class FraudCase:
+    userName: str
+    securityIdentifier: str
+    cardEnding: str
+    transactionName: str
+    transactionAmount: str
+    transactionTime: str
+    transactionSource: str
+    case_status: str = PENDING
+    notes: str = ""
+    id: Optional[int] = None
+    case_ref: Optional[str] = None
+    cardType: Optional[str] = None
+    transactionLocation: Optional[str] = None
+    transactionCategory: Optional[str] = None
+    securityQuestion: Optional[str] = None
+    securityAnswer: Optional[str] = None
+    outcome: str = "pending"
+    call_attempts: int = 0
+    last_call_outcome: Optional[str] = None
+    risk_score: Optional[float] = None
+    created_at: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
+_CASE_FIELDS = tuple(f.name for f in fields(FraudCase))
+
+# Stored (not derived) columns, in insert/export order
+CASE_COLUMNS = (
+    "id", "case_ref", "userName", "securityIdentifier", "cardEnding", "cardType",
+    "transactionName", "transactionAmount", "transactionTime", "transactionLocation",
+    "transactionCategory", "transactionSource", "securityQuestion", "securityAnswer",
+    "case_status", "outcome", "notes", "call_attempts", "last_call_outcome",
+    "created_at", "updated_at",
+)
+INSERT_CASE_SQL = (
+    f"INSERT OR IGNORE INTO fraud_cases ({', '.join(CASE_COLUMNS)}) "
+    f"VALUES ({', '.join('?' * len(CASE_COLUMNS))})"
+)
+
+# database.py's FraudCase field names -> repository columns
+_LEGACY_KEYS = {"status": "case_status", "outcomeNote": "notes", "createdAt": "created_at", "lastUpdated": "updated_at"}
+
+
+def _utc_now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _case_values(record: Dict[str, Any], now: str) -> tuple:
+    """Row tuple in CASE_COLUMNS order from a repository or legacy FraudDatabase record."""
+    record = {_LEGACY_KEYS.get(k, k): v for k, v in record.items()}
+    case_id = record.get("id")
+    if isinstance(case_id, str) and not case_id.isdigit():
+        # legacy text ids ("FC001") become case_ref; the row gets a fresh integer id
+        record.setdefault("case_ref", case_id)
+        record["id"] = None
+    status = record.get("case_status") or PENDING
+    record["case_status"] = LEGACY_STATUSES.get(status, status)
+    record["outcome"] = record.get("outcome") or "pending"
+    record["notes"] = record.get("notes") or ""
+    record["call_attempts"] = int(record.get("call_attempts") or 0)
+    record["created_at"] = record.get("created_at") or now
+    record["updated_at"] = record.get("updated_at") or now
+    return tuple(
+        record.get(column) or None if column in ("id", "case_ref", "last_call_outcome") else record.get(column)
+        for column in CASE_COLUMNS
+    )
+
+
+def _row_to_case(row: sqlite3.Row) -> FraudCase:
+    keys = row.keys()
+    return FraudCase(**{name: row[name] for name in _CASE_FIELDS if name in keys})
+
+
+def _iter_case_records(input_file: str) -> Iterator[Dict[str, Any]]:
+    """Stream records from .jsonl, .csv or another SQLite file; .json (one document) is loaded whole."""
+    ext = os.path.splitext(input_file)[1].lower()
+    if ext in (".db", ".sqlite", ".sqlite3"):
+        source = sqlite3.connect(input_file)
+        source.row_factory = sqlite3.Row
+        try:
+            for row in source.execute("SELECT * FROM fraud_cases"):
+                yield dict(row)
+        finally:
+            source.close()
+        return
+    with open(input_file, "r", encoding="utf-8", newline="") as f:
+        if ext == ".jsonl":
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        elif ext == ".csv":
+            yield from csv.DictReader(f)
+        else:
+            data = json.load(f)
+            yield from (data.get("fraud_cases", []) if isinstance(data, dict) else data)
+
+
+# ------------------------------------------------------------------
+# Schema
+# ------------------------------------------------------------------
+
+FRAUD_CASES_DDL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        userName TEXT NOT NULL COLLATE NOCASE,
+        securityIdentifier TEXT,
+        cardEnding TEXT,
+        transactionName TEXT,
+        transactionAmount TEXT,
+        transactionTime TEXT,
+        transactionSource TEXT,
+        case_status TEXT DEFAULT 'pending_review',
+        notes TEXT DEFAULT '',
+        created_at TEXT DEFAULT (datetime('now')),
+        updated_at TEXT DEFAULT (datetime('now'))
+    )
+"""
+
+
+# Columns of FRAUD_CASES_DDL, the layout every migration step starts from
+BASE_COLUMNS = (
+    "id", "userName", "securityIdentifier", "cardEnding", "transactionName",
+    "transactionAmount", "transactionTime", "transactionSource", "case_status",
+    "notes", "created_at", "updated_at",
+)
+LEGACY_TABLE = "fraud_cases_legacy"
+
+
+def _table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def _set_aside_legacy_table(conn: sqlite3.Connection) -> bool:
+    """Rename a fraud_cases table in database.py's old standalone layout out of the way.
+
+    That layout (text ids, status/createdAt/lastUpdated, ...) cannot be migrated
+    column by column; its rows are re-inserted through _case_values once the
+    current schema exists. Returns whether there was such a table.
+    """
+    if "lastUpdated" not in _table_columns(conn, "fraud_cases"):
+        return False
+    conn.execute(f"ALTER TABLE fraud_cases RENAME TO {LEGACY_TABLE}")
+    conn.execute(FRAUD_CASES_DDL.format(table="fraud_cases"))
+    return True
+
+
+def _import_legacy_table(conn: sqlite3.Connection) -> int:
+    cursor = conn.execute(f"SELECT * FROM {LEGACY_TABLE}")
+    names = [d[0] for d in cursor.description]
+    now = _utc_now()
+    with _stats_recounted(conn):
+        inserted = conn.executemany(
+            INSERT_CASE_SQL, (_case_values(dict(zip(names, row)), now) for row in cursor)
+        ).rowcount
+    conn.execute(f"DROP TABLE {LEGACY_TABLE}")
+    return inserted
+
+
+# Keep fraud_case_stats current for single-row writes; bulk writes go through
+# _stats_recounted instead of paying one counter update per row.
+STATS_TRIGGERS = {
+    "fraud_case_stats_ins": """
+        CREATE TRIGGER IF NOT EXISTS fraud_case_stats_ins AFTER INSERT ON fraud_cases
+        BEGIN
+            INSERT INTO fraud_case_stats (status, n) VALUES (COALESCE(NEW.case_status, ''), 1)
+            ON CONFLICT(status) DO UPDATE SET n = n + 1;
+        END
+    """,
+    "fraud_case_stats_del": """
+        CREATE TRIGGER IF NOT EXISTS fraud_case_stats_del AFTER DELETE ON fraud_cases
+        BEGIN
+            UPDATE fraud_case_stats SET n = n - 1 WHERE status = COALESCE(OLD.case_status, '');
+        END
+    """,
+    "fraud_case_stats_upd": """
+        CREATE TRIGGER IF NOT EXISTS fraud_case_stats_upd AFTER UPDATE OF case_status ON fraud_cases
+        WHEN OLD.case_status IS NOT NEW.case_status
+        BEGIN
+            UPDATE fraud_case_stats SET n = n - 1 WHERE status = COALESCE(OLD.case_status, '');
+            INSERT INTO fraud_case_stats (status, n) VALUES (COALESCE(NEW.case_status, ''), 1)
+            ON CONFLICT(status) DO UPDATE SET n = n + 1;
+        END
+    """,
+}
+
+
+def _recount_stats(conn: sqlite3.Connection) -> None:
+    conn.execute("DELETE FROM fraud_case_stats")
+    conn.execute(
+        "INSERT INTO fraud_case_stats (status, n) "
+        "SELECT COALESCE(case_status, ''), COUNT(*) FROM fraud_cases GROUP BY 1"
+    )
+
+
+@contextlib.contextmanager
+def _stats_recounted(conn: sqlite3.Connection) -> Iterator[None]:
+    """Run a bulk write with the stats triggers dropped, then recount once.
+
+    Everything happens in one write transaction: no other writer can slip in
+    while the triggers are gone, and a rollback brings them back.
+    """
+    if not conn.in_transaction:
+        conn.execute("BEGIN IMMEDIATE")
+    for name in STATS_TRIGGERS:
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    yield
+    _recount_stats(conn)
+    for sql in STATS_TRIGGERS.values():
+        conn.execute(sql)
+
+
+def _v1_nocase_names(conn: sqlite3.Connection):
+    # case-insensitive names so lookups can use an index instead of LOWER() scans
+    table_sql = conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'fraud_cases'"
+    ).fetchone()[0]
+    if "COLLATE NOCASE" not in table_sql:
+        conn.execute(FRAUD_CASES_DDL.format(table="fraud_cases_v1"))
+        columns = ", ".join(c for c in BASE_COLUMNS if c in _table_columns(conn, "fraud_cases"))
+        conn.execute(f"INSERT INTO fraud_cases_v1 ({columns}) SELECT {columns} FROM fraud_cases")
+        conn.execute("DROP TABLE fraud_cases")
+        conn.execute("ALTER TABLE fraud_cases_v1 RENAME TO fraud_cases")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fraud_cases_name_card ON fraud_cases (userName, cardEnding)"
+    )
+
+
+def _v2_pending_index(conn: sqlite3.Connection):
+    # the outbound campaign polls pending cases by id; only those rows are indexed
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fraud_cases_pending "
+        "ON fraud_cases (id) WHERE case_status = 'pending_review'"
+    )
+
+
+def _v3_risk_columns(conn: sqlite3.Connection):
+    # parsed amount/time and risk score (filled by risk.ingest_new / score_pending)
+    for column in (
+        "amount_usd REAL",
+        "txn_time_utc TEXT",
+        "txn_local_hour INTEGER",
+        "source_risk REAL",
+        "risk_score REAL",
+    ):
+        conn.execute(f"ALTER TABLE fraud_cases ADD COLUMN {column}")
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_fraud_cases_unparsed ON fraud_cases (id) WHERE amount_usd IS NULL"
+    )
+    conn.execute(risk.RISK_INDEX_SQL)
+
+
+def _v4_case_details(conn: sqlite3.Connection):
+    # fields that only database.py's schema had, plus trigger-maintained status counts
+    for column in (
+        "case_ref TEXT",
+        "cardType TEXT",
+        "transactionLocation TEXT",
+        "transactionCategory TEXT",
+        "securityQuestion TEXT",
+        "securityAnswer TEXT",
+        "outcome TEXT DEFAULT 'pending'",
+    ):
+        conn.execute(f"ALTER TABLE fraud_cases ADD COLUMN {column}")
+    conn.execute(
+        "CREATE UNIQUE INDEX IF NOT EXISTS idx_fraud_cases_ref ON fraud_cases (case_ref) "
+        "WHERE case_ref IS NOT NULL"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_fraud_cases_card ON fraud_cases (cardEnding)")
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS fraud_case_stats (status TEXT PRIMARY KEY, n INTEGER NOT NULL DEFAULT 0)"
+    )
+    for sql in STATS_TRIGGERS.values():
+        conn.execute(sql)
+    _recount_stats(conn)
+
+
+def _v5_call_history(conn: sqlite3.Connection):
+    # outbound campaign: how often a case was dialled and how the last call ended
+    conn.execute("ALTER TABLE fraud_cases ADD COLUMN call_attempts INTEGER NOT NULL DEFAULT 0")
+    conn.execute("ALTER TABLE fraud_cases ADD COLUMN last_call_outcome TEXT")
+
+
+# Append only: step N brings user_version N-1 up to N
+MIGRATIONS: Sequence[Callable[[sqlite3.Connection], None]] = (
+    _v1_nocase_names,
+    _v2_pending_index,
+    _v3_risk_columns,
+    _v4_case_details,
+    _v5_call_history,
+)
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(conn: sqlite3.Connection) -> Tuple[int, int]:
+    """Apply pending MIGRATIONS in one transaction; returns (from_version, to_version)."""
+    conn.execute(FRAUD_CASES_DDL.format(table="fraud_cases"))
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version >= SCHEMA_VERSION:
+        return version, version
+
+    # IMMEDIATE takes the write lock up front, so concurrent workers migrate one at a time
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        legacy = version == 0 and _set_aside_legacy_table(conn)
+        for step in MIGRATIONS[version:]:
+            step(conn)
+        if legacy:
+            print(f"✅ Converted {_import_legacy_table(conn)} cases from the old FraudDatabase schema")
+        conn.execute(f"PRAGMA user_version = {max(version, SCHEMA_VERSION)}")
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return version, max(version, SCHEMA_VERSION)
+
+
+# ------------------------------------------------------------------
+# Repository
+# ------------------------------------------------------------------
+
+
+class FraudRepository:
+    """All fraud_cases reads and writes, over one long-lived connection per process."""
+
+    def __init__(self, db_path: str = DATABASE_PATH):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn_pid = None
+        self._conn_handle = None
+        with self._lock:
+            before, after = migrate(self._conn)
+        if before < after:
+            print(f"✅ Fraud DB schema migrated v{before} -> v{after}")
+
+    @property
+    def _conn(self) -> sqlite3.Connection:
+        """Shared connection; reopened in a forked child process."""
+        if self._conn_handle is None or self._conn_pid != os.getpid():
+            conn = sqlite3.connect(self.db_path, timeout=10.0, check_same_thread=False, cached_statements=256)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            conn.execute("PRAGMA cache_size=-16000")
+            self._conn_handle, self._conn_pid = conn, os.getpid()
+        return self._conn_handle
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn_handle is not None and self._conn_pid == os.getpid():
+                self._conn_handle.close()
+            self._conn_handle = None
+
+    # -- lookups --------------------------------------------------
+
+    def find_customer(self, name: str, card_ending: Optional[str] = None) -> Optional[FraudCase]:
+        """Case for this caller: the riskiest pending one, else the latest."""
+        # both forms are seeks on idx_fraud_cases_name_card (userName is COLLATE NOCASE)
+        order = "ORDER BY case_status = 'pending_review' DESC, risk_score DESC, id DESC LIMIT 1"
+        with self._lock:
+            if card_ending:
+                row = self._conn.execute(
+                    f"SELECT * FROM fraud_cases WHERE userName = ? AND cardEnding = ? {order}",
+                    (name.strip(), card_ending.strip()[-4:]),
+                ).fetchone()
+            else:
+                row = self._conn.execute(
+                    f"SELECT * FROM fraud_cases WHERE userName = ? {order}", (name.strip(),)
+                ).fetchone()
+        return _row_to_case(row) if row else None
+
+    def get_case(self, case_id: int) -> Optional[FraudCase]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM fraud_cases WHERE id = ?", (case_id,)).fetchone()
+        return _row_to_case(row) if row else None
+
+    def get_by_ref(self, case_ref: str) -> Optional[FraudCase]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM fraud_cases WHERE case_ref = ?", (case_ref,)).fetchone()
+        return _row_to_case(row) if row else None
+
+    def get_by_card(self, card_ending: str) -> Optional[FraudCase]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT * FROM fraud_cases WHERE cardEnding = ? ORDER BY id DESC LIMIT 1", (card_ending,)
+            ).fetchone()
+        return _row_to_case(row) if row else None
+
+    def all_cases(self) -> List[FraudCase]:
+        with self._lock:
+            rows = self._conn.execute("SELECT * FROM fraud_cases ORDER BY id").fetchall()
+        return [_row_to_case(row) for row in rows]
+
+    def statistics(self) -> Dict[str, int]:
+        """Case count per status, from the trigger-maintained counters."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, n FROM fraud_case_stats WHERE n > 0").fetchall()
+        return {status: n for status, n in rows}
+
+    # -- writes ---------------------------------------------------
+
+    def add_case(self, record: Dict[str, Any]) -> Optional[int]:
+        """Insert one case (repository or legacy field names); None if its case_ref exists."""
+        with self._lock, self._conn as conn:
+            cur = conn.execute(INSERT_CASE_SQL, _case_values(record, _utc_now()))
+        return cur.lastrowid if cur.rowcount == 1 else None
+
+    def seed_if_empty(self, records: Sequence[Dict[str, Any]]) -> int:
+        with self._lock, self._conn as conn:
+            if conn.execute("SELECT 1 FROM fraud_cases LIMIT 1").fetchone():
+                return 0
+            now = _utc_now()
+            with _stats_recounted(conn):
+                conn.executemany(INSERT_CASE_SQL, [_case_values(r, now) for r in records])
+        return len(records)
+
+    def update_status(
+        self, case_id: int, status: str, notes: str, outcome: Optional[str] = None
+    ) -> Optional[str]:
+        """Record a case outcome by row id; returns the new updated_at (None if no such case)."""
+        with self._lock, self._conn as conn:
+            cur = conn.execute(
+                "UPDATE fraud_cases SET case_status = ?, notes = ?, outcome = COALESCE(?, outcome), "
+                "updated_at = datetime('now') WHERE id = ?",
+                (LEGACY_STATUSES.get(status, status), notes, outcome, case_id),
+            )
+            if cur.rowcount != 1:
+                return None
+            return conn.execute("SELECT updated_at FROM fraud_cases WHERE id = ?", (case_id,)).fetchone()[0]
+
+    def delete_case(self, case_id: int) -> bool:
+        with self._lock, self._conn as conn:
+            return conn.execute("DELETE FROM fraud_cases WHERE id = ?", (case_id,)).rowcount == 1
+
+    def clear(self) -> None:
+        with self._lock, self._conn as conn, _stats_recounted(conn):
+            conn.execute("DELETE FROM fraud_cases")
+
+    # -- outbound campaign ----------------------------------------
+
+    def pending_after(self, last_id: int) -> List[Tuple[int, Optional[float], Optional[float], str]]:
+        """(id, amount_usd, risk_score, created_at) of pending cases with id > last_id, scoring new rows first."""
+        with self._lock:
+            risk.refresh(self._conn)
+            rows = self._conn.execute(
+                "SELECT id, amount_usd, risk_score, created_at FROM fraud_cases "
+                "WHERE case_status = 'pending_review' AND id > ? ORDER BY id",
+                (last_id,),
+            ).fetchall()
+        return [tuple(r) for r in rows]
+
+    def claim(self, case_id: int) -> Optional[FraudCase]:
+        """pending_review -> dialing; None if the case was resolved or claimed meanwhile."""
+        with self._lock, self._conn as conn:
+            cur = conn.execute(
+                "UPDATE fraud_cases SET case_status = 'dialing', updated_at = datetime('now') "
+                "WHERE id = ? AND case_status = 'pending_review'",
+                (case_id,),
+            )
+            if cur.rowcount != 1:
+                return None
+            row = conn.execute("SELECT * FROM fraud_cases WHERE id = ?", (case_id,)).fetchone()
+        return _row_to_case(row)
+
+    def record_call(self, case_id: int, call_outcome: str, status: str, notes: str) -> Optional[str]:
+        """Close an outbound call: set the case status, count the attempt and keep its outcome.
+
+        `call_outcome` is the verdict for answered calls, else "no_answer" or
+        "failed". Returns the new updated_at (None if no such case).
+        """
+        with self._lock, self._conn as conn:
+            cur = conn.execute(
+                "UPDATE fraud_cases SET case_status = ?, notes = ?, call_attempts = call_attempts + 1, "
+                "last_call_outcome = ?, updated_at = datetime('now') WHERE id = ?",
+                (LEGACY_STATUSES.get(status, status), notes, call_outcome, case_id),
+            )
+            if cur.rowcount != 1:
+                return None
+            return conn.execute("SELECT updated_at FROM fraud_cases WHERE id = ?", (case_id,)).fetchone()[0]
+
+    def release_stale_claims(self, older_than_minutes: int) -> int:
+        """Return 'dialing' cases left behind by a crashed runner to pending_review."""
+        with self._lock, self._conn as conn:
+            return conn.execute(
+                "UPDATE fraud_cases SET case_status = 'pending_review' "
+                "WHERE case_status = 'dialing' AND updated_at < datetime('now', ?)",
+                (f"-{older_than_minutes} minutes",),
+            ).rowcount
+
+    # -- risk -----------------------------------------------------
+
+    def refresh_risk(self, force: bool = False) -> int:
+        """Parse new rows and rescore pending cases if any are unscored (or `force`)."""
+        with self._lock:
+            return risk.refresh(self._conn, force=force)
+
+    # -- bulk import / export -------------------------------------
+
+    def import_cases(
+        self,
+        input_file: str,
+        replace: bool = True,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None,
+    ) -> int:
+        """Load cases from .jsonl/.csv/.json/.sqlite in one transaction, `chunk_size` rows per executemany.
+
+        With `replace` the table is emptied first (in the same transaction, so a
+        failed load leaves the old data in place). Rows whose id or case_ref
+        already exists are skipped. Returns the number of rows inserted.
+        """
+        now = _utc_now()
+        records = _iter_case_records(input_file)
+        seen = inserted = 0
+        with self._lock, self._conn as conn, _stats_recounted(conn):
+            if replace:
+                conn.execute("DELETE FROM fraud_cases")
+            while True:
+                chunk = [_case_values(r, now) for r in itertools.islice(records, chunk_size)]
+                if not chunk:
+                    break
+                inserted += conn.executemany(INSERT_CASE_SQL, chunk).rowcount
+                seen += len(chunk)
+                if progress:
+                    progress(seen)
+        return inserted
+
+    def export_cases(
+        self,
+        output_file: str,
+        fmt: Optional[str] = None,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        progress: Optional[ProgressCallback] = None,
+    ) -> int:
+        """Stream all cases to JSONL, CSV or JSON (picked from the extension) with bounded memory.
+
+        Reads through its own connection, so a long export doesn't hold up the
+        shared one (WAL lets it read a consistent snapshot alongside writers).
+        """
+        fmt = (fmt or os.path.splitext(output_file)[1].lstrip(".") or "jsonl").lower()
+        reader = sqlite3.connect(self.db_path)
+        reader.row_factory = sqlite3.Row
+        written = 0
+        try:
+            cursor = reader.execute(f"SELECT {', '.join(CASE_COLUMNS)} FROM fraud_cases ORDER BY id")
+            with open(output_file, "w", encoding="utf-8", newline="") as f:
+                csv_writer = None
+                if fmt == "csv":
+                    csv_writer = csv.writer(f)
+                    csv_writer.writerow(CASE_COLUMNS)
+                elif fmt == "json":
+                    f.write('{\n  "fraud_cases": [')
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    if csv_writer is not None:
+                        csv_writer.writerows(tuple(r) for r in rows)
+                    elif fmt == "json":
+                        sep = ",\n    " if written else "\n    "
+                        f.write(sep + ",\n    ".join(json.dumps(dict(r), ensure_ascii=False) for r in rows))
+                    else:
+                        f.writelines(json.dumps(dict(r), ensure_ascii=False) + "\n" for r in rows)
+                    written += len(rows)
+                    if progress:
+                        progress(written)
+                if fmt == "json":
+                    f.write("\n  ]\n}\n")
+        finally:
+            reader.close()
+        return written
+
+
+class AsyncFraudRepository:
+    """Awaitable facade for agent tools: ``await async_repo.find_customer("John")``.
+
+    Every call runs on one dedicated database thread, so the shared connection
+    is never used from the event loop.
+    """
+
+    def __init__(self, repository: Any):
+        self.repository = repository
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="fraud-db")
+
+    def __getattr__(self, name: str):
+        attr = getattr(self.repository, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(attr, *args, **kwargs))
+
+        return call
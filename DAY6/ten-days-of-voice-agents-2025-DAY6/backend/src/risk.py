@@ -0,0 +1,200 @@
+"""
+Risk scoring for pending fraud cases.
+
+fraud_cases keeps transactionAmount ("$2,100.00") and transactionTime
+("4:15 AM PST") as free text. `ingest_new` parses them once into amount_usd,
+txn_time_utc ("HH:MM") and txn_local_hour, and classifies transactionSource
+into source_risk. It only touches rows not parsed yet (found through a partial
+index on amount_usd IS NULL), and repeated strings are parsed once.
+
+`score_pending` scores every pending case in one vectorised pass and writes
+risk_score in [0, 1]:
+
+    0.5 * sigmoid(amount z-score)     amount vs. all parsed cases
+  + 0.2 * odd hour                    local time between 23:00 and 06:00
+  + 0.3 * source_risk                 category of transactionSource/Name
+
+    python risk.py            # ingest + score the shared fraud database
+"""
+
+import re
+import sqlite3
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+AMOUNT_WEIGHT = 0.5
+ODD_HOUR_WEIGHT = 0.2
+SOURCE_WEIGHT = 0.3
+ODD_HOURS = (23, 6)  # [23:00, 06:00) local time
+
+TZ_OFFSETS_MIN = {
+    "UTC": 0, "GMT": 0, "Z": 0, "BST": 60, "CET": 60, "CEST": 120, "IST": 330,
+    "EST": -300, "EDT": -240, "CST": -360, "CDT": -300,
+    "MST": -420, "MDT": -360, "PST": -480, "PDT": -420,
+}
+
+# First matching keyword (in source, then name) sets the category risk
+SOURCE_RISK = (
+    ("crypto", 0.95),
+    ("wire", 0.85),
+    ("transfer", 0.8),
+    ("gift", 0.8),
+    ("atm", 0.6),
+    (".com", 0.5),
+    ("online", 0.5),
+    ("pos", 0.2),
+    ("store", 0.2),
+)
+DEFAULT_SOURCE_RISK = 0.4
+
+_AMOUNT_RE = re.compile(r"[-+]?\d[\d,]*(?:\.\d+)?")
+_TIME_RE = re.compile(r"(\d{1,2})(?::(\d{2}))?\s*([AaPp]\.?[Mm]\.?)?\s*([A-Za-z]{1,4})?")
+
+INGEST_CHUNK_SIZE = 10000
+
+RISK_INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS idx_fraud_cases_risk "
+    "ON fraud_cases (risk_score DESC) WHERE case_status = 'pending_review'"
+)
+
+
+def parse_amount(text: Optional[str]) -> float:
+    """'$2,100.00' -> 2100.0 (0.0 if there is no number)."""
+    match = _AMOUNT_RE.search(text or "")
+    return float(match.group().replace(",", "")) if match else 0.0
+
+
+def parse_time(text: Optional[str]) -> Tuple[Optional[str], Optional[int]]:
+    """'4:15 AM PST' -> ('12:15', 4): UTC 'HH:MM' and local hour (None, None if unparseable)."""
+    match = _TIME_RE.search(text or "")
+    if not match:
+        return None, None
+    hour, minute = int(match.group(1)), int(match.group(2) or 0)
+    meridiem = (match.group(3) or "").lower()
+    if meridiem.startswith("p") and hour < 12:
+        hour += 12
+    elif meridiem.startswith("a") and hour == 12:
+        hour = 0
+    if hour > 23 or minute > 59:
+        return None, None
+    offset = TZ_OFFSETS_MIN.get((match.group(4) or "UTC").upper(), 0)
+    utc = (hour * 60 + minute - offset) % (24 * 60)
+    return f"{utc // 60:02d}:{utc % 60:02d}", hour
+
+
+def source_risk(source: Optional[str], name: Optional[str] = None) -> float:
+    for text in (source, name):
+        text = (text or "").lower()
+        for keyword, risk in SOURCE_RISK:
+            if keyword in text:
+                return risk
+    return DEFAULT_SOURCE_RISK
+
+
+def _tuple_cursor(conn: sqlite3.Connection) -> sqlite3.Cursor:
+    # plain tuples: building sqlite3.Row objects costs more than the scoring itself
+    cur = conn.cursor()
+    cur.row_factory = None
+    return cur
+
+
+def ingest_new(conn: sqlite3.Connection) -> int:
+    """Fill the parsed columns for rows that don't have them yet; returns rows parsed."""
+    amounts: Dict[str, float] = {}
+    times: Dict[str, Tuple[Optional[str], Optional[int]]] = {}
+    sources: Dict[Tuple[str, str], float] = {}
+    parsed = 0
+    cur = _tuple_cursor(conn)
+    cur.execute(
+        "SELECT id, transactionAmount, transactionTime, transactionSource, transactionName "
+        "FROM fraud_cases WHERE amount_usd IS NULL ORDER BY id"
+    )
+    while True:
+        rows = cur.fetchmany(INGEST_CHUNK_SIZE)
+        if not rows:
+            break
+        updates = []
+        for case_id, amount_text, time_text, source, name in rows:
+            if amount_text not in amounts:
+                amounts[amount_text] = parse_amount(amount_text)
+            if time_text not in times:
+                times[time_text] = parse_time(time_text)
+            if (source, name) not in sources:
+                sources[source, name] = source_risk(source, name)
+            updates.append((amounts[amount_text], *times[time_text], sources[source, name], case_id))
+        conn.executemany(
+            "UPDATE fraud_cases SET amount_usd = ?, txn_time_utc = ?, txn_local_hour = ?, source_risk = ? "
+            "WHERE id = ?",
+            updates,
+        )
+        parsed += len(updates)
+    conn.commit()
+    return parsed
+
+
+def score_pending(conn: sqlite3.Connection) -> int:
+    """Score every pending case in one pass; returns the number scored."""
+    count, mean, mean_sq = conn.execute(
+        "SELECT COUNT(*), AVG(amount_usd), AVG(amount_usd * amount_usd) "
+        "FROM fraud_cases WHERE amount_usd IS NOT NULL"
+    ).fetchone()
+    rows = _tuple_cursor(conn).execute(
+        "SELECT id, amount_usd, txn_local_hour, source_risk "
+        "FROM fraud_cases WHERE case_status = 'pending_review'"
+    ).fetchall()
+    if not rows:
+        return 0
+
+    # NULL (row not ingested yet) arrives as nan
+    data = np.array(rows, dtype=np.float64)
+    ids = data[:, 0].astype(np.int64)
+    amounts = np.nan_to_num(data[:, 1], nan=0.0)
+    hours = np.nan_to_num(data[:, 2], nan=-1.0)
+    source_part = np.nan_to_num(data[:, 3], nan=DEFAULT_SOURCE_RISK)
+
+    std = float(np.sqrt(max(mean_sq - mean * mean, 0.0))) if count else 0.0
+    z = (amounts - mean) / std if std > 0 else np.zeros_like(amounts)
+    amount_part = 1.0 / (1.0 + np.exp(-z))
+
+    start, end = ODD_HOURS
+    odd_part = ((hours >= start) | ((hours >= 0) & (hours < end))).astype(np.float64)
+
+    scores = AMOUNT_WEIGHT * amount_part + ODD_HOUR_WEIGHT * odd_part + SOURCE_WEIGHT * source_part
+
+    # Updating through idx_fraud_cases_risk costs a random b-tree write per row; rebuilding
+    # it once after the bulk write is several times faster. Readers keep their WAL snapshot
+    # (index included) until this transaction commits.
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        conn.execute("DROP INDEX IF EXISTS idx_fraud_cases_risk")
+        conn.executemany(
+            "UPDATE fraud_cases SET risk_score = ? WHERE id = ?",
+            zip(np.round(scores, 4).tolist(), ids.tolist()),
+        )
+        conn.execute(RISK_INDEX_SQL)
+        conn.commit()
+    except BaseException:
+        conn.rollback()
+        raise
+    return len(ids)
+
+
+def refresh(conn: sqlite3.Connection, force: bool = False) -> int:
+    """Ingest new rows and rescore pending cases if any are unscored (or `force`)."""
+    ingest_new(conn)
+    stale = conn.execute(
+        "SELECT 1 FROM fraud_cases WHERE case_status = 'pending_review' AND risk_score IS NULL LIMIT 1"
+    ).fetchone()
+    return score_pending(conn) if force or stale else 0
+
+
+if __name__ == "__main__":
+    from fraud_repository import FraudRepository
+
+    repo = FraudRepository()
+    started = time.perf_counter()
+    scored = repo.refresh_risk(force=True)
+    print(f"✅ Scored {scored} pending cases in {time.perf_counter() - started:.2f}s")
+    repo.close()
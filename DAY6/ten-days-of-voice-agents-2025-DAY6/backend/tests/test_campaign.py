@@ -0,0 +1,80 @@
+import pytest
+
+from campaign import CALL_FAILED, NO_ANSWER, CampaignRunner, case_priority
+from fraud_repository import PENDING, FraudRepository
+
+
+def _case(name: str) -> dict:
+    return {
+        "userName": name,
+        "securityIdentifier": "12345",
+        "cardEnding": "4242",
+        "transactionName": f"{name} Store",
+        "transactionAmount": "$100.00",
+        "transactionTime": "10:00 AM UTC",
+        "transactionSource": "web",
+    }
+
+
+class ScriptedCallee:
+    """Answers per customer name; raising stands in for a broken dialer."""
+
+    def __init__(self, script):
+        self.script = script
+
+    async def __call__(self, case):
+        result = self.script[case.userName]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+async def test_each_call_records_outcome_and_attempt(tmp_path) -> None:
+    repo = FraudRepository(str(tmp_path / "fraud.sqlite"))
+    repo.seed_if_empty([_case("Fraud"), _case("Safe"), _case("Silent"), _case("Broken")])
+    callee = ScriptedCallee(
+        {
+            "Fraud": ("confirmed_fraud", "customer did not make it"),
+            "Safe": ("confirmed_safe", "customer made it"),
+            "Silent": None,
+            "Broken": RuntimeError("line dropped"),
+        }
+    )
+
+    summary = await CampaignRunner(callee, concurrency=2, repository=repo, refresh_interval=0.05).run()
+
+    cases = {c.userName: c for c in repo.all_cases()}
+    assert {name: (c.case_status, c.last_call_outcome, c.call_attempts) for name, c in cases.items()} == {
+        "Fraud": ("confirmed_fraud", "confirmed_fraud", 1),
+        "Safe": ("confirmed_safe", "confirmed_safe", 1),
+        "Silent": (PENDING, NO_ANSWER, 1),
+        "Broken": (PENDING, CALL_FAILED, 1),
+    }
+    assert summary["resolved"] == 2
+    assert summary["no_answer"] == 1 and summary["failed"] == 1
+
+    # a later run redials the unresolved cases and counts the second attempt
+    callee.script["Broken"] = ("confirmed_safe", "reached on retry")
+    await CampaignRunner(callee, concurrency=2, repository=repo, refresh_interval=0.05).run()
+    broken = repo.get_case(cases["Broken"].id)
+    assert (broken.case_status, broken.last_call_outcome, broken.call_attempts) == ("confirmed_safe", "confirmed_safe", 2)
+    assert repo.get_case(cases["Silent"].id).call_attempts == 2
+    repo.close()
+
+
+async def test_cases_added_mid_run_are_risk_scored_before_queueing(tmp_path) -> None:
+    repo = FraudRepository(str(tmp_path / "fraud.sqlite"))
+    repo.seed_if_empty([_case("Early")])
+    runner = CampaignRunner(ScriptedCallee({}), repository=repo)
+    assert await runner._fetch_new() == 1
+
+    late = dict(_case("Late"), transactionAmount="$9,500.00", transactionTime="3:00 AM UTC")
+    late_id = repo.add_case(late)
+    assert await runner._fetch_new() == 1
+
+    queued = {case_id: (-neg_priority, created) for neg_priority, case_id, created in runner._heap}
+    scored = repo.get_case(late_id)
+    assert scored.risk_score is not None and scored.risk_score > 0
+    priority, created = queued[late_id]
+    assert priority == pytest.approx(case_priority(9500.0, created, scored.risk_score))
+    repo.close()
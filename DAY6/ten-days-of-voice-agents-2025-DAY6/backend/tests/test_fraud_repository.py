@@ -0,0 +1,166 @@
+import json
+import os
+import shutil
+import sqlite3
+
+import pytest
+
+import fraud_repository
+from fraud_repository import MIGRATIONS, FraudRepository
+
+BASELINE_DB = os.path.join(os.path.dirname(fraud_repository.__file__), "fraud_db.sqlite")
+
+
+def _columns(conn: sqlite3.Connection) -> set:
+    return {row[1] for row in conn.execute("PRAGMA table_info(fraud_cases)")}
+
+
+def _indexes(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+@pytest.fixture
+def baseline_db(tmp_path):
+    """Copy of the committed database, which predates every migration (user_version 0)."""
+    path = str(tmp_path / "fraud_db.sqlite")
+    shutil.copyfile(BASELINE_DB, path)
+    conn = sqlite3.connect(path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == 0
+    conn.close()
+    return path
+
+
+def test_baseline_database_migrates_to_latest(baseline_db) -> None:
+    before = sqlite3.connect(baseline_db)
+    rows = before.execute("SELECT id, userName, cardEnding FROM fraud_cases ORDER BY id").fetchall()
+    counts = dict(before.execute("SELECT case_status, COUNT(*) FROM fraud_cases GROUP BY 1").fetchall())
+    before.close()
+
+    repo = FraudRepository(baseline_db)
+    conn = repo._conn
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    assert {"amount_usd", "risk_score", "case_ref", "securityQuestion", "outcome", "call_attempts", "last_call_outcome"} <= _columns(conn)
+    assert {
+        "idx_fraud_cases_name_card",
+        "idx_fraud_cases_pending",
+        "idx_fraud_cases_unparsed",
+        "idx_fraud_cases_risk",
+        "idx_fraud_cases_ref",
+        "idx_fraud_cases_card",
+    } <= _indexes(conn)
+
+    # rows survive the v1 table rebuild and names now match case-insensitively
+    assert [(c.id, c.userName, c.cardEnding) for c in repo.all_cases()] == rows
+    _, name, card = rows[0]
+    assert repo.find_customer(name.upper(), card).id == rows[0][0]
+    assert repo.statistics() == counts
+    repo.close()
+
+
+def test_migrated_database_is_not_migrated_again(baseline_db, capsys) -> None:
+    FraudRepository(baseline_db).close()
+    assert "migrated v0 ->" in capsys.readouterr().out
+
+    reopened = FraudRepository(baseline_db)
+    assert capsys.readouterr().out == ""
+    assert fraud_repository.migrate(reopened._conn) == (len(MIGRATIONS), len(MIGRATIONS))
+    reopened.close()
+
+
+def test_new_database_starts_at_latest(tmp_path) -> None:
+    repo = FraudRepository(str(tmp_path / "new.sqlite"))
+    assert repo._conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    assert repo.statistics() == {}
+    repo.close()
+
+
+def _case(name: str, status: str = "pending_review") -> dict:
+    return {
+        "userName": name,
+        "securityIdentifier": "12345",
+        "cardEnding": "4242",
+        "transactionName": "Store",
+        "transactionAmount": "$10.00",
+        "transactionTime": "10:00 AM UTC",
+        "transactionSource": "web",
+        "case_status": status,
+    }
+
+
+def _triggers(conn: sqlite3.Connection) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+
+def test_bulk_writes_recount_stats_once(tmp_path) -> None:
+    source = tmp_path / "cases.jsonl"
+    source.write_text(
+        "\n".join(json.dumps(_case(f"user{i}", "pending" if i % 3 else "confirmed_fraud")) for i in range(30)),
+        encoding="utf-8",
+    )
+    repo = FraudRepository(str(tmp_path / "fraud.sqlite"))
+    repo.seed_if_empty([_case("Seed")])
+
+    assert repo.import_cases(str(source), chunk_size=7) == 30
+    assert repo.statistics() == {"pending_review": 20, "confirmed_fraud": 10}
+    assert _triggers(repo._conn) == set(fraud_repository.STATS_TRIGGERS)
+
+    # single-row writes are still counted by the triggers
+    case_id = repo.add_case(_case("Late"))
+    repo.update_status(case_id, "confirmed_safe", "customer confirmed")
+    assert repo.statistics() == {"pending_review": 20, "confirmed_fraud": 10, "confirmed_safe": 1}
+
+    repo.clear()
+    assert repo.statistics() == {}
+    repo.close()
+
+
+def test_failed_import_keeps_data_stats_and_triggers(tmp_path) -> None:
+    source = tmp_path / "cases.jsonl"
+    source.write_text(json.dumps(_case("Ok")) + "\n{not json\n", encoding="utf-8")
+    repo = FraudRepository(str(tmp_path / "fraud.sqlite"))
+    repo.seed_if_empty([_case("Seed"), _case("Other", "confirmed_safe")])
+
+    with pytest.raises(json.JSONDecodeError):
+        repo.import_cases(str(source))
+
+    assert [c.userName for c in repo.all_cases()] == ["Seed", "Other"]
+    assert repo.statistics() == {"pending_review": 1, "confirmed_safe": 1}
+    assert _triggers(repo._conn) == set(fraud_repository.STATS_TRIGGERS)
+    repo.close()
+
+
+LEGACY_DDL = """
+    CREATE TABLE fraud_cases (
+        id TEXT PRIMARY KEY, userName TEXT NOT NULL, securityIdentifier TEXT,
+        cardEnding TEXT NOT NULL, cardType TEXT, transactionName TEXT,
+        transactionAmount TEXT, transactionTime TEXT, transactionLocation TEXT,
+        transactionCategory TEXT, transactionSource TEXT, status TEXT DEFAULT 'pending',
+        securityQuestion TEXT, securityAnswer TEXT, outcome TEXT DEFAULT 'pending',
+        outcomeNote TEXT, createdAt TEXT, lastUpdated TEXT, UNIQUE(cardEnding)
+    )
+"""
+
+
+def test_old_fraud_database_schema_is_converted_in_place(tmp_path) -> None:
+    path = str(tmp_path / "fraud_cases.db")
+    conn = sqlite3.connect(path)
+    conn.execute(LEGACY_DDL)
+    conn.executemany(
+        "INSERT INTO fraud_cases VALUES (?, ?, '1234', ?, 'Visa', 'Store', '$5.00', '9:00 PM EST', "
+        "'NYC', 'retail', 'web', ?, 'Pet?', 'Rex', 'pending', ?, '2024-01-01 10:00:00', '2024-01-02 10:00:00')",
+        [("FC001", "John", "4242", "pending", ""), ("FC002", "Mary", "1111", "confirmed_fraud", "blocked")],
+    )
+    conn.commit()
+    conn.close()
+
+    repo = FraudRepository(path)
+    assert repo._conn.execute("PRAGMA user_version").fetchone()[0] == len(MIGRATIONS)
+    assert fraud_repository.LEGACY_TABLE not in {
+        row[0] for row in repo._conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+    }
+    john = repo.get_by_ref("FC001")
+    assert (john.userName, john.cardType, john.securityAnswer, john.case_status) == ("John", "Visa", "Rex", "pending_review")
+    assert repo.get_by_ref("FC002").notes == "blocked"
+    assert repo.find_customer("mary", "1111").case_ref == "FC002"
+    assert repo.statistics() == {"pending_review": 1, "confirmed_fraud": 1}
+    repo.close()
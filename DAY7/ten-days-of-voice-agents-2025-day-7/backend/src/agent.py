@@ -18,10 +18,9 @@ import logging
 import os
 import sqlite3
 import uuid
-import asyncio
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import List, Optional, Annotated
+from typing import Callable, Dict, List, Optional, Annotated, Tuple
 
 from dotenv import load_dotenv
 from pydantic import Field
@@ -37,8 +36,13 @@ from livekit.agents import (
     RunContext,
 )
 
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.plugins import murf, google, deepgram
+
+from catalog_index import CatalogIndex
+from db_pool import SQLitePool
+from delivery_scheduler import DeliveryScheduler, sqlite_now
+from model_registry import ModelRegistry
+from order_events import OrderStatusBus, OrderStatusEvent
 
 # -------------------------
 # Logging
@@ -69,104 +73,128 @@ def get_db_path() -> str:
     return os.path.join(base, DB_FILE)
 
 
-def get_conn():
-    path = get_db_path()
-    # check_same_thread=False required for async background tasks accessing DB
-    conn = sqlite3.connect(path, check_same_thread=False)
-    conn.row_factory = sqlite3.Row
-    conn.execute("PRAGMA foreign_keys = ON;")
-    return conn
+# Long-lived WAL connections; queries run on the pool's threads, off the event loop
+db = SQLitePool(get_db_path())
 
 
 def seed_database():
     """Create tables and seed the Indian catalog if empty."""
     try:
-        conn = get_conn()
-        cur = conn.cursor()
-
-        # Create catalog table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS catalog (
-                id TEXT PRIMARY KEY,
-                name TEXT NOT NULL,
-                category TEXT,
-                price REAL NOT NULL,
-                brand TEXT,
-                size TEXT,
-                units TEXT,
-                tags TEXT -- JSON encoded list
-            )
-        """)
-
-        # Orders table
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS orders (
-                order_id TEXT PRIMARY KEY,
-                timestamp TEXT,
-                total REAL,
-                customer_name TEXT,
-                address TEXT,
-                status TEXT DEFAULT 'received',
-                created_at TEXT DEFAULT (datetime('now')),
-                updated_at TEXT DEFAULT (datetime('now'))
-            )
-        """)
-
-        # Order items
-        cur.execute("""
-            CREATE TABLE IF NOT EXISTS order_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                order_id TEXT,
-                item_id TEXT,
-                name TEXT,
-                unit_price REAL,
-                quantity INTEGER,
-                notes TEXT,
-                FOREIGN KEY(order_id) REFERENCES orders(order_id) ON DELETE CASCADE
-            )
-        """)
-
-        # Check if catalog empty
-        cur.execute("SELECT COUNT(1) FROM catalog")
-        if cur.fetchone()[0] == 0:
-            catalog = [
-                # Dairy
-                ("milk-amul-1l", "Amul Taaza Milk", "Dairy", 72.00, "Amul", "1L", "pack", json.dumps(["dairy", "essential"])),
-                ("paneer-200g", "Amul Malai Paneer", "Dairy", 95.00, "Amul", "200g", "pack", json.dumps(["dairy", "protein", "veg"])),
-                ("butter-100g", "Amul Butter", "Dairy", 58.00, "Amul", "100g", "pack", json.dumps(["dairy"])),
-                ("curd-400g", "Mother Dairy Dahi", "Dairy", 40.00, "Mother Dairy", "400g", "cup", json.dumps(["dairy"])),
-                
-                # Staples/Pantry
-                ("atta-5kg", "Aashirvaad Whole Wheat Atta", "Staples", 245.00, "Aashirvaad", "5kg", "bag", json.dumps(["flour", "roti"])),
-                ("rice-basmati-1kg", "India Gate Basmati Rice", "Staples", 160.00, "India Gate", "1kg", "bag", json.dumps(["rice", "premium"])),
-                ("dal-toor-1kg", "Tata Sampann Toor Dal", "Staples", 185.00, "Tata", "1kg", "pack", json.dumps(["protein", "dal"])),
-                ("salt-1kg", "Tata Salt", "Staples", 28.00, "Tata", "1kg", "pack", json.dumps(["essential"])),
-                ("sugar-1kg", "Madhur Sugar", "Staples", 60.00, "Madhur", "1kg", "pack", json.dumps(["sweet"])),
-                
-                # Snacks & Instant
-                ("maggi-masala", "Maggi 2-Minute Noodles", "Instant Food", 14.00, "Nestle", "70g", "pack", json.dumps(["snack", "noodles"])),
-                ("biscuits-marie", "Britannia Marie Gold", "Snacks", 35.00, "Britannia", "250g", "pack", json.dumps(["tea-time"])),
-                ("chips-lays", "Lays Magic Masala", "Snacks", 20.00, "Lays", "50g", "pack", json.dumps(["snack", "spicy"])),
-                ("tea-250g", "Red Label Tea", "Beverages", 140.00, "Brooke Bond", "250g", "pack", json.dumps(["chai", "tea"])),
-                
-                # Veggies (Market Price estimates)
-                ("potato-1kg", "Fresh Potatoes", "Vegetables", 40.00, "", "1kg", "kg", json.dumps(["veg"])),
-                ("onion-1kg", "Fresh Onions", "Vegetables", 55.00, "", "1kg", "kg", json.dumps(["veg"])),
-                ("tomato-1kg", "Fresh Tomatoes", "Vegetables", 60.00, "", "1kg", "kg", json.dumps(["veg"])),
-                ("ginger-100g", "Fresh Ginger", "Vegetables", 20.00, "", "100g", "g", json.dumps(["veg", "chai"])),
-            ]
-            cur.executemany("""
-                INSERT INTO catalog (id, name, category, price, brand, size, units, tags)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """, catalog)
-            conn.commit()
-            logger.info(f"✅ Seeded Indian catalog into {get_db_path()}")
-
-        conn.close()
+        with db.connection() as conn:
+            _seed_tables(conn)
     except Exception as e:
         logger.exception("Failed to seed database: %s", e)
 
 
+def _seed_tables(conn: sqlite3.Connection):
+    """Create tables and insert the catalog rows on an empty database."""
+    cur = conn.cursor()
+
+    # Create catalog table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS catalog (
+            id TEXT PRIMARY KEY,
+            name TEXT NOT NULL,
+            category TEXT,
+            price REAL NOT NULL,
+            brand TEXT,
+            size TEXT,
+            units TEXT,
+            tags TEXT -- JSON encoded list
+        )
+    """)
+
+    # Case-insensitive id lookups (recipe expansion) use this instead of a table scan
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_catalog_id_lower ON catalog(LOWER(id))")
+
+    # Change log feeding incremental refreshes of the in-memory catalog index;
+    # rows are deleted once an index has applied them
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS catalog_changes (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            item_id TEXT NOT NULL
+        )
+    """)
+    cur.executescript("""
+        CREATE TRIGGER IF NOT EXISTS catalog_changes_ins AFTER INSERT ON catalog BEGIN
+            INSERT INTO catalog_changes (item_id) VALUES (NEW.id);
+        END;
+        CREATE TRIGGER IF NOT EXISTS catalog_changes_upd AFTER UPDATE ON catalog BEGIN
+            INSERT INTO catalog_changes (item_id) VALUES (OLD.id);
+            INSERT INTO catalog_changes (item_id) SELECT NEW.id WHERE NEW.id != OLD.id;
+        END;
+        CREATE TRIGGER IF NOT EXISTS catalog_changes_del AFTER DELETE ON catalog BEGIN
+            INSERT INTO catalog_changes (item_id) VALUES (OLD.id);
+        END;
+    """)
+
+    # Orders table
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS orders (
+            order_id TEXT PRIMARY KEY,
+            timestamp TEXT,
+            total REAL,
+            customer_name TEXT,
+            address TEXT,
+            status TEXT DEFAULT 'received',
+            created_at TEXT DEFAULT (datetime('now')),
+            updated_at TEXT DEFAULT (datetime('now'))
+        )
+    """)
+
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status)")
+
+    # Order items
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS order_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id TEXT,
+            item_id TEXT,
+            name TEXT,
+            unit_price REAL,
+            quantity INTEGER,
+            notes TEXT,
+            FOREIGN KEY(order_id) REFERENCES orders(order_id) ON DELETE CASCADE
+        )
+    """)
+
+    # Check if catalog empty
+    cur.execute("SELECT COUNT(1) FROM catalog")
+    if cur.fetchone()[0] == 0:
+        catalog = [
+            # Dairy
+            ("milk-amul-1l", "Amul Taaza Milk", "Dairy", 72.00, "Amul", "1L", "pack", json.dumps(["dairy", "essential"])),
+            ("paneer-200g", "Amul Malai Paneer", "Dairy", 95.00, "Amul", "200g", "pack", json.dumps(["dairy", "protein", "veg"])),
+            ("butter-100g", "Amul Butter", "Dairy", 58.00, "Amul", "100g", "pack", json.dumps(["dairy"])),
+            ("curd-400g", "Mother Dairy Dahi", "Dairy", 40.00, "Mother Dairy", "400g", "cup", json.dumps(["dairy"])),
+            
+            # Staples/Pantry
+            ("atta-5kg", "Aashirvaad Whole Wheat Atta", "Staples", 245.00, "Aashirvaad", "5kg", "bag", json.dumps(["flour", "roti"])),
+            ("rice-basmati-1kg", "India Gate Basmati Rice", "Staples", 160.00, "India Gate", "1kg", "bag", json.dumps(["rice", "premium"])),
+            ("dal-toor-1kg", "Tata Sampann Toor Dal", "Staples", 185.00, "Tata", "1kg", "pack", json.dumps(["protein", "dal"])),
+            ("salt-1kg", "Tata Salt", "Staples", 28.00, "Tata", "1kg", "pack", json.dumps(["essential"])),
+            ("sugar-1kg", "Madhur Sugar", "Staples", 60.00, "Madhur", "1kg", "pack", json.dumps(["sweet"])),
+            
+            # Snacks & Instant
+            ("maggi-masala", "Maggi 2-Minute Noodles", "Instant Food", 14.00, "Nestle", "70g", "pack", json.dumps(["snack", "noodles"])),
+            ("biscuits-marie", "Britannia Marie Gold", "Snacks", 35.00, "Britannia", "250g", "pack", json.dumps(["tea-time"])),
+            ("chips-lays", "Lays Magic Masala", "Snacks", 20.00, "Lays", "50g", "pack", json.dumps(["snack", "spicy"])),
+            ("tea-250g", "Red Label Tea", "Beverages", 140.00, "Brooke Bond", "250g", "pack", json.dumps(["chai", "tea"])),
+            
+            # Veggies (Market Price estimates)
+            ("potato-1kg", "Fresh Potatoes", "Vegetables", 40.00, "", "1kg", "kg", json.dumps(["veg"])),
+            ("onion-1kg", "Fresh Onions", "Vegetables", 55.00, "", "1kg", "kg", json.dumps(["veg"])),
+            ("tomato-1kg", "Fresh Tomatoes", "Vegetables", 60.00, "", "1kg", "kg", json.dumps(["veg"])),
+            ("ginger-100g", "Fresh Ginger", "Vegetables", 20.00, "", "100g", "g", json.dumps(["veg", "chai"])),
+        ]
+        cur.executemany("""
+            INSERT INTO catalog (id, name, category, price, brand, size, units, tags)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, catalog)
+        conn.commit()
+        logger.info(f"✅ Seeded Indian catalog into {get_db_path()}")
+
+
 # Seed DB on import/run (safe to call multiple times)
 seed_database()
 
@@ -183,21 +211,15 @@ class CartItem:
 
 @dataclass
 class Userdata:
-    cart: List[CartItem] = field(default_factory=list)
+    cart: Dict[str, CartItem] = field(default_factory=dict)  # keyed by lowercased item id
     customer_name: Optional[str] = None
+    order_subscriptions: Dict[str, Callable[[], None]] = field(default_factory=dict)  # order id -> unsubscribe
 
 # -------------------------
 # DB Helpers
 # -------------------------
 
-def find_catalog_item_by_id_db(item_id: str) -> Optional[dict]:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM catalog WHERE LOWER(id) = LOWER(?) LIMIT 1", (item_id,))
-    row = cur.fetchone()
-    conn.close()
-    if not row:
-        return None
+def _catalog_record(row: sqlite3.Row) -> dict:
     record = dict(row)
     try:
         record["tags"] = json.loads(record.get("tags") or "[]")
@@ -206,80 +228,141 @@ def find_catalog_item_by_id_db(item_id: str) -> Optional[dict]:
     return record
 
 
-def search_catalog_by_name_db(query: str) -> List[dict]:
-    q = f"%{query.lower()}%"
-    conn = get_conn()
+@db.offload
+def find_catalog_item_by_id_db(conn: sqlite3.Connection, item_id: str) -> Optional[dict]:
     cur = conn.cursor()
-    cur.execute("""
-        SELECT * FROM catalog
-        WHERE LOWER(name) LIKE ? OR LOWER(tags) LIKE ?
-        LIMIT 50
-    """, (q, q))
-    rows = cur.fetchall()
-    conn.close()
-    results = []
-    for r in rows:
-        rec = dict(r)
-        try:
-            rec["tags"] = json.loads(rec.get("tags") or "[]")
-        except Exception:
-            rec["tags"] = []
-        results.append(rec)
-    return results
+    cur.execute("SELECT * FROM catalog WHERE LOWER(id) = LOWER(?) LIMIT 1", (item_id,))
+    row = cur.fetchone()
+    if not row:
+        return None
+    return _catalog_record(row)
 
 
-def insert_order_db(order_id: str, timestamp: str, total: float, customer_name: str, address: str, status: str, items: List[CartItem]):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO orders (order_id, timestamp, total, customer_name, address, status, created_at, updated_at)
-        VALUES (?, ?, ?, ?, ?, ?, datetime('now'), datetime('now'))
-    """, (order_id, timestamp, total, customer_name, address, status))
-    for ci in items:
+@db.offload
+def find_catalog_items_by_ids_db(conn: sqlite3.Connection, item_ids: List[str]) -> Dict[str, dict]:
+    """Resolve many catalog ids, case-insensitively, with a single indexed query. Returns {lowercased id: record}."""
+    keys = list(dict.fromkeys(i.lower() for i in item_ids))
+    if not keys:
+        return {}
+    placeholders = ",".join("?" * len(keys))
+    rows = conn.execute(f"SELECT * FROM catalog WHERE LOWER(id) IN ({placeholders})", keys).fetchall()
+    return {r["id"].lower(): _catalog_record(r) for r in rows}
+
+
+@db.offload
+def load_catalog_changes_db(conn: sqlite3.Connection, since_seq: Optional[int]) -> Tuple[int, List[dict], Optional[List[str]]]:
+    """Return (latest change seq, upserted records, removed ids) since `since_seq`.
+
+    removed is None when the records are the whole catalog: on first load, or when
+    changes after `since_seq` were already pruned by another process.
+    """
+    # sqlite_sequence keeps the highest seq ever issued, even after pruning
+    row = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'catalog_changes'").fetchone()
+    latest = row[0] if row else 0
+    first = conn.execute("SELECT MIN(seq) FROM catalog_changes").fetchone()[0] or latest + 1
+    if since_seq is None or since_seq + 1 < first:
+        return latest, [_catalog_record(r) for r in conn.execute("SELECT * FROM catalog")], None
+    if latest == since_seq:
+        return latest, [], []
+    ids = [r[0] for r in conn.execute(
+        "SELECT DISTINCT item_id FROM catalog_changes WHERE seq > ? AND seq <= ?", (since_seq, latest)
+    )]
+    found = {}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        placeholders = ",".join("?" * len(chunk))
+        for r in conn.execute(f"SELECT * FROM catalog WHERE id IN ({placeholders})", chunk):
+            found[r["id"]] = _catalog_record(r)
+    return latest, list(found.values()), [i for i in ids if i not in found]
+
+
+@db.offload
+def prune_catalog_changes_db(conn: sqlite3.Connection, upto_seq: int) -> int:
+    """Drop change rows up to `upto_seq`, already applied to the index; returns rows deleted."""
+    with conn:
+        return conn.execute("DELETE FROM catalog_changes WHERE seq <= ?", (upto_seq,)).rowcount
+
+
+@db.offload
+def insert_order_db(conn: sqlite3.Connection, order_id: str, timestamp: str, total: float, customer_name: str, address: str, status: str, items: List[CartItem]) -> str:
+    """Insert the order and its lines; returns the updated_at written."""
+    stamp = sqlite_now()
+    with conn:
+        cur = conn.cursor()
         cur.execute("""
+            INSERT INTO orders (order_id, timestamp, total, customer_name, address, status, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (order_id, timestamp, total, customer_name, address, status, stamp, stamp))
+        cur.executemany("""
             INSERT INTO order_items (order_id, item_id, name, unit_price, quantity, notes)
             VALUES (?, ?, ?, ?, ?, ?)
-        """, (order_id, ci.item_id, ci.name, ci.unit_price, ci.quantity, ci.notes))
-    conn.commit()
-    conn.close()
+        """, [(order_id, ci.item_id, ci.name, ci.unit_price, ci.quantity, ci.notes) for ci in items])
+    return stamp
 
 
-def get_order_db(order_id: str) -> Optional[dict]:
-    conn = get_conn()
+@db.offload
+def get_order_db(conn: sqlite3.Connection, order_id: str) -> Optional[dict]:
     cur = conn.cursor()
     cur.execute("SELECT * FROM orders WHERE order_id = ? LIMIT 1", (order_id,))
     o = cur.fetchone()
     if not o:
-        conn.close()
         return None
     order = dict(o)
     cur.execute("SELECT * FROM order_items WHERE order_id = ?", (order_id,))
     items = [dict(r) for r in cur.fetchall()]
-    conn.close()
     order["items"] = items
     return order
 
 
-def list_orders_db(limit: int = 10, customer_name: Optional[str] = None) -> List[dict]:
-    conn = get_conn()
+@db.offload
+def list_orders_db(conn: sqlite3.Connection, limit: int = 10, customer_name: Optional[str] = None) -> List[dict]:
     cur = conn.cursor()
     if customer_name:
         cur.execute("SELECT * FROM orders WHERE LOWER(customer_name) = LOWER(?) ORDER BY created_at DESC LIMIT ?", (customer_name, limit))
     else:
         cur.execute("SELECT * FROM orders ORDER BY created_at DESC LIMIT ?", (limit,))
     rows = [dict(r) for r in cur.fetchall()]
-    conn.close()
     return rows
 
 
-def update_order_status_db(order_id: str, new_status: str) -> bool:
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("UPDATE orders SET status = ?, updated_at = datetime('now') WHERE order_id = ?", (new_status, order_id))
-    changed = cur.rowcount
-    conn.commit()
-    conn.close()
-    return changed > 0
+@db.offload
+def update_order_status_db(conn: sqlite3.Connection, order_id: str, new_status: str) -> Optional[str]:
+    """Set the status; returns the updated_at written, or None if there is no such order."""
+    stamp = sqlite_now()
+    with conn:
+        cur = conn.execute("UPDATE orders SET status = ?, updated_at = ? WHERE order_id = ?", (new_status, stamp, order_id))
+        changed = cur.rowcount
+    return stamp if changed > 0 else None
+
+# -------------------------
+# Catalog search index
+# -------------------------
+# Built once per process, then kept current from the catalog_changes log
+catalog_index = CatalogIndex()
+_catalog_seq: Optional[int] = None
+
+
+def _apply_catalog_changes(changes: Tuple[int, List[dict], Optional[List[str]]]) -> bool:
+    """Bring the index up to date; returns True if it moved to a newer change seq."""
+    global _catalog_seq
+    seq, upserted, removed = changes
+    advanced = seq != _catalog_seq
+    if removed is None:
+        catalog_index.replace_all(upserted)
+        logger.info(f"📇 Indexed {len(catalog_index)} catalog items")
+    else:
+        for item_id in removed:
+            catalog_index.remove(item_id)
+        for record in upserted:
+            catalog_index.upsert(record)
+    _catalog_seq = seq
+    return advanced
+
+
+async def refresh_catalog_index():
+    if _apply_catalog_changes(await load_catalog_changes_db(_catalog_seq)):
+        # applied; other processes that fall behind the pruned range reload in full
+        await prune_catalog_changes_db(_catalog_seq)
 
 # -------------------------
 # LOGIC & ASYNC SIMULATION
@@ -317,56 +400,60 @@ def _parse_servings_from_text(text: str) -> int:
 
 
 def _infer_items_from_tags(query: str, max_results: int = 6) -> List[str]:
-    """Try to infer catalog items by matching query words to tags in the catalog. Returns list of item_ids."""
-    words = re.findall(r"\w+", (query or "").lower())
-    found = []
-    conn = get_conn()
-    cur = conn.cursor()
-    for w in words:
-        if len(found) >= max_results:
-            break
-        q = f"%\"{w}\"%"
-        cur.execute("SELECT * FROM catalog WHERE LOWER(tags) LIKE ? OR LOWER(name) LIKE ? LIMIT 10", (q, f"%{w}%"))
-        rows = cur.fetchall()
-        for r in rows:
-            rid = r["id"]
-            if rid not in found:
-                found.append(rid)
-                if len(found) >= max_results:
-                    break
-    conn.close()
-    return found
+    """Try to infer catalog items by matching query words to names and tags in the catalog index. Returns list of item_ids."""
+    return [it["id"] for it in catalog_index.search(query, limit=max_results)]
 
 STATUS_FLOW = ["received", "confirmed", "shipped", "out_for_delivery", "delivered"]
+TERMINAL_STATUSES = ("delivered", "cancelled")
 
+# Every status write is published here; sessions subscribe to their own orders
+order_bus = OrderStatusBus(terminal_statuses=TERMINAL_STATUSES)
 
-async def simulate_delivery_flow(order_id: str):
-    """
-    Background task: automatically advances order status every 5 seconds.
-    Flow: received -> confirmed -> shipped -> out_for_delivery -> delivered
-    """
-    logger.info(f"🔄 [Simulation] Started tracking simulation for {order_id}")
 
-    # initial wait
-    await asyncio.sleep(5)
+# One heap-driven loop per worker advances every open order (replaces a task per order)
+delivery_scheduler = DeliveryScheduler(db, STATUS_FLOW, interval=5.0, on_status=order_bus.publish)
 
-    # Loop through statuses starting from index 1 (confirmed)
-    for next_status in STATUS_FLOW[1:]:
-        # Check if order was cancelled in the meantime
-        curr_order = get_order_db(order_id)
-        if curr_order and curr_order.get("status") == "cancelled":
-            logger.info(f"🛑 [Simulation] Order {order_id} was cancelled. Stopping simulation.")
-            return
 
-        update_order_status_db(order_id, next_status)
-        logger.info(f"🚚 [Simulation] Order {order_id} updated to '{next_status}'")
-        await asyncio.sleep(5)
+def _track_order(ctx: RunContext[Userdata], order_id: str):
+    """Subscribe this session to an order so status changes are spoken as they happen."""
+    subscriptions = ctx.userdata.order_subscriptions
+    if order_id in subscriptions:
+        return
+    session = ctx.session
+
+    def _announce(ev: OrderStatusEvent):
+        if ev.status in TERMINAL_STATUSES:
+            subscriptions.pop(ev.order_id, None)
+        try:
+            session.say(f"Quick update: your order {ev.order_id} is now {ev.status.replace('_', ' ')}.", allow_interruptions=True)
+        except RuntimeError:
+            logger.warning(f"Could not announce status of {ev.order_id}; session is closed")
+
+    subscriptions[order_id] = order_bus.subscribe(order_id, _announce)
+
+
+def cart_total(cart: Dict[str, CartItem]) -> float:
+    return round(sum(ci.unit_price * ci.quantity for ci in cart.values()), 2)
 
-    logger.info(f"✅ [Simulation] Order {order_id} simulation complete (Delivered).")
 
+async def expand_into_cart(cart: Dict[str, CartItem], item_ids: List[str], quantity: int) -> Tuple[List[str], float]:
+    """Add `quantity` of every id to the cart, resolving all ids in one query.
 
-def cart_total(cart: List[CartItem]) -> float:
-    return round(sum(ci.unit_price * ci.quantity for ci in cart), 2)
+    Returns the names that were added (unknown ids are skipped) and the new cart total.
+    """
+    items = await find_catalog_items_by_ids_db(item_ids)
+    added = []
+    for key in dict.fromkeys(i.lower() for i in item_ids):
+        item = items.get(key)
+        if not item:
+            continue
+        ci = cart.get(key)
+        if ci:
+            ci.quantity += quantity
+        else:
+            cart[key] = CartItem(item_id=item["id"], name=item["name"], unit_price=float(item["price"]), quantity=quantity)
+        added.append(item["name"])
+    return added, cart_total(cart)
 
 # -------------------------
 # AGENT TOOLS
@@ -376,11 +463,12 @@ async def find_item(
     ctx: RunContext[Userdata],
     query: Annotated[str, Field(description="Name or partial name of item (e.g., 'milk', 'paneer')")],
 ) -> str:
-    matches = search_catalog_by_name_db(query)
+    await refresh_catalog_index()
+    matches = catalog_index.search(query, limit=10)
     if not matches:
         return f"No items found matching '{query}'. Try generic names like 'milk' or 'rice'."
     lines = []
-    for it in matches[:10]:
+    for it in matches:
         lines.append(f"- {it['name']} (id: {it['id']}) — ₹{it['price']:.2f} — {it.get('size','')}")
     return "Found:\n" + "\n".join(lines)
 
@@ -392,20 +480,20 @@ async def add_to_cart(
     quantity: Annotated[int, Field(description="Quantity", default=1)] = 1,
     notes: Annotated[str, Field(description="Optional notes")] = "",
 ) -> str:
-    item = find_catalog_item_by_id_db(item_id)
+    item = await find_catalog_item_by_id_db(item_id)
     if not item:
         return f"Item id '{item_id}' not found."
 
-    for ci in ctx.userdata.cart:
-        if ci.item_id.lower() == item_id.lower():
-            ci.quantity += quantity
-            if notes:
-                ci.notes = notes
-            total = cart_total(ctx.userdata.cart)
-            return f"Updated '{ci.name}' quantity to {ci.quantity}. Cart total: \u20B9{total:.2f}"
+    ci = ctx.userdata.cart.get(item_id.lower())
+    if ci:
+        ci.quantity += quantity
+        if notes:
+            ci.notes = notes
+        total = cart_total(ctx.userdata.cart)
+        return f"Updated '{ci.name}' quantity to {ci.quantity}. Cart total: \u20B9{total:.2f}"
 
     ci = CartItem(item_id=item["id"], name=item["name"], unit_price=float(item["price"]), quantity=quantity, notes=notes)
-    ctx.userdata.cart.append(ci)
+    ctx.userdata.cart[item_id.lower()] = ci
     total = cart_total(ctx.userdata.cart)
     return f"Added {quantity} x '{item['name']}' to cart. Cart total: \u20B9{total:.2f}"
 
@@ -415,10 +503,7 @@ async def remove_from_cart(
     ctx: RunContext[Userdata],
     item_id: Annotated[str, Field(description="Catalog item id to remove")],
 ) -> str:
-    before = len(ctx.userdata.cart)
-    ctx.userdata.cart = [ci for ci in ctx.userdata.cart if ci.item_id.lower() != item_id.lower()]
-    after = len(ctx.userdata.cart)
-    if before == after:
+    if ctx.userdata.cart.pop(item_id.lower(), None) is None:
         return f"Item '{item_id}' was not in your cart."
     total = cart_total(ctx.userdata.cart)
     return f"Removed item '{item_id}' from cart. Cart total: \u20B9{total:.2f}"
@@ -432,11 +517,11 @@ async def update_cart_quantity(
 ) -> str:
     if quantity < 1:
         return await remove_from_cart(ctx, item_id)
-    for ci in ctx.userdata.cart:
-        if ci.item_id.lower() == item_id.lower():
-            ci.quantity = quantity
-            total = cart_total(ctx.userdata.cart)
-            return f"Updated '{ci.name}' quantity to {ci.quantity}. Cart total: \u20B9{total:.2f}"
+    ci = ctx.userdata.cart.get(item_id.lower())
+    if ci:
+        ci.quantity = quantity
+        total = cart_total(ctx.userdata.cart)
+        return f"Updated '{ci.name}' quantity to {ci.quantity}. Cart total: \u20B9{total:.2f}"
     return f"Item '{item_id}' not found in cart."
 
 
@@ -445,7 +530,7 @@ async def show_cart(ctx: RunContext[Userdata]) -> str:
     if not ctx.userdata.cart:
         return "Your cart is empty."
     lines = []
-    for ci in ctx.userdata.cart:
+    for ci in ctx.userdata.cart.values():
         lines.append(f"- {ci.quantity} x {ci.name} @ \u20B9{ci.unit_price:.2f} each = \u20B9{ci.unit_price * ci.quantity:.2f}")
     total = cart_total(ctx.userdata.cart)
     return "Your cart:\n" + "\n".join(lines) + f"\nTotal: \u20B9{total:.2f}"
@@ -459,23 +544,7 @@ async def add_recipe(
     key = dish_name.strip().lower()
     if key not in RECIPE_MAP:
         return f"Sorry, I don't have a recipe for '{dish_name}'. Try 'chai', 'maggi' or 'paneer butter masala'."
-    added = []
-    for item_id in RECIPE_MAP[key]:
-        item = find_catalog_item_by_id_db(item_id)
-        if not item:
-            continue
-
-        found = False
-        for ci in ctx.userdata.cart:
-            if ci.item_id.lower() == item_id.lower():
-                ci.quantity += 1
-                found = True
-                break
-        if not found:
-            ctx.userdata.cart.append(CartItem(item_id=item["id"], name=item["name"], unit_price=float(item["price"]), quantity=1))
-        added.append(item["name"])
-
-    total = cart_total(ctx.userdata.cart)
+    added, total = await expand_into_cart(ctx.userdata.cart, RECIPE_MAP[key], quantity=1)
     return f"Added ingredients for '{dish_name}': {', '.join(added)}. Cart total: \u20B9{total:.2f}"
 
 
@@ -506,28 +575,13 @@ async def ingredients_for(
     if key in RECIPE_MAP:
         item_ids = RECIPE_MAP[key]
     else:
+        await refresh_catalog_index()
         item_ids = _infer_items_from_tags(dish)
 
     if not item_ids:
         return f"Sorry, I couldn't determine ingredients for '{request}'. Try a simpler phrase like 'chai' or 'maggi'."
 
-    added = []
-    for iid in item_ids:
-        item = find_catalog_item_by_id_db(iid)
-        if not item:
-            continue
-        # add with servings as quantity
-        found = False
-        for ci in ctx.userdata.cart:
-            if ci.item_id.lower() == iid.lower():
-                ci.quantity += servings
-                found = True
-                break
-        if not found:
-            ctx.userdata.cart.append(CartItem(item_id=item['id'], name=item['name'], unit_price=float(item['price']), quantity=servings))
-        added.append(item['name'])
-
-    total = cart_total(ctx.userdata.cart)
+    added, total = await expand_into_cart(ctx.userdata.cart, item_ids, quantity=servings)
     return f"I've added {', '.join(added)} to your cart for '{dish}'. (Servings: {servings}). Cart total: ₹{total:.2f}"
 
 
@@ -545,24 +599,19 @@ async def place_order(
     total = cart_total(ctx.userdata.cart)
 
     # 1. Persist to DB
-    insert_order_db(order_id=order_id, timestamp=now, total=total, customer_name=customer_name, address=address, status="received", items=ctx.userdata.cart)
+    updated_at = await insert_order_db(order_id=order_id, timestamp=now, total=total, customer_name=customer_name, address=address, status="received", items=list(ctx.userdata.cart.values()))
 
     # 2. Clear Cart
-    ctx.userdata.cart = []
+    ctx.userdata.cart = {}
     ctx.userdata.customer_name = customer_name
 
-    # 3. Trigger Background Simulation (Received -> Shipped -> Out for delivery...)
-    try:
-        # create a background task on the running event loop
-        asyncio.create_task(simulate_delivery_flow(order_id))
-    except RuntimeError:
-        # If there is no running loop, schedule on a new loop in a background thread
-        loop = asyncio.new_event_loop()
-        asyncio.get_running_loop() if asyncio.get_event_loop().is_running() else None
-        # fire-and-forget: run in background
-        asyncio.get_event_loop().call_soon_threadsafe(lambda: asyncio.create_task(simulate_delivery_flow(order_id)))
+    # 3. Queue for the background status simulation (Received -> Shipped -> Out for delivery...)
+    order_bus.publish(order_id, "received", updated_at)
+    delivery_scheduler.schedule(order_id)
+    _track_order(ctx, order_id)
+    logger.info(f"🔄 [Scheduler] Queued {order_id}; {delivery_scheduler.queue_depth} orders in flight")
 
-    return f"Order placed successfully! Order ID: {order_id}. Total: \u20B9{total:.2f}. I have initiated express shipping; the status will update automatically shortly."
+    return f"Order placed successfully! Order ID: {order_id}. Total: \u20B9{total:.2f}. I have initiated express shipping; I'll let you know as the status changes."
 
 
 @function_tool
@@ -570,7 +619,7 @@ async def cancel_order(
     ctx: RunContext[Userdata],
     order_id: Annotated[str, Field(description="Order ID to cancel")],
 ) -> str:
-    o = get_order_db(order_id)
+    o = await get_order_db(order_id)
     if not o:
         return f"No order found with id {order_id}."
 
@@ -581,8 +630,13 @@ async def cancel_order(
     if status == "cancelled":
         return f"Order {order_id} is already cancelled."
 
-    # Update DB
-    update_order_status_db(order_id, "cancelled")
+    # Update DB; stop announcing it to this session before telling everyone else
+    updated_at = await update_order_status_db(order_id, "cancelled")
+    unsubscribe = ctx.userdata.order_subscriptions.pop(order_id, None)
+    if unsubscribe:
+        unsubscribe()
+    if updated_at:
+        order_bus.publish(order_id, "cancelled", updated_at)
     return f"Order {order_id} has been cancelled successfully."
 
 
@@ -591,9 +645,18 @@ async def get_order_status(
     ctx: RunContext[Userdata],
     order_id: Annotated[str, Field(description="Order ID to check")],
 ) -> str:
-    o = get_order_db(order_id)
+    # The bus is only current for orders this process's scheduler is advancing
+    known = order_bus.last_status(order_id) if delivery_scheduler.is_tracking(order_id) else None
+    if known:
+        return f"Order {order_id} status: {known.status}. Updated at: {known.updated_at}"
+    o = await get_order_db(order_id)
     if not o:
         return f"No order found with id {order_id}."
+    if o.get("status") in STATUS_FLOW and o.get("status") not in TERMINAL_STATUSES:
+        # opened after this process's scheduler started (e.g. by another worker): advance it here too
+        delivery_scheduler.track(order_id, o["updated_at"])
+        order_bus.publish(order_id, o["status"], o["updated_at"])
+        _track_order(ctx, order_id)
     return f"Order {order_id} status: {o.get('status', 'unknown')}. Updated at: {o.get('updated_at')}"
 
 
@@ -602,7 +665,7 @@ async def order_history(
     ctx: RunContext[Userdata],
     customer_name: Annotated[Optional[str], Field(description="Optional customer name to filter", default=None)] = None,
 ) -> str:
-    rows = list_orders_db(limit=5, customer_name=customer_name)
+    rows = await list_orders_db(limit=5, customer_name=customer_name)
     if not rows:
         return "No orders found."
     lines = []
@@ -632,7 +695,7 @@ class FoodAgent(Agent):
             
             When placing an order, mention that express tracking is enabled.
             If user asks "Where is my order?", check status. 
-            The status advances automatically (simulated) so encourage them to check back in a few seconds.
+            The status advances automatically (simulated) and updates are announced as they happen, so the user doesn't need to keep asking.
             """,
             tools=[find_item, add_to_cart, remove_from_cart, update_cart_quantity, show_cart, add_recipe, place_order, cancel_order, get_order_status, order_history],
         )
@@ -641,11 +704,16 @@ class FoodAgent(Agent):
 # Entrypoint
 # -------------------------
 def prewarm(proc: JobProcess):
-    # load VAD model and stash on process userdata
+    # load shared models once per process
+    try:
+        ModelRegistry.for_process(proc).prewarm()
+    except Exception:
+        logger.warning("Model prewarm failed; continuing without preloaded VAD.")
     try:
-        proc.userdata["vad"] = silero.VAD.load()
+        if _apply_catalog_changes(load_catalog_changes_db.sync(_catalog_seq)):
+            prune_catalog_changes_db.sync(_catalog_seq)
     except Exception:
-        logger.warning("VAD prewarm failed; continuing without preloaded VAD.")
+        logger.warning("Catalog index prewarm failed; it will be built on first search.")
 
 
 async def entrypoint(ctx: JobContext):
@@ -655,6 +723,8 @@ async def entrypoint(ctx: JobContext):
 
     userdata = Userdata()
 
+    models = ModelRegistry.for_process(ctx.proc)
+
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
         llm=google.LLM(model="gemini-2.5-flash"),
@@ -663,15 +733,26 @@ async def entrypoint(ctx: JobContext):
             style="Conversational",
             text_pacing=True,
         ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata.get("vad"),
+        turn_detection=models.turn_detector(),
+        vad=models.get("vad"),
         userdata=userdata,
     )
 
+    await delivery_scheduler.start()
+    # shared by every job in this process; stops after the last one ends
+    ctx.add_shutdown_callback(delivery_scheduler.release)
+
+    async def _drop_order_subscriptions():
+        for unsubscribe in userdata.order_subscriptions.values():
+            unsubscribe()
+        userdata.order_subscriptions.clear()
+
+    ctx.add_shutdown_callback(_drop_order_subscriptions)
+
     await session.start(
         agent=FoodAgent(),
         room=ctx.room,
-        room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()),
+        room_input_options=RoomInputOptions(noise_cancellation=models.noise_cancellation()),
     )
 
     await ctx.connect()
@@ -0,0 +1,155 @@
+"""
+In-memory search index over the grocery catalog.
+
+Name, brand, category and tag tokens go into an inverted index (term -> item
+ids with a per-field weight). A query token matches terms in three ways,
+strongest first:
+
+- exact term
+- prefix of a term ("panee" -> "paneer"), via bisect over the sorted vocabulary
+- one typo away ("paner", "milc"), via a symmetric-delete index of the vocabulary
+
+Items are ranked by how many query tokens they matched, then by summed weight.
+The index is updated one item at a time with ``upsert``/``remove``, so catalog
+changes never require a rebuild.
+"""
+
+import bisect
+import heapq
+import re
+from collections import defaultdict
+from typing import Dict, Iterable, Iterator, List, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+FIELD_WEIGHTS = {"name": 3.0, "tags": 2.0, "brand": 1.5, "category": 1.0}
+
+EXACT, PREFIX, FUZZY = 1.0, 0.8, 0.5
+MIN_PREFIX_LEN = 2
+MIN_FUZZY_LEN = 4
+MAX_PREFIX_TERMS = 64
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def _deletes(term: str) -> Set[str]:
+    return {term[:i] + term[i + 1:] for i in range(len(term))}
+
+
+class CatalogIndex:
+    def __init__(self):
+        self._clear()
+
+    def _clear(self):
+        self._items: Dict[str, dict] = {}
+        self._item_terms: Dict[str, Dict[str, float]] = {}
+        self._postings: Dict[str, Dict[str, float]] = {}
+        self._vocab: List[str] = []
+        self._delete_map: Dict[str, Set[str]] = defaultdict(set)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def get(self, item_id: str):
+        return self._items.get(item_id)
+
+    @staticmethod
+    def _terms_for(item: dict) -> Dict[str, float]:
+        terms: Dict[str, float] = {}
+        for field_name, weight in FIELD_WEIGHTS.items():
+            value = item.get(field_name) or ""
+            if isinstance(value, (list, tuple)):
+                value = " ".join(value)
+            for tok in tokenize(value):
+                if weight > terms.get(tok, 0.0):
+                    terms[tok] = weight
+        return terms
+
+    def _add_term(self, term: str):
+        bisect.insort(self._vocab, term)
+        if len(term) >= MIN_FUZZY_LEN:
+            for d in _deletes(term):
+                self._delete_map[d].add(term)
+
+    def _drop_term(self, term: str):
+        i = bisect.bisect_left(self._vocab, term)
+        if i < len(self._vocab) and self._vocab[i] == term:
+            del self._vocab[i]
+        if len(term) >= MIN_FUZZY_LEN:
+            for d in _deletes(term):
+                bucket = self._delete_map.get(d)
+                if bucket is not None:
+                    bucket.discard(term)
+                    if not bucket:
+                        del self._delete_map[d]
+
+    def upsert(self, item: dict):
+        item_id = item["id"]
+        self.remove(item_id)
+        terms = self._terms_for(item)
+        self._items[item_id] = item
+        self._item_terms[item_id] = terms
+        for term, weight in terms.items():
+            posting = self._postings.get(term)
+            if posting is None:
+                posting = self._postings[term] = {}
+                self._add_term(term)
+            posting[item_id] = weight
+
+    def remove(self, item_id: str):
+        terms = self._item_terms.pop(item_id, None)
+        self._items.pop(item_id, None)
+        if not terms:
+            return
+        for term in terms:
+            posting = self._postings.get(term)
+            if posting is None:
+                continue
+            posting.pop(item_id, None)
+            if not posting:
+                del self._postings[term]
+                self._drop_term(term)
+
+    def replace_all(self, items: Iterable[dict]):
+        self._clear()
+        for item in items:
+            self.upsert(item)
+
+    def _expand(self, token: str) -> Iterator[Tuple[str, float]]:
+        """Yield (vocabulary term, match quality) pairs for one query token."""
+        exact = token in self._postings
+        if exact:
+            yield token, EXACT
+        if len(token) >= MIN_PREFIX_LEN:
+            i = bisect.bisect_right(self._vocab, token)
+            for term in self._vocab[i:i + MAX_PREFIX_TERMS]:
+                if not term.startswith(token):
+                    break
+                yield term, PREFIX
+        if not exact and len(token) >= MIN_FUZZY_LEN:
+            candidates = set(self._delete_map.get(token, ()))
+            for d in _deletes(token):
+                if d in self._postings:
+                    candidates.add(d)
+                candidates |= self._delete_map.get(d, set())
+            for term in candidates:
+                if not term.startswith(token):
+                    yield term, FUZZY
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        scores: Dict[str, float] = defaultdict(float)
+        hits: Dict[str, int] = defaultdict(int)
+        for token in dict.fromkeys(tokenize(query)):
+            best: Dict[str, float] = {}
+            for term, quality in self._expand(token):
+                for item_id, weight in self._postings[term].items():
+                    score = weight * quality
+                    if score > best.get(item_id, 0.0):
+                        best[item_id] = score
+            for item_id, score in best.items():
+                scores[item_id] += score
+                hits[item_id] += 1
+        ranked = heapq.nsmallest(limit, scores, key=lambda i: (-hits[i], -scores[i], self._items[i]["name"]))
+        return [self._items[i] for i in ranked]
@@ -0,0 +1,124 @@
+"""
+Pooled SQLite access for the grocery agent.
+
+Connections are opened once in WAL mode and reused, so repeated queries hit
+sqlite3's per-connection prepared-statement cache instead of re-parsing SQL on
+a brand new connection every call. Queries run on a bounded thread pool, so a
+tool call waiting on the database never stalls the event loop that is also
+moving audio for other sessions in the same worker.
+
+Usage:
+    db = SQLitePool(path)
+
+    @db.offload
+    def get_thing(conn, thing_id):
+        return conn.execute("SELECT ...", (thing_id,)).fetchone()
+
+    row = await get_thing("abc")        # from async code
+    row = get_thing.sync("abc")         # from sync code (startup, scripts)
+"""
+
+import asyncio
+import functools
+import os
+import queue
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+
+class SQLitePool:
+    def __init__(self, path: str, size: int = 4, statement_cache: int = 256):
+        self.path = path
+        self.size = size
+        self._statement_cache = statement_cache
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        # Connections and executor threads do not survive a fork, so a child
+        # worker process starts from a clean pool.
+        self._pid = os.getpid()
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.size, thread_name_prefix="sqlite")
+
+    def _check_pid(self):
+        if self._pid != os.getpid():
+            with self._lock:
+                if self._pid != os.getpid():
+                    self._reset()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            timeout=10.0,
+            check_same_thread=False,
+            cached_statements=self._statement_cache,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL;")
+        conn.execute("PRAGMA synchronous=NORMAL;")
+        conn.execute("PRAGMA foreign_keys = ON;")
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection; uncommitted work is rolled back on return."""
+        self._check_pid()
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                may_open = self._opened < self.size
+                if may_open:
+                    self._opened += 1
+            if may_open:
+                try:
+                    conn = self._open()
+                except Exception:
+                    with self._lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.put(conn)
+
+    def call(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        with self.connection() as conn:
+            return fn(conn, *args, **kwargs)
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``fn(conn, *args, **kwargs)`` on the pool's worker threads."""
+        self._check_pid()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self.call, fn, *args, **kwargs)
+        )
+
+    def offload(self, fn: Callable[..., Any]) -> Callable[..., Any]:
+        """Turn ``fn(conn, ...)`` into an awaitable ``fn(...)`` with a ``.sync`` twin."""
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            return await self.run(fn, *args, **kwargs)
+
+        wrapper.sync = functools.partial(self.call, fn)
+        return wrapper
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
@@ -0,0 +1,213 @@
+"""
+Single scheduler driving the simulated delivery status flow.
+
+One heap of (due time, order id) per worker process replaces a sleeping
+asyncio task per order. A single loop wakes at the earliest due time and moves
+every due order one step along the status flow with one batched UPDATE on one
+pooled connection.
+
+The database is the source of truth: on start the heap is rebuilt from the
+open orders table, so a restarted worker carries on where the previous one
+stopped. An order is only advanced once its last update is at least one
+interval old, so two workers scheduling the same order cannot skip a step.
+
+The scheduler is shared by every job in the process: each job calls
+``start()`` when it begins and ``release()`` when it ends, and the loop stops
+only when the last job has released it.
+
+Every status the scheduler writes or observes is passed to ``on_status``
+(the order status bus) with the row's updated_at, which turns it into push
+notifications.
+"""
+
+import asyncio
+import heapq
+import logging
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from db_pool import SQLitePool
+
+logger = logging.getLogger("food_agent_sqlite")
+
+# sqlite stores updated_at with one-second resolution
+_CLOCK_SLACK = 1.0
+_MAX_BATCH = 500
+
+
+def _epoch(sqlite_ts: str) -> float:
+    return datetime.strptime(sqlite_ts, "%Y-%m-%d %H:%M:%S").replace(tzinfo=timezone.utc).timestamp()
+
+
+def sqlite_now() -> str:
+    """Current UTC time in the format of sqlite's datetime('now')."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+class DeliveryScheduler:
+    def __init__(
+        self,
+        db: SQLitePool,
+        status_flow: Sequence[str],
+        interval: float = 5.0,
+        on_status: Optional[Callable[[str, str, str], None]] = None,
+    ):
+        self._db = db
+        self._on_status = on_status
+        self._flow = list(status_flow)
+        self._next = dict(zip(self._flow, self._flow[1:]))
+        self._interval = interval
+        self._heap: List[Tuple[float, str]] = []
+        self._due: Dict[str, float] = {}
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._jobs = 0  # jobs between start() and release()
+
+    @property
+    def queue_depth(self) -> int:
+        """Number of orders still waiting for their next status step."""
+        return len(self._due)
+
+    def _push(self, order_id: str, due: float):
+        self._due[order_id] = due
+        heapq.heappush(self._heap, (due, order_id))
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _ensure_running(self):
+        if self._task is None or self._task.done():
+            # created here so it binds to the loop the scheduler actually runs on
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.get_running_loop().create_task(self._run(), name="delivery-scheduler")
+
+    def schedule(self, order_id: str, due: Optional[float] = None):
+        """Queue an order's next status step (default: one interval from now)."""
+        self._push(order_id, due if due is not None else time.time() + self._interval)
+        self._ensure_running()
+
+    def track(self, order_id: str, updated_at: str):
+        """Queue an open order this process didn't load at start (e.g. placed by another worker)."""
+        self.schedule(order_id, _epoch(updated_at) + self._interval)
+
+    def is_tracking(self, order_id: str) -> bool:
+        return order_id in self._due
+
+    async def start(self):
+        """Rebuild the queue from open orders in the database and start the loop."""
+        self._jobs += 1
+        if self._task is not None and not self._task.done():
+            return
+        open_orders = await self._db.run(self._load_open_orders)
+        for order_id, updated in open_orders:
+            self._push(order_id, updated + self._interval)
+        self._ensure_running()
+        logger.info(f"🚚 [Scheduler] Tracking {self.queue_depth} open orders")
+
+    async def release(self):
+        """A job using the scheduler ended; stop the loop once no job is left."""
+        self._jobs = max(0, self._jobs - 1)
+        if self._jobs == 0:
+            await self.aclose()
+
+    async def aclose(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _load_open_orders(self, conn: sqlite3.Connection) -> List[Tuple[str, float]]:
+        open_statuses = self._flow[:-1]
+        placeholders = ",".join("?" * len(open_statuses))
+        rows = conn.execute(
+            f"SELECT order_id, updated_at FROM orders WHERE status IN ({placeholders})", open_statuses
+        ).fetchall()
+        return [(r["order_id"], _epoch(r["updated_at"])) for r in rows]
+
+    def _advance_batch(self, conn: sqlite3.Connection, order_ids: List[str]) -> Tuple[List[Tuple[str, str, str]], List[Tuple[str, str, str]], List[Tuple[str, float]]]:
+        """Advance all eligible orders one step in one UPDATE.
+
+        Returns (changed (order_id, new_status, updated_at) we wrote, (order_id, status,
+        updated_at) left as they were, (order_id, next due) pairs to requeue).
+        """
+        now = time.time()
+        stamp = sqlite_now()
+        changed: List[Tuple[str, str, str]] = []
+        unchanged: List[Tuple[str, str, str]] = []
+        requeue: List[Tuple[str, float]] = []
+        placeholders = ",".join("?" * len(order_ids))
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = conn.execute(
+                f"SELECT order_id, status, updated_at FROM orders WHERE order_id IN ({placeholders})", order_ids
+            ).fetchall()
+            eligible = []
+            for r in rows:
+                nxt = self._next.get(r["status"])
+                if nxt is None:
+                    unchanged.append((r["order_id"], r["status"], r["updated_at"]))  # delivered, cancelled or unknown
+                    continue
+                updated = _epoch(r["updated_at"])
+                if now - updated + _CLOCK_SLACK >= self._interval:
+                    eligible.append(r["order_id"])
+                    changed.append((r["order_id"], nxt, stamp))
+                    if nxt in self._next:
+                        requeue.append((r["order_id"], now + self._interval))
+                else:
+                    # someone else advanced it recently; follow their clock
+                    unchanged.append((r["order_id"], r["status"], r["updated_at"]))
+                    requeue.append((r["order_id"], updated + self._interval))
+            if eligible:
+                cases = " ".join("WHEN ? THEN ?" for _ in self._next)
+                case_params = [p for pair in self._next.items() for p in pair]
+                conn.execute(
+                    f"UPDATE orders SET status = CASE status {cases} END, updated_at = ? "
+                    f"WHERE order_id IN ({','.join('?' * len(eligible))})",
+                    case_params + [stamp] + eligible,
+                )
+            conn.commit()
+        except BaseException:
+            conn.rollback()
+            raise
+        return changed, unchanged, requeue
+
+    def _pop_due(self, now: float) -> List[str]:
+        due = []
+        while self._heap and self._heap[0][0] <= now and len(due) < _MAX_BATCH:
+            when, order_id = heapq.heappop(self._heap)
+            if self._due.get(order_id) == when:  # skip superseded entries
+                del self._due[order_id]
+                due.append(order_id)
+        return due
+
+    async def _run(self):
+        while True:
+            self._wakeup.clear()
+            now = time.time()
+            due = self._pop_due(now)
+            if due:
+                try:
+                    changed, unchanged, requeue = await self._db.run(self._advance_batch, due)
+                except Exception:
+                    logger.exception("[Scheduler] Batch status update failed; retrying next interval")
+                    for order_id in due:
+                        self._push(order_id, now + self._interval)
+                    continue
+                for order_id, status, _ in changed:
+                    logger.info(f"🚚 [Scheduler] Order {order_id} updated to '{status}'")
+                if self._on_status is not None:
+                    for order_id, status, updated_at in changed + unchanged:
+                        self._on_status(order_id, status, updated_at)
+                for order_id, when in requeue:
+                    self._push(order_id, when)
+                continue
+
+            timeout = self._heap[0][0] - now if self._heap else None
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
@@ -0,0 +1,75 @@
+"""
+In-process order status event bus.
+
+Whatever writes an order status (the delivery scheduler, cancel_order,
+place_order) publishes it here. Sessions subscribe to the order ids they care
+about and get a callback on every change, so status updates can be spoken
+proactively and nobody has to poll the orders table. Subscribing and
+unsubscribing are O(1) dict operations.
+
+The bus also remembers the last published status of each tracked order, with
+the orders.updated_at written alongside it, so a status question about an
+order this process is advancing can be answered without a database read.
+An order's subscribers and cached status are dropped once it reaches a
+terminal status.
+"""
+
+import itertools
+import logging
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger("food_agent_sqlite")
+
+
+@dataclass(frozen=True)
+class OrderStatusEvent:
+    order_id: str
+    status: str
+    updated_at: str  # orders.updated_at of the write (SQLite UTC "YYYY-MM-DD HH:MM:SS")
+
+
+OrderStatusCallback = Callable[[OrderStatusEvent], None]
+
+
+class OrderStatusBus:
+    def __init__(self, terminal_statuses: Iterable[str] = ()):
+        self._terminal = frozenset(terminal_statuses)
+        self._subscribers: Dict[str, Dict[int, OrderStatusCallback]] = {}
+        self._last: Dict[str, OrderStatusEvent] = {}
+        self._tokens = itertools.count()
+
+    def subscribe(self, order_id: str, callback: OrderStatusCallback) -> Callable[[], None]:
+        """Call `callback` on every status change of `order_id`. Returns an unsubscribe function."""
+        token = next(self._tokens)
+        self._subscribers.setdefault(order_id, {})[token] = callback
+
+        def unsubscribe():
+            subs = self._subscribers.get(order_id)
+            if subs is not None:
+                subs.pop(token, None)
+                if not subs:
+                    del self._subscribers[order_id]
+
+        return unsubscribe
+
+    def last_status(self, order_id: str) -> Optional[OrderStatusEvent]:
+        return self._last.get(order_id)
+
+    def publish(self, order_id: str, status: str, updated_at: str):
+        """Record a status write; subscribers are notified only if it is a change."""
+        previous = self._last.get(order_id)
+        if previous is not None and previous.status == status:
+            return
+        event = OrderStatusEvent(order_id=order_id, status=status, updated_at=updated_at)
+        self._last[order_id] = event
+
+        for callback in list(self._subscribers.get(order_id, {}).values()):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception(f"Order status subscriber failed for {order_id}")
+
+        if status in self._terminal:
+            self._last.pop(order_id, None)
+            self._subscribers.pop(order_id, None)
@@ -0,0 +1,86 @@
+import sqlite3
+
+import pytest
+
+from catalog_index import CatalogIndex
+
+ITEMS = [
+    {"id": "paneer-200", "name": "Fresh Paneer", "category": "Dairy", "brand": "Amul", "tags": ["protein"]},
+    {"id": "milk-1l", "name": "Toned Milk", "category": "Dairy", "brand": "Amul", "tags": ["breakfast"]},
+    {"id": "bread-400", "name": "Brown Bread", "category": "Bakery", "brand": "Harvest Gold", "tags": ["breakfast"]},
+    {"id": "peanut-500", "name": "Peanut Butter", "category": "Spreads", "brand": "Pintola", "tags": ["protein"]},
+]
+
+
+@pytest.fixture
+def index():
+    idx = CatalogIndex()
+    idx.replace_all(ITEMS)
+    return idx
+
+
+def _ids(items) -> list:
+    return [item["id"] for item in items]
+
+
+def test_exact_matches_rank_by_field_weight(index) -> None:
+    assert _ids(index.search("milk")) == ["milk-1l"]
+    # a name hit outranks a tag hit
+    assert _ids(index.search("bread breakfast"))[0] == "bread-400"
+    assert index.search("chocolate") == []
+
+
+def test_prefix_matches_longer_terms(index) -> None:
+    assert _ids(index.search("pane")) == ["paneer-200"]
+    assert _ids(index.search("pea")) == ["peanut-500"]
+    assert _ids(index.search("p")) == []  # too short to expand
+
+
+def test_one_typo_is_tolerated(index) -> None:
+    assert _ids(index.search("paner")) == ["paneer-200"]  # deletion
+    assert _ids(index.search("milc")) == ["milk-1l"]  # substitution
+    assert _ids(index.search("breda")) == ["bread-400"]  # transposition
+    assert _ids(index.search("brzzd")) == []  # two edits
+
+
+def test_upsert_and_remove_update_the_index_in_place(index) -> None:
+    index.upsert({"id": "milk-1l", "name": "Almond Milk", "category": "Dairy", "brand": "Sofit"})
+    assert _ids(index.search("almond")) == ["milk-1l"]
+    assert index.search("toned") == []  # terms of the old version are gone
+    assert index.search("milk")[0]["brand"] == "Sofit"
+
+    index.remove("paneer-200")
+    assert index.search("paneer") == [] and index.search("paner") == []
+    assert index.get("paneer-200") is None
+    assert len(index) == 3
+    assert _ids(index.search("amul")) == []  # brand no longer used by any item
+
+
+def test_applied_catalog_changes_are_pruned(tmp_path) -> None:
+    pytest.importorskip("livekit.agents")
+    import agent
+
+    load_changes = agent.load_catalog_changes_db.__wrapped__
+    prune = agent.prune_catalog_changes_db.__wrapped__
+    conn = sqlite3.connect(str(tmp_path / "orders.sqlite"))
+    conn.row_factory = sqlite3.Row
+    agent._seed_tables(conn)
+    conn.commit()
+
+    seq, items, removed = load_changes(conn, None)
+    assert removed is None and len(items) > 0
+    assert prune(conn, seq) == len(items)
+    assert conn.execute("SELECT COUNT(*) FROM catalog_changes").fetchone()[0] == 0
+
+    some_id = items[0]["id"]
+    with conn:
+        conn.execute("UPDATE catalog SET price = price + 1 WHERE id = ?", (some_id,))
+        conn.execute("DELETE FROM catalog WHERE id = ?", (items[1]["id"],))
+    new_seq, upserted, removed = load_changes(conn, seq)
+    assert [r["id"] for r in upserted] == [some_id] and removed == [items[1]["id"]]
+    assert prune(conn, new_seq) == 2
+
+    # a reader still at the first seq fell behind the pruned range: full reload
+    _, snapshot, removed = load_changes(conn, seq - 1)
+    assert removed is None and len(snapshot) == len(items) - 1
+    conn.close()
@@ -0,0 +1,67 @@
+import asyncio
+import threading
+
+import pytest
+
+from db_pool import SQLitePool
+
+
+@pytest.fixture
+def pool(tmp_path):
+    db = SQLitePool(str(tmp_path / "pool.sqlite"), size=3)
+    with db.connection() as conn, conn:
+        conn.execute("CREATE TABLE counters (name TEXT PRIMARY KEY, n INTEGER NOT NULL)")
+    yield db
+    db.close()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_offloaded_reads_and_writes(pool) -> None:
+    @pool.offload
+    def bump(conn, name):
+        with conn:
+            conn.execute(
+                "INSERT INTO counters (name, n) VALUES (?, 1) ON CONFLICT(name) DO UPDATE SET n = n + 1", (name,)
+            )
+        return threading.current_thread().name
+
+    @pool.offload
+    def read(conn, name):
+        row = conn.execute("SELECT n FROM counters WHERE name = ?", (name,)).fetchone()
+        return row[0] if row else 0
+
+    results = await asyncio.gather(*(bump(f"c{i % 4}") for i in range(200)), *(read("c0") for _ in range(50)))
+
+    threads = set(results[:200])
+    assert threads and all(name.startswith("sqlite") for name in threads)
+    assert all(0 <= n <= 50 for n in results[200:])
+    assert [read.sync(f"c{i}") for i in range(4)] == [50, 50, 50, 50]
+    assert pool._opened <= pool.size
+
+
+def test_connections_are_reused_and_uncommitted_work_rolled_back(pool) -> None:
+    with pool.connection() as first:
+        first.execute("INSERT INTO counters VALUES ('lost', 1)")  # never committed
+    with pool.connection() as second:
+        assert second is first
+        assert second.execute("SELECT COUNT(*) FROM counters").fetchone()[0] == 0
+        assert second.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert pool._opened == 1
+
+
+def test_sync_twin_runs_on_the_calling_thread(pool) -> None:
+    @pool.offload
+    def where(conn):
+        return threading.current_thread().name
+
+    assert where.sync() == threading.current_thread().name
+    assert where.__name__ == "where"
+
+
+def test_close_closes_idle_connections(pool) -> None:
+    with pool.connection() as conn:
+        pass
+    pool.close()
+    assert pool._opened == 0
+    with pytest.raises(Exception):
+        conn.execute("SELECT 1")
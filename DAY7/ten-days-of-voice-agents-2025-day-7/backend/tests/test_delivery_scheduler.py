@@ -0,0 +1,124 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from db_pool import SQLitePool
+from delivery_scheduler import DeliveryScheduler
+
+STATUS_FLOW = ["received", "confirmed", "shipped", "out_for_delivery", "delivered"]
+
+
+def _stamp(seconds_ago: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+@pytest.fixture
+def db(tmp_path):
+    pool = SQLitePool(str(tmp_path / "orders.sqlite"), size=2)
+    with pool.connection() as conn, conn:
+        conn.execute(
+            "CREATE TABLE orders (order_id TEXT PRIMARY KEY, status TEXT, updated_at TEXT DEFAULT (datetime('now')))"
+        )
+    yield pool
+    pool.close()
+
+
+def _insert(db: SQLitePool, *orders) -> None:
+    with db.connection() as conn, conn:
+        conn.executemany("INSERT INTO orders (order_id, status, updated_at) VALUES (?, ?, ?)", orders)
+
+
+def _statuses(db: SQLitePool) -> dict:
+    with db.connection() as conn:
+        return dict(conn.execute("SELECT order_id, status FROM orders").fetchall())
+
+
+def test_advance_moves_every_due_order_in_one_batch(db) -> None:
+    _insert(db, ("a", "received", _stamp(60)), ("b", "shipped", _stamp(60)), ("c", "confirmed", _stamp(60)))
+    scheduler = DeliveryScheduler(db, STATUS_FLOW, interval=5.0)
+
+    changed, unchanged, requeue = db.call(scheduler._advance_batch, ["a", "b", "c"])
+
+    assert sorted((order_id, status) for order_id, status, _ in changed) == [
+        ("a", "confirmed"), ("b", "out_for_delivery"), ("c", "shipped"),
+    ]
+    assert len({stamp for _, _, stamp in changed}) == 1  # one UPDATE, one updated_at
+    assert unchanged == []
+    assert sorted(order_id for order_id, _ in requeue) == ["a", "b", "c"]
+    assert _statuses(db) == {"a": "confirmed", "b": "out_for_delivery", "c": "shipped"}
+
+
+def test_recently_updated_order_keeps_its_step_and_clock(db) -> None:
+    stamp = _stamp(0)
+    _insert(db, ("a", "received", stamp))
+    scheduler = DeliveryScheduler(db, STATUS_FLOW, interval=60.0)
+
+    changed, unchanged, requeue = db.call(scheduler._advance_batch, ["a"])
+
+    assert changed == [] and unchanged == [("a", "received", stamp)]
+    assert [order_id for order_id, _ in requeue] == ["a"]
+    assert _statuses(db) == {"a": "received"}
+
+
+def test_cancelled_and_delivered_orders_are_skipped(db) -> None:
+    _insert(
+        db,
+        ("open", "out_for_delivery", _stamp(60)),
+        ("gone", "cancelled", _stamp(60)),
+        ("done", "delivered", _stamp(60)),
+    )
+    scheduler = DeliveryScheduler(db, STATUS_FLOW, interval=5.0)
+
+    changed, unchanged, requeue = db.call(scheduler._advance_batch, ["open", "gone", "done"])
+
+    # the last step is not requeued, and terminal orders are reported as they are
+    assert [(order_id, status) for order_id, status, _ in changed] == [("open", "delivered")]
+    assert sorted((order_id, status) for order_id, status, _ in unchanged) == [
+        ("done", "delivered"), ("gone", "cancelled"),
+    ]
+    assert requeue == []
+    assert _statuses(db) == {"open": "delivered", "gone": "cancelled", "done": "delivered"}
+
+
+@pytest.mark.asyncio
+async def test_restart_rebuilds_queue_from_open_orders(db) -> None:
+    _insert(
+        db,
+        ("a", "received", _stamp(0)),
+        ("b", "shipped", _stamp(0)),
+        ("c", "cancelled", _stamp(0)),
+        ("d", "delivered", _stamp(0)),
+    )
+    scheduler = DeliveryScheduler(db, STATUS_FLOW, interval=60.0)
+
+    await scheduler.start()
+    try:
+        assert scheduler.queue_depth == 2
+        assert scheduler.is_tracking("a") and scheduler.is_tracking("b")
+        assert not scheduler.is_tracking("c") and not scheduler.is_tracking("d")
+    finally:
+        await scheduler.release()
+
+
+@pytest.mark.asyncio
+async def test_orders_run_through_the_flow_and_leave_the_queue(db) -> None:
+    _insert(db, ("a", "received", _stamp(60)), ("b", "shipped", _stamp(60)))
+    seen = []
+    scheduler = DeliveryScheduler(db, STATUS_FLOW, interval=0.01, on_status=lambda o, s, _: seen.append((o, s)))
+
+    await scheduler.start()
+    await scheduler.start()  # a second job shares the loop
+    try:
+        for _ in range(200):
+            if scheduler.queue_depth == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert scheduler.queue_depth == 0
+        assert _statuses(db) == {"a": "delivered", "b": "delivered"}
+        assert [s for o, s in seen if o == "a"] == STATUS_FLOW[1:]
+    finally:
+        await scheduler.release()
+        assert scheduler._task is not None  # still running for the other job
+        await scheduler.release()
+        assert scheduler._task is None
@@ -0,0 +1,67 @@
+from order_events import OrderStatusBus
+
+TERMINAL = ("delivered", "cancelled")
+
+
+def test_every_subscriber_of_an_order_gets_each_change() -> None:
+    bus = OrderStatusBus(terminal_statuses=TERMINAL)
+    first, second, other = [], [], []
+    bus.subscribe("o1", first.append)
+    bus.subscribe("o1", second.append)
+    bus.subscribe("o2", other.append)
+
+    bus.publish("o1", "confirmed", "2025-01-01 10:00:00")
+    bus.publish("o1", "confirmed", "2025-01-01 10:00:05")  # same status again: no event
+    bus.publish("o1", "shipped", "2025-01-01 10:00:10")
+
+    assert [e.status for e in first] == [e.status for e in second] == ["confirmed", "shipped"]
+    assert other == []
+    assert bus.last_status("o1").updated_at == "2025-01-01 10:00:10"
+
+
+def test_unsubscribe_stops_delivery_and_is_idempotent() -> None:
+    bus = OrderStatusBus(terminal_statuses=TERMINAL)
+    kept, dropped = [], []
+    bus.subscribe("o1", kept.append)
+    unsubscribe = bus.subscribe("o1", dropped.append)
+
+    unsubscribe()
+    unsubscribe()
+    bus.publish("o1", "confirmed", "2025-01-01 10:00:00")
+
+    assert len(kept) == 1 and dropped == []
+
+
+def test_last_unsubscribe_drops_the_order_entry() -> None:
+    bus = OrderStatusBus(terminal_statuses=TERMINAL)
+    unsubscribe = bus.subscribe("o1", lambda event: None)
+    unsubscribe()
+    assert "o1" not in bus._subscribers
+
+
+def test_terminal_status_is_delivered_then_cleaned_up() -> None:
+    bus = OrderStatusBus(terminal_statuses=TERMINAL)
+    events = []
+    unsubscribe = bus.subscribe("o1", events.append)
+    bus.publish("o1", "out_for_delivery", "2025-01-01 10:00:00")
+
+    bus.publish("o1", "delivered", "2025-01-01 10:00:05")
+
+    assert [e.status for e in events] == ["out_for_delivery", "delivered"]
+    assert "o1" not in bus._subscribers
+    assert bus.last_status("o1") is None
+    unsubscribe()  # a late unsubscribe after cleanup is harmless
+
+
+def test_failing_subscriber_does_not_block_the_others() -> None:
+    bus = OrderStatusBus(terminal_statuses=TERMINAL)
+    events = []
+
+    def broken(event):
+        raise RuntimeError("session gone")
+
+    bus.subscribe("o1", broken)
+    bus.subscribe("o1", events.append)
+    bus.publish("o1", "confirmed", "2025-01-01 10:00:00")
+
+    assert [e.status for e in events] == ["confirmed"]
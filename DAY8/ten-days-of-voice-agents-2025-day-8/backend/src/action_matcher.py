@@ -0,0 +1,156 @@
+"""
+Spoken action -> scene choice matching.
+
+Every scene is compiled once into a small inverted index: term -> [(choice,
+weight)]. Terms come from the choice key ("inspect_box") and its description,
+lowercased, stopword-filtered, folded through SYNONYMS ("grab" -> "take",
+"examine" -> "inspect") and crudely stemmed ("boxes" -> "box"). Key terms weigh
+more than description terms. Terms that several choices in the scene share
+weigh less, so "the" never decides anything and "tower" only counts where it
+tells choices apart.
+
+Matching a turn tokenizes the utterance once, sums term weights per choice and
+picks the best. If the runner-up scores within AMBIGUITY_MARGIN of the best,
+the result is flagged ambiguous so the GM can ask instead of guessing. Cost is
+a dict lookup per spoken word, independent of how many scenes the world has.
+"""
+
+import math
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Tuple
+
+KEY_WEIGHT = 2.0  # words of the action key ("inspect", "box") vs. description words
+MIN_SCORE = 0.5  # below this nothing matched meaningfully
+AMBIGUITY_MARGIN = 0.25  # runner-up within 25% of the best -> ask
+
+STOPWORDS = frozenset(
+    """
+    a an the and or but to of in on at by for with from into onto towards toward
+    up out over under back my your me i you we it its this that these those
+    there here some any all just then now please let lets let's will would could
+    should can do does did go going gonna want wanna try trying
+    is am are was be been being so very really
+    """.split()
+)
+
+# Spoken variants folded onto the verbs the world's choices use
+SYNONYMS = {
+    "grab": "take", "pick": "take", "get": "take", "pocket": "take", "keep": "take",
+    "examine": "inspect", "look": "inspect", "check": "inspect", "study": "inspect",
+    "investigate": "inspect", "search": "search", "explore": "search",
+    "walk": "walk", "head": "walk", "move": "walk", "travel": "walk", "approach": "walk",
+    "run": "flee", "escape": "flee", "flee": "flee", "retreat": "flee",
+    "attack": "fight", "battle": "fight", "hit": "fight", "strike": "fight",
+    "descend": "descend", "climb": "descend", "down": "descend", "downstairs": "descend",
+    "leave": "leave", "abandon": "leave", "ignore": "leave",
+    "read": "read", "unseal": "open", "break": "open",
+    "promise": "pledge", "swear": "pledge", "vow": "pledge",
+    "decline": "refuse", "reject": "refuse",
+    "quit": "end", "stop": "end", "finish": "end",
+    "cottage": "cottage", "village": "cottage", "house": "cottage", "houses": "cottage",
+}
+
+# "try the latch without the map" is not a way to say "map"
+NEGATIONS = frozenset({"without", "not", "no", "never", "don't", "dont"})
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+def _stem(word: str) -> str:
+    if len(word) > 4 and word.endswith("ing"):
+        return word[:-3]
+    if len(word) > 3 and word.endswith("es") and word[-3] in "sxz":
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def terms(text: str) -> List[str]:
+    """Normalised content terms of `text`, in order (duplicates kept)."""
+    out = []
+    negated = False
+    for word in _WORD_RE.findall(text.lower().replace("_", " ")):
+        word = word.strip("'")
+        if word in NEGATIONS:
+            negated = True
+            continue
+        if not word or word in STOPWORDS:
+            continue
+        if negated:  # drop the first content word after a negation
+            negated = False
+            continue
+        word = SYNONYMS.get(word, word)
+        out.append(SYNONYMS.get(_stem(word), _stem(word)))
+    return out
+
+
+@dataclass
+class Match:
+    choice: Optional[str]  # best choice key, None if nothing matched or ambiguous
+    score: float = 0.0
+    ambiguous: bool = False
+    candidates: List[Tuple[str, float]] = field(default_factory=list)  # best first
+
+
+class SceneMatcher:
+    """Precompiled matcher for one scene's choices."""
+
+    __slots__ = ("keys", "_index", "_exact")
+
+    def __init__(self, choices: Mapping[str, Mapping]):
+        self.keys: Tuple[str, ...] = tuple(choices)
+        self._exact: Dict[str, int] = {}
+        raw: List[Dict[str, float]] = []
+        for i, (key, meta) in enumerate(choices.items()):
+            self._exact[key.lower()] = i
+            self._exact[key.lower().replace("_", " ")] = i
+            weights: Dict[str, float] = {}
+            for term in set(terms(key)):
+                weights[term] = KEY_WEIGHT
+            for term in set(terms(meta.get("desc", ""))):
+                weights.setdefault(term, 1.0)
+            raw.append(weights)
+
+        # terms shared by several choices tell them apart less well
+        df: Dict[str, int] = {}
+        for weights in raw:
+            for term in weights:
+                df[term] = df.get(term, 0) + 1
+        n = len(raw)
+        postings: Dict[str, List[Tuple[int, float]]] = {}
+        for i, weights in enumerate(raw):
+            for term, weight in weights.items():
+                idf = math.log(1.0 + n / df[term])
+                postings.setdefault(term, []).append((i, weight * idf))
+        self._index: Dict[str, Tuple[Tuple[int, float], ...]] = {
+            term: tuple(p) for term, p in postings.items()
+        }
+
+    def match(self, text: str) -> Match:
+        cleaned = (text or "").strip().lower()
+        exact = self._exact.get(cleaned)
+        if exact is not None:
+            return Match(self.keys[exact], score=float("inf"), candidates=[(self.keys[exact], float("inf"))])
+
+        scores: Dict[int, float] = {}
+        for term in set(terms(cleaned)):
+            for i, weight in self._index.get(term, ()):
+                scores[i] = scores.get(i, 0.0) + weight
+        if not scores:
+            return Match(None)
+
+        ranked = sorted(scores.items(), key=lambda kv: kv[1], reverse=True)
+        candidates = [(self.keys[i], round(s, 3)) for i, s in ranked]
+        best_i, best = ranked[0]
+        if best < MIN_SCORE:
+            return Match(None, best, candidates=candidates)
+        if len(ranked) > 1 and ranked[1][1] >= best * (1.0 - AMBIGUITY_MARGIN):
+            return Match(None, best, ambiguous=True, candidates=candidates)
+        return Match(self.keys[best_i], best, candidates=candidates)
+
+
+def compile_world(world: Mapping[str, Mapping]) -> Dict[str, SceneMatcher]:
+    """One SceneMatcher per scene, built once at load."""
+    return {key: SceneMatcher(scene.get("choices") or {}) for key, scene in world.items()}
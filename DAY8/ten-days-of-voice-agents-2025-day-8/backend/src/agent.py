@@ -37,8 +37,10 @@ from livekit.agents import (
     RunContext,
 )
 
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.plugins import murf, google, deepgram
+
+from model_registry import ModelRegistry
+from world_loader import DEFAULT_WORLD_PATH, load_world
 
 # -------------------------
 # Logging
@@ -52,277 +54,10 @@ logger.addHandler(handler)
 load_dotenv(".env.local")
 
 # -------------------------
-# Simple Game World Definition
+# Game World
 # -------------------------
-# A compact world with a few scenes and choices forming a mini-arc.
-WORLD = {
-    "intro": {
-        "title": "A Shadow over Brinmere",
-        "desc": (
-            "You awake on the damp shore of Brinmere, the moon a thin silver crescent. "
-            "A ruined watchtower smolders a short distance inland, and a narrow path leads "
-            "towards a cluster of cottages to the east. In the water beside you lies a "
-            "small, carved wooden box, half-buried in sand."
-        ),
-        "choices": {
-            "inspect_box": {
-                "desc": "Inspect the carved wooden box at the water's edge.",
-                "result_scene": "box",
-            },
-            "approach_tower": {
-                "desc": "Head inland towards the smoldering watchtower.",
-                "result_scene": "tower",
-            },
-            "walk_to_cottages": {
-                "desc": "Follow the path east towards the cottages.",
-                "result_scene": "cottages",
-            },
-        },
-    },
-    "box": {
-        "title": "The Box",
-        "desc": (
-            "The box is warm despite the night air. Inside is a folded scrap of parchment "
-            "with a hatch-marked map and the words: 'Beneath the tower, the latch sings.' "
-            "As you read, a faint whisper seems to come from the tower, as if the wind "
-            "itself speaks your name."
-        ),
-        "choices": {
-            "take_map": {
-                "desc": "Take the map and keep it.",
-                "result_scene": "tower_approach",
-                "effects": {"add_journal": "Found map fragment: 'Beneath the tower, the latch sings.'"},
-            },
-            "leave_box": {
-                "desc": "Leave the box where it is.",
-                "result_scene": "intro",
-            },
-        },
-    },
-    "tower": {
-        "title": "The Watchtower",
-        "desc": (
-            "The watchtower's stonework is cracked and warm embers glow within. An iron "
-            "latch covers a hatch at the base — it looks old but recently used. You can "
-            "try the latch, look for other entrances, or retreat."
-        ),
-        "choices": {
-            "try_latch_without_map": {
-                "desc": "Try the iron latch without any clue.",
-                "result_scene": "latch_fail",
-            },
-            "search_around": {
-                "desc": "Search the nearby rubble for another entrance.",
-                "result_scene": "secret_entrance",
-            },
-            "retreat": {
-                "desc": "Step back to the shoreline.",
-                "result_scene": "intro",
-            },
-        },
-    },
-    "tower_approach": {
-        "title": "Toward the Tower",
-        "desc": (
-            "Clutching the map, you approach the watchtower. The map's marks align with "
-            "the hatch at the base, and you notice a faint singing resonance when you step close."
-        ),
-        "choices": {
-            "open_hatch": {
-                "desc": "Use the map clue and try the hatch latch carefully.",
-                "result_scene": "latch_open",
-                "effects": {"add_journal": "Used map clue to open the hatch."},
-            },
-            "search_around": {
-                "desc": "Search for another entrance.",
-                "result_scene": "secret_entrance",
-            },
-            "retreat": {
-                "desc": "Return to the shore.",
-                "result_scene": "intro",
-            },
-        },
-    },
-    "latch_fail": {
-        "title": "A Bad Twist",
-        "desc": (
-            "You twist the latch without heed — the mechanism sticks, and the effort sends "
-            "a shiver through the ground. From inside the tower, something rustles in alarm."
-        ),
-        "choices": {
-            "run_away": {
-                "desc": "Run back to the shore.",
-                "result_scene": "intro",
-            },
-            "stand_ground": {
-                "desc": "Stand and prepare for whatever emerges.",
-                "result_scene": "tower_combat",
-            },
-        },
-    },
-    "latch_open": {
-        "title": "The Hatch Opens",
-        "desc": (
-            "With the map's guidance the latch yields and the hatch opens with a breath of cold air. "
-            "Inside, a spiral of rough steps leads down into an ancient cellar lit by phosphorescent moss."
-        ),
-        "choices": {
-            "descend": {
-                "desc": "Descend into the cellar.",
-                "result_scene": "cellar",
-            },
-            "close_hatch": {
-                "desc": "Close the hatch and reconsider.",
-                "result_scene": "tower_approach",
-            },
-        },
-    },
-    "secret_entrance": {
-        "title": "A Narrow Gap",
-        "desc": (
-            "Behind a pile of rubble you find a narrow gap and old rope leading downward. "
-            "It smells of cold iron and something briny."
-        ),
-        "choices": {
-            "squeeze_in": {
-                "desc": "Squeeze through the gap and follow the rope down.",
-                "result_scene": "cellar",
-            },
-            "mark_and_return": {
-                "desc": "Mark the spot and return to the shore.",
-                "result_scene": "intro",
-            },
-        },
-    },
-    "cellar": {
-        "title": "Cellar of Echoes",
-        "desc": (
-            "The cellar opens into a circular chamber where runes glow faintly. At the center "
-            "is a stone plinth and upon it a small brass key and a sealed scroll."
-        ),
-        "choices": {
-            "take_key": {
-                "desc": "Pick up the brass key.",
-                "result_scene": "cellar_key",
-                "effects": {"add_inventory": "brass_key", "add_journal": "Found brass key on plinth."},
-            },
-            "open_scroll": {
-                "desc": "Break the seal and read the scroll.",
-                "result_scene": "scroll_reveal",
-                "effects": {"add_journal": "Scroll reads: 'The tide remembers what the villagers forget.'"},
-            },
-            "leave_quietly": {
-                "desc": "Leave the cellar and close the hatch behind you.",
-                "result_scene": "intro",
-            },
-        },
-    },
-    "cellar_key": {
-        "title": "Key in Hand",
-        "desc": (
-            "With the key in your hand the runes dim and a hidden panel slides open, revealing a "
-            "small statue that begins to hum. A voice, ancient and kind, asks: 'Will you return what was taken?'"
-        ),
-        "choices": {
-            "pledge_help": {
-                "desc": "Pledge to return what was taken.",
-                "result_scene": "reward",
-                "effects": {"add_journal": "You pledged to return what was taken."},
-            },
-            "refuse": {
-                "desc": "Refuse and pocket the key.",
-                "result_scene": "cursed_key",
-                "effects": {"add_journal": "You pocketed the key; a weight grows in your pocket."},
-            },
-        },
-    },
-    "scroll_reveal": {
-        "title": "The Scroll",
-        "desc": (
-            "The scroll tells of an heirloom taken by a water spirit that dwells beneath the tower. "
-            "It hints that the brass key 'speaks' when offered with truth."
-        ),
-        "choices": {
-            "search_for_key": {
-                "desc": "Search the plinth for a key.",
-                "result_scene": "cellar_key",
-            },
-            "leave_quietly": {
-                "desc": "Leave the cellar and keep the knowledge to yourself.",
-                "result_scene": "intro",
-            },
-        },
-    },
-    "tower_combat": {
-        "title": "Something Emerges",
-        "desc": (
-            "A hunched, brine-soaked creature scrambles out from the tower. Its eyes glow with hunger. "
-            "You must act quickly."
-        ),
-        "choices": {
-            "fight": {
-                "desc": "Fight the creature.",
-                "result_scene": "fight_win",
-            },
-            "flee": {
-                "desc": "Flee back to the shore.",
-                "result_scene": "intro",
-            },
-        },
-    },
-    "fight_win": {
-        "title": "After the Scuffle",
-        "desc": (
-            "You manage to fend off the creature; it flees wailing towards the sea. On the ground lies "
-            "a small locket engraved with a crest — likely the heirloom mentioned in the scroll."
-        ),
-        "choices": {
-            "take_locket": {
-                "desc": "Take the locket and examine it.",
-                "result_scene": "reward",
-                "effects": {"add_inventory": "engraved_locket", "add_journal": "Recovered an engraved locket."},
-            },
-            "leave_locket": {
-                "desc": "Leave the locket and tend to your wounds.",
-                "result_scene": "intro",
-            },
-        },
-    },
-    "reward": {
-        "title": "A Minor Resolution",
-        "desc": (
-            "A small sense of peace settles over Brinmere. Villagers may one day know the heirloom is found, or it may remain a secret. "
-            "You feel the night shift; the little arc of your story here closes for now."
-        ),
-        "choices": {
-            "end_session": {
-                "desc": "End the session and return to the shore (conclude mini-arc).",
-                "result_scene": "intro",
-            },
-            "keep_exploring": {
-                "desc": "Keep exploring for more mysteries.",
-                "result_scene": "intro",
-            },
-        },
-    },
-    "cursed_key": {
-        "title": "A Weight in the Pocket",
-        "desc": (
-            "The brass key glows coldly. You feel a heavy sorrow that tugs at your thoughts. "
-            "Perhaps the key demands something in return..."
-        ),
-        "choices": {
-            "seek_redemption": {
-                "desc": "Seek a way to make amends.",
-                "result_scene": "reward",
-            },
-            "bury_key": {
-                "desc": "Bury the key and hope the weight fades.",
-                "result_scene": "intro",
-            },
-        },
-    },
-}
+# Scenes live in worlds/<name>/ (see world_loader); set GAME_WORLD to load another world file.
+WORLD = load_world(os.getenv("GAME_WORLD", DEFAULT_WORLD_PATH))
 
 # -------------------------
 # Per-session Userdata
@@ -330,7 +65,7 @@ WORLD = {
 @dataclass
 class Userdata:
     player_name: Optional[str] = None
-    current_scene: str = "intro"
+    current_scene: str = field(default_factory=lambda: WORLD.start)
     history: List[Dict] = field(default_factory=list)  # list of {'scene', 'action', 'time', 'result_scene'}
     journal: List[str] = field(default_factory=list)
     inventory: List[str] = field(default_factory=list)
@@ -347,16 +82,8 @@ def scene_text(scene_key: str, userdata: Userdata) -> str:
     Build the descriptive text for the current scene, and append choices as short hints.
     Always end with 'What do you do?' so the voice flow prompts player input.
     """
-    scene = WORLD.get(scene_key)
-    if not scene:
-        return "You are in a featureless void. What do you do?"
-
-    desc = f"{scene['desc']}\n\nChoices:\n"
-    for cid, cmeta in scene.get("choices", {}).items():
-        desc += f"- {cmeta['desc']} (say: {cid})\n"
-    # GM MUST end with the action prompt
-    desc += "\nWhat do you do?"
-    return desc
+    # pre-rendered once per scene when its region loads
+    return WORLD.narration(scene_key) or "You are in a featureless void. What do you do?"
 
 def apply_effects(effects: dict, userdata: Userdata):
     if not effects:
@@ -392,7 +119,7 @@ async def start_adventure(
     userdata = ctx.userdata
     if player_name:
         userdata.player_name = player_name
-    userdata.current_scene = "intro"
+    userdata.current_scene = WORLD.start
     userdata.history = []
     userdata.journal = []
     userdata.inventory = []
@@ -402,8 +129,8 @@ async def start_adventure(
     userdata.started_at = datetime.utcnow().isoformat() + "Z"
 
     opening = (
-        f"Greetings {userdata.player_name or 'traveler'}. Welcome to '{WORLD['intro']['title']}'.\n\n"
-        + scene_text("intro", userdata)
+        f"Greetings {userdata.player_name or 'traveler'}. Welcome to '{WORLD.title}'.\n\n"
+        + scene_text(WORLD.start, userdata)
     )
     # Ensure GM prompt present
     if not opening.endswith("What do you do?"):
@@ -416,7 +143,7 @@ async def get_scene(
 ) -> str:
     """Return the current scene description (useful for 'remind me where I am')."""
     userdata = ctx.userdata
-    scene_k = userdata.current_scene or "intro"
+    scene_k = userdata.current_scene or WORLD.start
     txt = scene_text(scene_k, userdata)
     return txt
 
@@ -430,33 +157,24 @@ async def player_action(
     update userdata, advance to the next scene and return the GM's next description (ending with 'What do you do?').
     """
     userdata = ctx.userdata
-    current = userdata.current_scene or "intro"
+    current = userdata.current_scene or WORLD.start
     scene = WORLD.get(current)
+    matcher = WORLD.matcher(current)
+    if not scene or matcher is None:
+        return scene_text(current, userdata)
     action_text = (action or "").strip()
 
-    # Attempt 1: match exact action key (e.g., 'inspect_box')
-    chosen_key = None
-    if action_text.lower() in (scene.get("choices") or {}):
-        chosen_key = action_text.lower()
+    # Exact action key, else the best weighted keyword/synonym match for this scene
+    match = matcher.match(action_text)
+    chosen_key = match.choice
 
-    # Attempt 2: fuzzy match by checking if action_text contains the choice key or descriptive words
-    if not chosen_key:
-        # try to find a choice whose description words appear in action_text
-        for cid, cmeta in (scene.get("choices") or {}).items():
-            desc = cmeta.get("desc", "").lower()
-            if cid in action_text.lower() or any(w in action_text.lower() for w in desc.split()[:4]):
-                chosen_key = cid
-                break
-
-    # Attempt 3: fallback by simple keyword matching against choice descriptions
-    if not chosen_key:
-        for cid, cmeta in (scene.get("choices") or {}).items():
-            for keyword in cmeta.get("desc", "").lower().split():
-                if keyword and keyword in action_text.lower():
-                    chosen_key = cid
-                    break
-            if chosen_key:
-                break
+    if match.ambiguous:
+        # Two choices fit about equally well: ask rather than guess
+        options = [scene["choices"][key]["desc"].rstrip(".") for key, _ in match.candidates[:2]]
+        return (
+            f"Do you mean: {options[0].lower()}, or {options[1].lower()}?\n\n"
+            + scene_text(current, userdata)
+        )
 
     if not chosen_key:
         # If we still can't resolve, ask a clarifying GM response but keep it short and end with prompt.
@@ -526,7 +244,7 @@ async def restart_adventure(
 ) -> str:
     """Reset the userdata and start again."""
     userdata = ctx.userdata
-    userdata.current_scene = "intro"
+    userdata.current_scene = WORLD.start
     userdata.history = []
     userdata.journal = []
     userdata.inventory = []
@@ -536,7 +254,7 @@ async def restart_adventure(
     userdata.started_at = datetime.utcnow().isoformat() + "Z"
     greeting = (
         "The world resets. A new tide laps at the shore. You stand once more at the beginning.\n\n"
-        + scene_text("intro", userdata)
+        + scene_text(WORLD.start, userdata)
     )
     if not greeting.endswith("What do you do?"):
         greeting += "\nWhat do you do?"
@@ -570,11 +288,11 @@ class GameMasterAgent(Agent):
 # Entrypoint & Prewarm (keeps speech functionality)
 # -------------------------
 def prewarm(proc: JobProcess):
-    # load VAD model and stash on process userdata, try/catch like original file
+    # load shared models once per process, try/catch like original file
     try:
-        proc.userdata["vad"] = silero.VAD.load()
+        ModelRegistry.for_process(proc).prewarm()
     except Exception:
-        logger.warning("VAD prewarm failed; continuing without preloaded VAD.")
+        logger.warning("Model prewarm failed; continuing without preloaded VAD.")
 
 async def entrypoint(ctx: JobContext):
     ctx.log_context_fields = {"room": ctx.room.name}
@@ -583,6 +301,8 @@ async def entrypoint(ctx: JobContext):
 
     userdata = Userdata()
 
+    models = ModelRegistry.for_process(ctx.proc)
+
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
         llm=google.LLM(model="gemini-2.5-flash"),
@@ -591,8 +311,8 @@ async def entrypoint(ctx: JobContext):
             style="Conversational",
             text_pacing=True,
         ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata.get("vad"),
+        turn_detection=models.turn_detector(),
+        vad=models.get("vad"),
         userdata=userdata,
     )
 
@@ -600,7 +320,7 @@ async def entrypoint(ctx: JobContext):
     await session.start(
         agent=GameMasterAgent(),
         room=ctx.room,
-        room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()),
+        room_input_options=RoomInputOptions(noise_cancellation=models.noise_cancellation()),
     )
 
     await ctx.connect()
@@ -0,0 +1,288 @@
+"""
+Data-driven game worlds.
+
+A world is a JSON (or YAML) manifest:
+
+    {
+      "title": "A Shadow over Brinmere",
+      "start": "intro",
+      "resolutions": ["reward"],
+      "regions": {"shore": "regions/shore.json", ...}
+    }
+
+Each region file holds {"scenes": {key: {title, desc, choices}}}. A small world
+can put "scenes" directly in the manifest instead of "regions".
+
+`load_world` validates every scene and every choice's result_scene up front,
+keeping only the choice edges, and precomputes the scene graph: what is
+reachable from the start, the shortest number of moves from each scene to a
+resolution, and the scenes that can never reach one. Scene text, pre-rendered
+narration and compiled action matchers are loaded a region at a time, the
+first time a scene in it is visited, and at most `max_regions` regions stay
+in memory. Everything is shared by all sessions of the process; a session
+only holds its current scene key.
+"""
+
+import json
+import logging
+import os
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, List, Mapping, Optional, Tuple
+
+from action_matcher import SceneMatcher, compile_world
+
+logger = logging.getLogger("voice_game_master.world")
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WORLD_PATH = os.path.join(SCRIPT_DIR, "worlds", "brinmere", "world.json")
+
+MAX_REGIONS = 8  # regions kept loaded per process
+EFFECT_KEYS = frozenset({"add_journal", "add_inventory"})  # see agent.apply_effects
+MAX_REPORTED_ERRORS = 20
+
+
+class WorldError(ValueError):
+    """The world files are malformed or the scene graph is inconsistent."""
+
+
+def _read(path: str) -> Any:
+    if path.endswith((".yaml", ".yml")):
+        try:
+            import yaml
+        except ImportError as e:
+            raise WorldError(f"PyYAML is required to load {path}") from e
+        with open(path, encoding="utf-8") as f:
+            return yaml.safe_load(f)
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _scene_errors(key: str, scene: Any) -> List[str]:
+    if not isinstance(scene, dict):
+        return [f"scene {key!r} is not an object"]
+    errors = [
+        f"scene {key!r}: {field} must be a non-empty string"
+        for field in ("title", "desc")
+        if not isinstance(scene.get(field), str) or not scene[field].strip()
+    ]
+    choices = scene.get("choices", {})
+    if not isinstance(choices, dict):
+        return errors + [f"scene {key!r}: choices must be an object"]
+    for cid, choice in choices.items():
+        where = f"scene {key!r} choice {cid!r}"
+        if not isinstance(choice, dict):
+            errors.append(f"{where} is not an object")
+            continue
+        for field in ("desc", "result_scene"):
+            if not isinstance(choice.get(field), str) or not choice[field].strip():
+                errors.append(f"{where}: {field} must be a non-empty string")
+        effects = choice.get("effects", {})
+        if not isinstance(effects, dict):
+            errors.append(f"{where}: effects must be an object")
+            continue
+        for effect, value in effects.items():
+            if effect not in EFFECT_KEYS:
+                errors.append(f"{where}: unknown effect {effect!r}")
+            elif not isinstance(value, str):
+                errors.append(f"{where}: effect {effect!r} must be a string")
+    return errors
+
+
+def render_scene(scene: Mapping[str, Any]) -> str:
+    """Scene description plus choice hints, ending with the GM's action prompt."""
+    desc = f"{scene['desc']}\n\nChoices:\n"
+    for cid, cmeta in scene.get("choices", {}).items():
+        desc += f"- {cmeta['desc']} (say: {cid})\n"
+    # GM MUST end with the action prompt
+    desc += "\nWhat do you do?"
+    return desc
+
+
+@dataclass(frozen=True)
+class SceneGraph:
+    edges: Dict[str, Tuple[str, ...]]  # scene -> result scenes of its choices
+    reachable: FrozenSet[str]  # from the start scene
+    distance: Dict[str, int]  # moves to the nearest resolution (absent: unreachable)
+    dead_ends: FrozenSet[str]  # reachable scenes with no path to a resolution
+
+    @classmethod
+    def build(cls, edges: Dict[str, Tuple[str, ...]], start: str, resolutions: List[str]) -> "SceneGraph":
+        reachable = {start}
+        queue = deque([start])
+        while queue:
+            for nxt in edges[queue.popleft()]:
+                if nxt not in reachable:
+                    reachable.add(nxt)
+                    queue.append(nxt)
+
+        # BFS backwards from every resolution at once
+        incoming: Dict[str, List[str]] = {key: [] for key in edges}
+        for key, targets in edges.items():
+            for target in set(targets):
+                incoming[target].append(key)
+        distance = {key: 0 for key in resolutions}
+        queue = deque(resolutions)
+        while queue:
+            key = queue.popleft()
+            for prev in incoming[key]:
+                if prev not in distance:
+                    distance[prev] = distance[key] + 1
+                    queue.append(prev)
+
+        return cls(
+            edges=edges,
+            reachable=frozenset(reachable),
+            distance=distance,
+            dead_ends=frozenset(key for key in reachable if key not in distance),
+        )
+
+
+@dataclass(frozen=True)
+class Region:
+    scenes: Dict[str, Dict[str, Any]]
+    narration: Dict[str, str]
+    matchers: Dict[str, SceneMatcher]
+
+    @classmethod
+    def compile(cls, scenes: Dict[str, Dict[str, Any]]) -> "Region":
+        return cls(
+            scenes=scenes,
+            narration={key: render_scene(scene) for key, scene in scenes.items()},
+            matchers=compile_world(scenes),
+        )
+
+
+class World:
+    """A validated world whose regions load on first use."""
+
+    def __init__(
+        self,
+        path: str,
+        title: str,
+        start: str,
+        region_files: Dict[str, Optional[str]],
+        scene_regions: Dict[str, str],
+        graph: SceneGraph,
+        max_regions: int = MAX_REGIONS,
+    ):
+        self.path = path
+        self.title = title
+        self.start = start
+        self.graph = graph
+        self.max_regions = max_regions
+        self._region_files = region_files
+        self._scene_regions = scene_regions
+        self._regions: "OrderedDict[str, Region]" = OrderedDict()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._scene_regions
+
+    def __len__(self) -> int:
+        return len(self._scene_regions)
+
+    def _region(self, name: str) -> Region:
+        region = self._regions.get(name)
+        if region is not None:
+            self._regions.move_to_end(name)
+            return region
+        region_file = self._region_files[name]
+        data = _read(region_file) if region_file else _read(self.path)
+        region = Region.compile(
+            {key: scene for key, scene in data["scenes"].items() if self._scene_regions.get(key) == name}
+        )
+        self._regions[name] = region
+        while len(self._regions) > self.max_regions:
+            self._regions.popitem(last=False)
+        return region
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        name = self._scene_regions.get(key)
+        return self._region(name).scenes[key] if name else None
+
+    def narration(self, key: str) -> Optional[str]:
+        name = self._scene_regions.get(key)
+        return self._region(name).narration[key] if name else None
+
+    def matcher(self, key: str) -> Optional[SceneMatcher]:
+        name = self._scene_regions.get(key)
+        return self._region(name).matchers[key] if name else None
+
+
+def load_world(path: str = DEFAULT_WORLD_PATH, max_regions: int = MAX_REGIONS) -> World:
+    """Validate a world manifest and its regions and precompute the scene graph."""
+    manifest = _read(path)
+    if not isinstance(manifest, dict):
+        raise WorldError(f"{path}: manifest must be an object")
+    base = os.path.dirname(os.path.abspath(path))
+
+    if "regions" in manifest:
+        if not isinstance(manifest["regions"], dict) or not manifest["regions"]:
+            raise WorldError(f"{path}: regions must be a non-empty object")
+        region_files = {name: os.path.join(base, rel) for name, rel in manifest["regions"].items()}
+    else:
+        region_files = {"main": None}  # scenes live in the manifest itself
+
+    errors: List[str] = []
+    edges: Dict[str, Tuple[str, ...]] = {}
+    scene_regions: Dict[str, str] = {}
+    for name, region_file in region_files.items():
+        data = _read(region_file) if region_file else manifest
+        scenes = data.get("scenes") if isinstance(data, dict) else None
+        if not isinstance(scenes, dict) or not scenes:
+            errors.append(f"region {name!r}: scenes must be a non-empty object")
+            continue
+        for key, scene in scenes.items():
+            if key in scene_regions:
+                errors.append(f"scene {key!r} defined in both {scene_regions[key]!r} and {name!r}")
+                continue
+            errors.extend(_scene_errors(key, scene))
+            scene_regions[key] = name
+            choices = scene.get("choices") if isinstance(scene, dict) else None
+            edges[key] = tuple(
+                c["result_scene"]
+                for c in (choices.values() if isinstance(choices, dict) else ())
+                if isinstance(c, dict) and isinstance(c.get("result_scene"), str)
+            )
+        # only the edges are kept; scene text is loaded again when the region is visited
+
+    for key, targets in edges.items():
+        for target in targets:
+            if target not in scene_regions:
+                errors.append(f"scene {key!r} leads to missing scene {target!r}")
+
+    start = manifest.get("start")
+    resolutions = manifest.get("resolutions") or []
+    if start not in scene_regions:
+        errors.append(f"start scene {start!r} does not exist")
+    if not isinstance(resolutions, list) or not resolutions:
+        errors.append("resolutions must be a non-empty list of scene keys")
+    else:
+        errors.extend(f"resolution scene {key!r} does not exist" for key in resolutions if key not in scene_regions)
+
+    if errors:
+        shown = "\n  ".join(errors[:MAX_REPORTED_ERRORS])
+        more = f"\n  ... and {len(errors) - MAX_REPORTED_ERRORS} more" if len(errors) > MAX_REPORTED_ERRORS else ""
+        raise WorldError(f"invalid world {path}:\n  {shown}{more}")
+
+    graph = SceneGraph.build(edges, start, resolutions)
+    unreachable = len(edges) - len(graph.reachable)
+    if graph.dead_ends:
+        logger.warning("World %s: no path to a resolution from %s", path, sorted(graph.dead_ends))
+    if unreachable:
+        logger.warning("World %s: %d scenes unreachable from %r", path, unreachable, start)
+
+    world = World(
+        path=path,
+        title=manifest.get("title") or start,
+        start=start,
+        region_files=region_files,
+        scene_regions=scene_regions,
+        graph=graph,
+        max_regions=max_regions,
+    )
+    logger.info(
+        "Loaded world %r: %d scenes in %d regions, %d moves from start to a resolution",
+        world.title, len(world), len(region_files), graph.distance.get(start, -1),
+    )
+    return world
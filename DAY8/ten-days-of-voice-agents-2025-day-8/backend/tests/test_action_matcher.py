@@ -0,0 +1,51 @@
+from action_matcher import SceneMatcher, terms
+
+CELLAR = {
+    "inspect_box": {"desc": "Examine the iron-bound box", "result_scene": "box"},
+    "take_map": {"desc": "Take the soggy map from the shelf", "result_scene": "map"},
+    "descend_stairs": {"desc": "Climb down the stairs into the dark", "result_scene": "deep"},
+    "leave_cellar": {"desc": "Leave the cellar and return to the shore", "result_scene": "shore"},
+}
+
+
+def test_terms_fold_synonyms_stems_and_stopwords() -> None:
+    assert terms("I want to grab the boxes") == ["take", "box"]
+    assert terms("let's examine it") == ["inspect"]
+    assert terms("head downstairs") == ["walk", "descend"]
+
+
+def test_negation_drops_the_next_content_word() -> None:
+    assert terms("open the latch without the map") == ["open", "latch"]
+    assert terms("don't take it, inspect the box") == ["inspect", "box"]
+
+
+def test_exact_key_and_spaced_key_win_outright() -> None:
+    matcher = SceneMatcher(CELLAR)
+    assert matcher.match("take_map").choice == "take_map"
+    assert matcher.match("Descend Stairs").choice == "descend_stairs"
+
+
+def test_synonyms_reach_the_choice() -> None:
+    matcher = SceneMatcher(CELLAR)
+    assert matcher.match("I'll grab that map").choice == "take_map"
+    assert matcher.match("let me check the box").choice == "inspect_box"
+    assert matcher.match("go downstairs").choice == "descend_stairs"
+
+
+def test_negated_word_does_not_pick_its_choice() -> None:
+    matcher = SceneMatcher(CELLAR)
+    assert matcher.match("leave without the map").choice == "leave_cellar"
+
+
+def test_close_runner_up_is_flagged_ambiguous() -> None:
+    matcher = SceneMatcher(CELLAR)
+    result = matcher.match("take the box")
+    assert result.choice is None
+    assert result.ambiguous
+    assert {key for key, _ in result.candidates[:2]} == {"inspect_box", "take_map"}
+
+
+def test_stopwords_alone_match_nothing() -> None:
+    matcher = SceneMatcher(CELLAR)
+    result = matcher.match("um, can you do that please")
+    assert result.choice is None and not result.ambiguous
@@ -0,0 +1,106 @@
+import json
+import logging
+
+import pytest
+
+from world_loader import WorldError, load_world
+
+
+def _scene(title: str, **choices: str) -> dict:
+    return {
+        "title": title,
+        "desc": f"You stand in the {title.lower()}.",
+        "choices": {cid: {"desc": f"Go {cid}", "result_scene": target} for cid, target in choices.items()},
+    }
+
+
+def _write_world(tmp_path, scenes: dict, start: str = "gate", resolutions=("end",)) -> str:
+    path = tmp_path / "world.json"
+    path.write_text(
+        json.dumps({"title": "Test", "start": start, "resolutions": list(resolutions), "scenes": scenes}),
+        encoding="utf-8",
+    )
+    return str(path)
+
+
+SCENES = {
+    "gate": _scene("Gate", enter_hall="hall"),
+    "hall": _scene("Hall", go_end="end", go_back="gate"),
+    "end": _scene("End"),
+}
+
+
+def test_brinmere_loads_with_a_path_to_the_reward() -> None:
+    world = load_world()
+    assert world.start == "intro"
+    assert world.start in world.graph.reachable
+    assert world.graph.distance["reward"] == 0
+    assert world.graph.distance[world.start] > 0
+    assert world.narration(world.start).endswith("What do you do?")
+
+
+def test_single_file_world_precomputes_distances(tmp_path) -> None:
+    world = load_world(_write_world(tmp_path, SCENES))
+    assert world.graph.distance == {"end": 0, "hall": 1, "gate": 2}
+    assert not world.graph.dead_ends
+    assert world.matcher("hall").match("go back").choice == "go_back"
+
+
+def test_dangling_exit_is_rejected(tmp_path) -> None:
+    scenes = dict(SCENES, hall=_scene("Hall", go_end="end", open_trapdoor="cellar"))
+    with pytest.raises(WorldError, match="leads to missing scene 'cellar'"):
+        load_world(_write_world(tmp_path, scenes))
+
+
+def test_missing_start_scene_is_rejected(tmp_path) -> None:
+    with pytest.raises(WorldError, match="start scene 'lobby' does not exist"):
+        load_world(_write_world(tmp_path, SCENES, start="lobby"))
+
+
+def test_every_problem_is_reported_at_once(tmp_path) -> None:
+    scenes = dict(SCENES, hall={"title": "", "desc": "Hall", "choices": {"go_end": {"desc": "Go"}}})
+    with pytest.raises(WorldError) as excinfo:
+        load_world(_write_world(tmp_path, scenes, resolutions=("treasure",)))
+    message = str(excinfo.value)
+    assert "scene 'hall': title must be a non-empty string" in message
+    assert "choice 'go_end': result_scene must be a non-empty string" in message
+    assert "resolution scene 'treasure' does not exist" in message
+
+
+def test_unreachable_scene_and_dead_end_are_warned(tmp_path, caplog) -> None:
+    scenes = dict(
+        SCENES,
+        gate=_scene("Gate", enter_hall="hall", fall_in_pit="pit"),
+        pit=_scene("Pit"),
+        attic=_scene("Attic", go_end="end"),
+    )
+    with caplog.at_level(logging.WARNING, logger="voice_game_master.world"):
+        world = load_world(_write_world(tmp_path, scenes))
+
+    assert "attic" not in world.graph.reachable
+    assert world.graph.dead_ends == {"pit"}
+    assert "1 scenes unreachable" in caplog.text
+    assert "no path to a resolution from ['pit']" in caplog.text
+
+
+def test_regions_load_lazily_and_are_evicted(tmp_path) -> None:
+    (tmp_path / "a.json").write_text(json.dumps({"scenes": {"gate": SCENES["gate"]}}), encoding="utf-8")
+    (tmp_path / "b.json").write_text(json.dumps({"scenes": {"hall": SCENES["hall"], "end": SCENES["end"]}}), encoding="utf-8")
+    manifest = tmp_path / "world.json"
+    manifest.write_text(
+        json.dumps({"start": "gate", "resolutions": ["end"], "regions": {"a": "a.json", "b": "b.json"}}),
+        encoding="utf-8",
+    )
+    world = load_world(str(manifest), max_regions=1)
+
+    assert not world._regions
+    assert world.get("hall")["title"] == "Hall"
+    assert world.get("gate")["title"] == "Gate"
+    assert list(world._regions) == ["a"]
+
+
+def test_yaml_world(tmp_path) -> None:
+    yaml = pytest.importorskip("yaml")
+    path = tmp_path / "world.yaml"
+    path.write_text(yaml.safe_dump({"start": "gate", "resolutions": ["end"], "scenes": SCENES}), encoding="utf-8")
+    assert len(load_world(str(path))) == 3
@@ -1,9 +1,6 @@
 
 
-import json
 import logging
-import os
-import asyncio
 import uuid
 from dataclasses import dataclass, field
 from datetime import datetime
@@ -23,8 +20,12 @@ from livekit.agents import (
     RunContext,
 )
 
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.plugins import murf, google, deepgram
+
+from cart import Cart
+from model_registry import ModelRegistry
+from order_journal import OrderJournal
+from product_index import ProductIndex
 
 # -------------------------
 # Logging
@@ -281,12 +282,11 @@ CATALOG = [
 
 
 
-ORDERS_FILE = "orders.json"
+# compiled once at import: attribute bitsets, token vocabulary, price-sorted array
+product_index = ProductIndex(CATALOG)
 
-# ensure orders file exists
-if not os.path.exists(ORDERS_FILE):
-    with open(ORDERS_FILE, "w") as f:
-        json.dump([], f)
+# append-only orders.jsonl; the old orders.json is imported on first run
+order_journal = OrderJournal()
 
 # -------------------------
 # Per-session Userdata (shopping-centric)
@@ -296,7 +296,8 @@ class Userdata:
     player_name: Optional[str] = None  # retained name field (player -> customer)
     session_id: str = field(default_factory=lambda: str(uuid.uuid4())[:8])
     started_at: str = field(default_factory=lambda: datetime.utcnow().isoformat() + "Z")
-    cart: List[Dict] = field(default_factory=list)  # list of {product_id, quantity, attrs}
+    cart: Cart = field(default_factory=Cart)  # lines keyed by (product_id, size), running total
+    last_results: List[Dict] = field(default_factory=list)  # products from the last show_catalog, in spoken order
     orders: List[Dict] = field(default_factory=list)  # orders placed in this session
     history: List[Dict] = field(default_factory=list)  # conversational actions for trace
 
@@ -304,228 +305,25 @@ class Userdata:
 # Merchant-layer helpers (ACP-inspired mini layer)
 # -------------------------
 
-def _load_all_orders() -> List[Dict]:
-    try:
-        with open(ORDERS_FILE, "r") as f:
-            return json.load(f)
-    except Exception:
-        return []
-
-
 def _save_order(order: Dict):
-    orders = _load_all_orders()
-    orders.append(order)
-    with open(ORDERS_FILE, "w") as f:
-        json.dump(orders, f, indent=2)
+    order_journal.append(order)
 
 
-def list_products(filters: Optional[Dict] = None) -> List[Dict]:
-    """Naive filtering by category, max_price, color, size substring, or query words.
+def list_products(filters: Optional[Dict] = None, limit: Optional[int] = None) -> List[Dict]:
+    """Filter by category (synonyms like 'phones' or 'tees' ok), min/max price, color, size or query words.
 
-    Improvements:
-    - Accepts category synonyms (e.g., 'phone', 'mobile', 'phones' -> 'mobile').
-    - Supports a flexible max_price and min_price (if provided in filters).
-    - Matches category by substring if exact match fails.
+    Answered from the precompiled product_index: name matches first, then catalog order.
     """
-    filters = filters or {}
-    results = []
-    query = filters.get("q")
-    category = filters.get("category")
-    max_price = filters.get("max_price") or filters.get("to") or filters.get("max")
-    min_price = filters.get("min_price") or filters.get("from") or filters.get("min")
-    color = filters.get("color")
-    size = filters.get("size")
-
-    # normalize category synonyms
-    if category:
-        cat = category.lower()
-        if cat in ("phone", "phones", "mobile", "mobile phone", "mobiles"):
-            category = "mobile"
-        elif cat in ("tshirt", "t-shirts", "tees", "tee"):
-            category = "tshirt"
-        else:
-            category = cat
-
-    for p in CATALOG:
-        ok = True
-        # category matching: allow substring matches if direct equality fails
-        if category:
-            pcat = p.get("category", "").lower()
-            if pcat != category and category not in pcat and pcat not in category:
-                ok = False
-        if max_price:
-            try:
-                if p.get("price", 0) > int(max_price):
-                    ok = False
-            except Exception:
-                pass
-        if min_price:
-            try:
-                if p.get("price", 0) < int(min_price):
-                    ok = False
-            except Exception:
-                pass
-        if color and p.get("color") and p.get("color") != color:
-            ok = False
-        if size and (not p.get("sizes") or size not in p.get("sizes")):
-            ok = False
-        if query:
-            q = query.lower()
-            # if query mentions 'phone' or 'mobile', accept mobile category too
-            if "phone" in q or "mobile" in q:
-                if p.get("category") != "mobile":
-                    ok = False
-            else:
-                if q not in p.get("name", "").lower() and q not in p.get("description", "").lower():
-                    ok = False
-        if ok:
-            results.append(p)
-    return results
+    return product_index.filter(filters, limit)[1]
 
 
 def find_product_by_ref(ref_text: str, candidates: Optional[List[Dict]] = None) -> Optional[Dict]:
-    """Resolve references like 'second hoodie' or 'black hoodie' to a product dict.
-    Heuristics improved:
-    - Handle ordinals like 'first/second/third' within a filtered candidate list.
-    - If ref mentions 'phone' or 'mobile' prefer mobile category products.
-    - Match by id, color+category, name substring, or numeric index.
-    """
-    ref = (ref_text or "").lower().strip()
-    cand = candidates if candidates is not None else CATALOG
-
-    # prefer mobiles if user explicitly mentions phone/mobile
-    wants_mobile = any(w in ref for w in ("phone", "phones", "mobile", "mobiles"))
-    filtered = cand
-    if wants_mobile:
-        filtered = [p for p in cand if p.get("category") == "mobile"]
-        if not filtered:
-            filtered = cand
-
-    # ordinal handling
-    ordinals = {"first": 0, "second": 1, "third": 2, "fourth": 3}
-    for word, idx in ordinals.items():
-        if word in ref:
-            if idx < len(filtered):
-                return filtered[idx]
-
-    # direct id match
-    for p in cand:
-        if p["id"].lower() == ref:
-            return p
-
-    # color + category matching
-    for p in cand:
-        if p.get("color") and p["color"] in ref and p.get("category") and p["category"] in ref:
-            return p
-
-    # name substring or keywords
-    for p in filtered:
-        name = p["name"].lower()
-        if all(tok in name for tok in ref.split() if len(tok) > 2):
-            return p
-    for p in cand:
-        for tok in ref.split():
-            if len(tok) > 2 and tok in p["name"].lower():
-                return p
-
-    # numeric index like '2' -> second
-    for token in ref.split():
-        if token.isdigit():
-            idx = int(token) - 1
-            if 0 <= idx < len(filtered):
-                return filtered[idx]
-
-    # fallback: if user said 'second phone' but we couldn't match earlier, try overall cand ordinals
-    for word, idx in ordinals.items():
-        if word in ref and idx < len(cand):
-            return cand[idx]
-
-    return None
+    """Resolve references like 'second hoodie', 'black hoodie', 'mug-001' or '2' to a product dict.
 
-
-@function_tool
-async def show_catalog(
-    ctx: RunContext[Userdata],
-    q: Annotated[Optional[str], Field(description="Search query (optional)", default=None)] = None,
-    category: Annotated[Optional[str], Field(description="Category (optional)", default=None)] = None,
-    max_price: Annotated[Optional[int], Field(description="Maximum price (optional)", default=None)] = None,
-    color: Annotated[Optional[str], Field(description="Color (optional)", default=None)] = None,
-) -> str:
-    """Return a short spoken summary of matching products (name, price, id).
-    Improvements:
-    - Recognize category synonyms like 'phones' and 'tees'.
-    - Return up to 8 items and explicitly call out mobiles if present.
+    Ordinals and numbers count within `candidates` (the items the customer last heard);
+    ids, colors, categories and name words are looked up in the product token index.
     """
-    userdata = ctx.userdata
-    # try to normalize category input
-    if category:
-        cat = category.lower()
-        if cat in ("phone", "phones", "mobile", "mobile phone", "mobiles"):
-            category = "mobile"
-        elif cat in ("tshirt", "t-shirts", "tees", "tee"):
-            category = "tshirt"
-        else:
-            category = cat
-    # If query mentions phones, prefer category mobile
-    if not category and q:
-        if any(w in q.lower() for w in ("phone", "phones", "mobile", "mobiles")):
-            category = "mobile"
-        if any(w in q.lower() for w in ("tee", "tshirt", "t-shirts", "tees")):
-            category = "tshirt"
-
-    filters = {"q": q, "category": category, "max_price": max_price, "color": color}
-    prods = list_products({k: v for k, v in filters.items() if v is not None})
-    if not prods:
-        return "Sorry — I couldn't find any items that match. Would you like to try another search?"
-    # Summarize top 8
-    lines = [f"Here are the top {min(8, len(prods))} items I found at Dr Abhishek Shop:"]
-    for idx, p in enumerate(prods[:8], start=1):
-        size_info = f" (sizes: {', '.join(p['sizes'])})" if p.get('sizes') else ""
-        lines.append(f"{idx}. {p['name']} — {p['price']} {p['currency']} (id: {p['id']}){size_info}")
-    lines.append("You can say: 'I want the second item in size M' or 'add mug-001 to my cart, quantity 2'.")
-    # If mobiles were in results, add a short phrasing hint
-    if any(p.get('category') == 'mobile' for p in prods):
-        lines.append("To buy a phone say: 'Add phone-002 to my cart' or 'I want the second phone, quantity 1'.")
-    return "\n".join(lines)
-
-
-def find_product_by_ref(ref_text: str, candidates: Optional[List[Dict]] = None) -> Optional[Dict]:
-    """Resolve references like 'second hoodie' or 'black hoodie' to a product dict.
-    Very simple heuristic: look for ordinal words, color or exact id/name matching.
-    """
-    ref = (ref_text or "").lower().strip()
-    cand = candidates if candidates is not None else CATALOG
-
-    # ordinal handling
-    ordinals = {"first": 0, "second": 1, "third": 2}
-    for word, idx in ordinals.items():
-        if word in ref:
-            if idx < len(cand):
-                return cand[idx]
-
-    # direct id match
-    for p in cand:
-        if p["id"].lower() == ref:
-            return p
-
-    # color + category matching
-    for p in cand:
-        if p.get("color") and p["color"] in ref and p.get("category") and p["category"] in ref:
-            return p
-
-    # name substring
-    for p in cand:
-        if p["name"].lower() in ref or any(w in p["name"].lower() for w in ref.split()):
-            return p
-
-    # fallback: if a number present, try to parse as '2nd of last list'
-    for token in ref.split():
-        if token.isdigit():
-            idx = int(token) - 1
-            if 0 <= idx < len(cand):
-                return cand[idx]
-
-    return None
+    return product_index.resolve(ref_text, candidates)
 
 
 def create_order_object(line_items: List[Dict], currency: str = "INR") -> Dict:
@@ -537,7 +335,7 @@ def create_order_object(line_items: List[Dict], currency: str = "INR") -> Dict:
     for li in line_items:
         pid = li.get("product_id")
         qty = int(li.get("quantity", 1))
-        prod = next((p for p in CATALOG if p["id"] == pid), None)
+        prod = product_index.get(pid)
         if not prod:
             raise ValueError(f"Product {pid} not found")
         line_total = prod["price"] * qty
@@ -563,10 +361,7 @@ def create_order_object(line_items: List[Dict], currency: str = "INR") -> Dict:
 
 
 def get_most_recent_order() -> Optional[Dict]:
-    all_orders = _load_all_orders()
-    if not all_orders:
-        return None
-    return all_orders[-1]
+    return order_journal.last()
 
 # -------------------------
 # Agent Tools (function_tool) exposed to the LLM layer
@@ -583,12 +378,14 @@ async def show_catalog(
     """Return a short spoken summary of matching products (name, price, id)."""
     userdata = ctx.userdata
     filters = {"q": q, "category": category, "max_price": max_price, "color": color}
-    prods = list_products({k: v for k, v in filters.items() if v is not None})
+    _, prods = product_index.filter({k: v for k, v in filters.items() if v is not None}, limit=4)
     if not prods:
         return "Sorry — I couldn't find any items that match. Would you like to try another search?"
+    # "the second one" later refers to this list
+    userdata.last_results = prods
     # Summarize top 4
-    lines = [f"Here are the top {min(4, len(prods))} items I found at Dr Abhishek Shop:"]
-    for idx, p in enumerate(prods[:4], start=1):
+    lines = [f"Here are the top {len(prods)} items I found at Dr Abhishek Shop:"]
+    for idx, p in enumerate(prods, start=1):
         lines.append(f"{idx}. {p['name']} — {p['price']} {p['currency']} (id: {p['id']})")
     lines.append("You can say: 'I want the second item in size M' or 'add mug-001 to my cart, quantity 2'.")
     return "\n".join(lines)
@@ -603,22 +400,22 @@ async def add_to_cart(
 ) -> str:
     """Resolve a product and add to the session cart."""
     userdata = ctx.userdata
-    # take recent catalog as candidates
-    candidates = CATALOG
-    prod = find_product_by_ref(product_ref, candidates)
+    # resolve against what the customer last heard, falling back to the whole catalog
+    prod = find_product_by_ref(product_ref, userdata.last_results)
     if not prod:
         return "I couldn't resolve which product you meant. Try using the item id or say 'show catalog' to hear options.'"
-    userdata.cart.append({
-        "product_id": prod["id"],
-        "quantity": int(quantity),
-        "attrs": {"size": size} if size else {},
-    })
+    try:
+        line = userdata.cart.add(prod, int(quantity), size)
+    except ValueError:
+        return "How many would you like? The quantity should be at least 1."
     userdata.history.append({
         "time": datetime.utcnow().isoformat() + "Z",
         "action": "add_to_cart",
         "product_id": prod["id"],
         "quantity": int(quantity),
     })
+    if line.quantity > int(quantity):
+        return f"Added {quantity} more {prod['name']} — you now have {line.quantity} in your cart. What would you like to do next?"
     return f"Added {quantity} x {prod['name']} to your cart. What would you like to do next?"
 
 
@@ -630,27 +427,63 @@ async def show_cart(
     if not userdata.cart:
         return "Your cart is empty. You can say 'show catalog' to browse items.'"
     lines = ["Items in your cart:"]
-    total = 0
     for li in userdata.cart:
-        p = next((x for x in CATALOG if x["id"] == li["product_id"]), None)
-        if not p:
-            continue
-        line_total = p["price"] * li.get("quantity", 1)
-        total += line_total
-        sz = li.get("attrs", {}).get("size")
-        sz_text = f", size {sz}" if sz else ""
-        lines.append(f"- {p['name']} x {li['quantity']}{sz_text}: {line_total} INR")
-    lines.append(f"Cart total: {total} INR")
+        sz_text = f", size {li.size}" if li.size else ""
+        lines.append(f"- {li.product['name']} x {li.quantity}{sz_text}: {li.line_total} INR")
+    lines.append(f"Cart total: {userdata.cart.total} INR")
     lines.append("Say 'place my order' to checkout or 'clear cart' to empty the cart.")
     return "\n".join(lines)
 
 
+@function_tool
+async def update_cart_quantity(
+    ctx: RunContext[Userdata],
+    product_ref: Annotated[str, Field(description="Reference to a product in the cart: id, name, or spoken ref")],
+    quantity: Annotated[int, Field(description="New quantity; 0 removes the item")],
+    size: Annotated[Optional[str], Field(description="Size (optional)", default=None)] = None,
+) -> str:
+    """Change how many of a cart item the customer wants."""
+    userdata = ctx.userdata
+    prod = find_product_by_ref(product_ref, [li.product for li in userdata.cart])
+    try:
+        line = userdata.cart.update(prod["id"], int(quantity), size) if prod else None
+    except ValueError:
+        return "The quantity can't be negative. How many would you like?"
+    if line is None:
+        return "I couldn't find that item in your cart. Say 'show cart' to hear what's in it."
+    userdata.history.append({
+        "time": datetime.utcnow().isoformat() + "Z",
+        "action": "update_cart_quantity",
+        "product_id": prod["id"],
+        "quantity": int(quantity),
+    })
+    if int(quantity) == 0:
+        return f"Removed {prod['name']}. Cart total is now {userdata.cart.total} INR."
+    return f"You now have {line.quantity} x {prod['name']}. Cart total is now {userdata.cart.total} INR."
+
+
+@function_tool
+async def remove_from_cart(
+    ctx: RunContext[Userdata],
+    product_ref: Annotated[str, Field(description="Reference to a product in the cart: id, name, or spoken ref")],
+    size: Annotated[Optional[str], Field(description="Size (optional)", default=None)] = None,
+) -> str:
+    """Take an item out of the session cart."""
+    userdata = ctx.userdata
+    prod = find_product_by_ref(product_ref, [li.product for li in userdata.cart])
+    line = userdata.cart.remove(prod["id"], size) if prod else None
+    if line is None:
+        return "I couldn't find that item in your cart. Say 'show cart' to hear what's in it."
+    userdata.history.append({"time": datetime.utcnow().isoformat() + "Z", "action": "remove_from_cart", "product_id": prod["id"]})
+    return f"Removed {prod['name']}. Cart total is now {userdata.cart.total} INR."
+
+
 @function_tool
 async def clear_cart(
     ctx: RunContext[Userdata],
 ) -> str:
     userdata = ctx.userdata
-    userdata.cart = []
+    userdata.cart.clear()
     userdata.history.append({"time": datetime.utcnow().isoformat() + "Z", "action": "clear_cart"})
     return "Your cart has been cleared. What would you like to do next?"
 
@@ -664,19 +497,11 @@ async def place_order(
     userdata = ctx.userdata
     if not userdata.cart:
         return "Your cart is empty — nothing to place. Would you like to browse items?"
-    # Build line_items
-    line_items = []
-    for li in userdata.cart:
-        line_items.append({
-            "product_id": li["product_id"],
-            "quantity": li.get("quantity", 1),
-            "attrs": li.get("attrs", {}),
-        })
-    order = create_order_object(line_items)
+    order = create_order_object(userdata.cart.line_items())
     userdata.orders.append(order)
     userdata.history.append({"time": datetime.utcnow().isoformat() + "Z", "action": "place_order", "order_id": order["id"]})
     # clear cart after order
-    userdata.cart = []
+    userdata.cart.clear()
     return f"Order placed. Order ID {order['id']}. Total {order['total']} {order['currency']}. What would you like to do next?"
 
 
@@ -706,25 +531,25 @@ class GameMasterAgent(Agent):
         Role: Help the customer browse the catalog, add items to cart, place orders, and review recent orders.
 
         Rules:
-            - Use the provided tools to show the catalog, add items to cart, show the cart, place orders, show last order and clear the cart.
+            - Use the provided tools to show the catalog, add items to cart, change or remove cart items, show the cart, place orders, show last order and clear the cart.
             - Keep continuity using the per-session userdata. Mention cart contents if relevant.
             - Drive short voice-first turns suitable for spoken delivery.
             - When presenting options, include product id and price (e.g. 'mug-001 — 299 INR').
         """
         super().__init__(
             instructions=instructions,
-            tools=[show_catalog, add_to_cart, show_cart, clear_cart, place_order, last_order],
+            tools=[show_catalog, add_to_cart, update_cart_quantity, remove_from_cart, show_cart, clear_cart, place_order, last_order],
         )
 
 # -------------------------
 # Entrypoint & Prewarm (keeps speech functionality untouched)
 # -------------------------
 def prewarm(proc: JobProcess):
-    # load VAD model and stash on process userdata, try/catch like original file
+    # load shared models once per process, try/catch like original file
     try:
-        proc.userdata["vad"] = silero.VAD.load()
+        ModelRegistry.for_process(proc).prewarm()
     except Exception:
-        logger.warning("VAD prewarm failed; continuing without preloaded VAD.")
+        logger.warning("Model prewarm failed; continuing without preloaded VAD.")
 
 
 async def entrypoint(ctx: JobContext):
@@ -734,6 +559,8 @@ async def entrypoint(ctx: JobContext):
 
     userdata = Userdata()
 
+    models = ModelRegistry.for_process(ctx.proc)
+
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
         llm=google.LLM(model="gemini-2.5-flash"),
@@ -742,8 +569,8 @@ async def entrypoint(ctx: JobContext):
             style="Conversational",
             text_pacing=True,
         ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata.get("vad"),
+        turn_detection=models.turn_detector(),
+        vad=models.get("vad"),
         userdata=userdata,
     )
 
@@ -751,7 +578,7 @@ async def entrypoint(ctx: JobContext):
     await session.start(
         agent=GameMasterAgent(),
         room=ctx.room,
-        room_input_options=RoomInputOptions(noise_cancellation=noise_cancellation.BVC()),
+        room_input_options=RoomInputOptions(noise_cancellation=models.noise_cancellation()),
     )
 
     await ctx.connect()
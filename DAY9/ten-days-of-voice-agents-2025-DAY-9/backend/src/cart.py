@@ -0,0 +1,100 @@
+"""
+Session shopping cart.
+
+Lines are keyed by (product_id, size), so adding the same product in the same
+size again bumps the quantity instead of adding a duplicate line. Each line
+keeps a reference to its product, and the cart total is updated on every
+mutation (add, update, remove, clear), so rendering the cart or checking out
+never searches the catalog.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+CartKey = Tuple[str, Optional[str]]
+
+
+@dataclass
+class CartLine:
+    product: Dict
+    quantity: int
+    size: Optional[str] = None
+
+    @property
+    def product_id(self) -> str:
+        return self.product["id"]
+
+    @property
+    def line_total(self) -> int:
+        return self.product["price"] * self.quantity
+
+
+class Cart:
+    def __init__(self):
+        self._lines: Dict[CartKey, CartLine] = {}
+        self.total = 0
+
+    def __len__(self) -> int:
+        return len(self._lines)
+
+    def __iter__(self) -> Iterator[CartLine]:
+        return iter(self._lines.values())
+
+    def add(self, product: Dict, quantity: int = 1, size: Optional[str] = None) -> CartLine:
+        """Add `quantity` of `product`, merging with an existing line of the same size."""
+        if quantity < 1:
+            raise ValueError("Quantity must be at least 1")
+        size = size.upper() if size else None
+        key = (product["id"], size)
+        line = self._lines.get(key)
+        if line is None:
+            line = self._lines[key] = CartLine(product=product, quantity=0, size=size)
+        line.quantity += quantity
+        self.total += product["price"] * quantity
+        return line
+
+    def find(self, product_id: str, size: Optional[str] = None) -> Optional[CartLine]:
+        """The line for `product_id` in `size`; without a size, its only line if it has one."""
+        size = size.upper() if size else None
+        line = self._lines.get((product_id, size))
+        if line is None and size is None:
+            lines = [li for li in self._lines.values() if li.product_id == product_id]
+            line = lines[0] if len(lines) == 1 else None
+        return line
+
+    def update(self, product_id: str, quantity: int, size: Optional[str] = None) -> Optional[CartLine]:
+        """Set a line's quantity (0 removes it); None if the cart has no such line."""
+        if quantity < 0:
+            raise ValueError("Quantity cannot be negative")
+        line = self.find(product_id, size)
+        if line is None:
+            return None
+        if quantity == 0:
+            return self.remove(product_id, line.size)
+        self.total += line.product["price"] * (quantity - line.quantity)
+        line.quantity = quantity
+        return line
+
+    def remove(self, product_id: str, size: Optional[str] = None) -> Optional[CartLine]:
+        """Drop a line; returns it, or None if the cart has no such line."""
+        line = self.find(product_id, size)
+        if line is None:
+            return None
+        del self._lines[(line.product_id, line.size)]
+        self.total -= line.line_total
+        return line
+
+    def clear(self):
+        self._lines.clear()
+        self.total = 0
+
+    def line_items(self) -> List[Dict]:
+        """Lines in the {product_id, quantity, attrs} shape create_order_object takes."""
+        return [
+            {
+                "product_id": line.product_id,
+                "quantity": line.quantity,
+                "attrs": {"size": line.size} if line.size else {},
+            }
+            for line in self
+        ]
@@ -0,0 +1,150 @@
+"""
+Append-only order journal.
+
+Each order is one JSON line appended to ``orders.jsonl``; nothing is ever
+rewritten. Placing an order is a single locked append, so its cost does not
+grow with the number of past orders and concurrent sessions (threads or
+worker processes) cannot clobber each other.
+
+- ``last()`` reads backwards from the end of the file (the tail pointer is
+  simply EOF), so it is O(1) in the number of orders.
+- ``get(order_id)`` uses an in-memory id -> byte offset index. It is built
+  from the file once and then extended with only the bytes appended since,
+  including appends made by other processes.
+
+A line cut short by a crash is ignored by readers and fenced off with a
+newline before the next append. The legacy ``orders.json`` array is imported
+once when the journal does not exist yet.
+"""
+
+import json
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: the in-process lock still serialises sessions
+    fcntl = None
+
+ORDERS_JOURNAL_FILE = "orders.jsonl"
+LEGACY_ORDERS_FILE = "orders.json"
+
+_TAIL_CHUNK = 4096
+
+
+@contextmanager
+def _exclusive(fd: int) -> Iterator[None]:
+    if fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _parse(line: bytes) -> Optional[Dict]:
+    try:
+        return json.loads(line)
+    except ValueError:
+        return None
+
+
+class OrderJournal:
+    def __init__(self, path: str = ORDERS_JOURNAL_FILE, legacy_path: str = LEGACY_ORDERS_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._index: Dict[str, int] = {}
+        self._indexed_upto = 0
+        if not os.path.exists(path):
+            self._import_legacy(legacy_path)
+
+    def _import_legacy(self, legacy_path: str):
+        orders = []
+        if os.path.exists(legacy_path):
+            try:
+                with open(legacy_path, "r") as f:
+                    orders = json.load(f)
+            except Exception:
+                orders = []
+        tmp = self.path + ".tmp"
+        with open(tmp, "wb") as f:
+            for order in orders:
+                f.write(self._encode(order))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def _encode(order: Dict) -> bytes:
+        return (json.dumps(order, separators=(",", ":"), ensure_ascii=False) + "\n").encode("utf-8")
+
+    def append(self, order: Dict):
+        line = self._encode(order)
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                with _exclusive(fd):
+                    end = os.lseek(fd, 0, os.SEEK_END)
+                    if end and os.lseek(fd, end - 1, os.SEEK_SET) >= 0 and os.read(fd, 1) != b"\n":
+                        os.write(fd, b"\n")  # fence off a torn line from a crashed writer
+                        end += 1
+                    os.write(fd, line)
+                    os.fsync(fd)
+            finally:
+                os.close(fd)
+            if end == self._indexed_upto:
+                self._index[order["id"]] = end
+                self._indexed_upto = end + len(line)
+
+    def last(self) -> Optional[Dict]:
+        """Most recently appended order, read from the tail of the file."""
+        try:
+            f = open(self.path, "rb")
+        except FileNotFoundError:
+            return None
+        with f:
+            pos = f.seek(0, os.SEEK_END)
+            buf = b""
+            while pos > 0:
+                step = min(_TAIL_CHUNK, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+                lines = buf.split(b"\n")
+                # lines[0] may be partial unless we reached the start of the file
+                for line in reversed(lines if pos == 0 else lines[1:]):
+                    if line.strip():
+                        order = _parse(line)
+                        if order is not None:
+                            return order
+                buf = lines[0]
+        return None
+
+    def _catch_up(self):
+        """Index lines appended since the last call (by any process)."""
+        with open(self.path, "rb") as f:
+            f.seek(self._indexed_upto)
+            offset = self._indexed_upto
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # still being written
+                order = _parse(line)
+                if order is not None and "id" in order:
+                    self._index[order["id"]] = offset
+                offset += len(line)
+            self._indexed_upto = offset
+
+    def get(self, order_id: str) -> Optional[Dict]:
+        with self._lock:
+            if order_id not in self._index and os.path.exists(self.path):
+                self._catch_up()
+            offset = self._index.get(order_id)
+        if offset is None:
+            return None
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            return _parse(f.readline())
@@ -0,0 +1,274 @@
+"""
+Precompiled filter index over the shop catalog.
+
+The catalog is compiled once at import. Every product gets a bit position
+(its place in the catalog) and each attribute value maps to an int bitset of
+the products that have it:
+
+- category, color and size -> bitset
+- name/description token -> set of positions, with a sorted vocabulary so a
+  query word also matches longer words it is a prefix of ("hood" -> "hoodie")
+- prices are kept in a sorted array; a price range is two bisects
+
+A filter is answered by ANDing bitsets, so it never visits products that the
+attribute filters already ruled out. Results come back in a stable order:
+products whose name matched the query first, then catalog order.
+
+Spoken product references ("the second one", "black hoodie") are resolved
+against a separate token index of ids, colors, categories and name words.
+"""
+
+import bisect
+import re
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+MOBILE_WORDS = ("phone", "phones", "mobile", "mobile phone", "mobiles")
+TSHIRT_WORDS = ("tshirt", "t-shirts", "tees", "tee")
+
+ORDINALS = {
+    "first": 1, "1st": 1, "second": 2, "2nd": 2, "third": 3, "3rd": 3,
+    "fourth": 4, "4th": 4, "fifth": 5, "5th": 5, "sixth": 6, "6th": 6,
+    "seventh": 7, "7th": 7, "eighth": 8, "8th": 8, "last": -1,
+}
+MIN_REF_TOKEN_LEN = 3
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN_RE.findall((text or "").lower())
+
+
+def normalize_category(category: Optional[str]) -> Optional[str]:
+    """Fold spoken category synonyms onto catalog categories ('phones' -> 'mobile')."""
+    if not category:
+        return category
+    cat = category.lower()
+    if cat in MOBILE_WORDS:
+        return "mobile"
+    if cat in TSHIRT_WORDS:
+        return "tshirt"
+    return cat
+
+
+def _to_int(value) -> Optional[int]:
+    if value is None or value == "":
+        return None
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+# bit offsets set in each byte value, for turning a bitset back into positions
+_BYTE_BITS = [tuple(i for i in range(8) if b >> i & 1) for b in range(256)]
+
+
+class ProductIndex:
+    def __init__(self, products: Sequence[Dict]):
+        self.products: List[Dict] = list(products)
+        self._by_id: Dict[str, Dict] = {p["id"]: p for p in self.products}
+        n = len(self.products)
+        self._all = (1 << n) - 1
+        by_category: Dict[str, List[int]] = {}
+        by_color: Dict[str, List[int]] = {}
+        no_color: List[int] = []
+        by_size: Dict[str, List[int]] = {}
+        self._by_token: Dict[str, Set[int]] = {}
+        self._by_name_token: Dict[str, Set[int]] = {}
+        self._category_cache: Dict[str, int] = {}
+        # what a spoken reference can name: id, color, category, name words
+        self._ref_tokens: Dict[str, Set[int]] = {}
+        self._by_id_lower: Dict[str, int] = {}
+
+        for pos, p in enumerate(self.products):
+            by_category.setdefault((p.get("category") or "").lower(), []).append(pos)
+            color = (p.get("color") or "").lower()
+            (by_color.setdefault(color, []) if color else no_color).append(pos)
+            for size in p.get("sizes") or ():
+                by_size.setdefault(size.upper(), []).append(pos)
+            name_tokens = set(tokenize(p.get("name", "")))
+            for tok in name_tokens:
+                self._by_name_token.setdefault(tok, set()).add(pos)
+            for tok in name_tokens.union(tokenize(p.get("description", ""))):
+                self._by_token.setdefault(tok, set()).add(pos)
+            self._by_id_lower[p["id"].lower()] = pos
+            ref_tokens = name_tokens.union(tokenize(p["id"]), tokenize(p.get("color")), tokenize(p.get("category")))
+            for tok in ref_tokens:
+                if len(tok) >= MIN_REF_TOKEN_LEN and not tok.isdigit():
+                    self._ref_tokens.setdefault(tok, set()).add(pos)
+
+        self._by_category = {k: _mask(v, n) for k, v in by_category.items()}
+        self._by_color = {k: _mask(v, n) for k, v in by_color.items()}
+        self._no_color = _mask(no_color, n)
+        self._by_size = {k: _mask(v, n) for k, v in by_size.items()}
+        self._vocab = sorted(self._by_token)
+        by_price = sorted(range(len(self.products)), key=lambda i: self.products[i].get("price", 0))
+        self._price_order = by_price
+        self._prices = [self.products[i].get("price", 0) for i in by_price]
+
+    def __len__(self) -> int:
+        return len(self.products)
+
+    def get(self, product_id: str) -> Optional[Dict]:
+        return self._by_id.get(product_id)
+
+    def resolve(self, ref_text: str, candidates: Optional[Sequence[Dict]] = None) -> Optional[Dict]:
+        """Resolve a spoken reference ('the second hoodie', 'black tshirt', 'mug-001', '2').
+
+        Ordinals and numbers index into `candidates` (what the user last heard),
+        narrowed to a category when one is named; if none of the candidates is
+        in that category, into the category's products in catalog order. Words are matched against the
+        id/color/category/name token index, among `candidates` first and then
+        across the whole catalog.
+        """
+        ref = (ref_text or "").lower().strip()
+        if not ref:
+            return None
+        for word in ref.split():
+            pos = self._by_id_lower.get(word.strip(".,!?'\""))
+            if pos is not None:
+                return self.products[pos]
+
+        tokens = tokenize(ref)
+        cand = list(candidates) if candidates else self.products
+        categories = {c for c in (normalize_category(t) for t in tokens) if c in self._by_category}
+        narrowed = [p for p in cand if (p.get("category") or "").lower() in categories] if categories else cand
+
+        ordinal = next((ORDINALS[t] for t in tokens if t in ORDINALS), None)
+        if ordinal is None:
+            ordinal = next((int(t) for t in tokens if t.isdigit() and len(t) <= 2), None)
+        if ordinal is not None:
+            pool = narrowed
+            if categories and not pool:
+                # "the second phone" when no phone was listed: count within that category
+                pool = [p for p in self.products if (p.get("category") or "").lower() in categories]
+            idx = ordinal - 1 if ordinal > 0 else len(pool) + ordinal
+            # out of range: let the agent ask rather than pick something else
+            return pool[idx] if 0 <= idx < len(pool) else None
+
+        words = [t for t in dict.fromkeys(tokens) if t in self._ref_tokens]
+        if not words:
+            return None
+        if candidates:
+            rank = {self._by_id_lower[p["id"].lower()]: i for i, p in enumerate(candidates) if p["id"].lower() in self._by_id_lower}
+            best = self._best_match(words, rank)
+            if best is not None:
+                return best
+        return self._best_match(words, None)
+
+    def _best_match(self, words: List[str], rank: Optional[Dict[int, int]]) -> Optional[Dict]:
+        """Product hit by the most reference words; ties go to the earliest ranked."""
+        scores: Counter = Counter()
+        for word in words:
+            hits = self._ref_tokens[word]
+            scores.update(hits if rank is None else hits.intersection(rank))
+        if not scores:
+            return None
+        order = rank if rank is not None else {}
+        pos = min(scores, key=lambda p: (-scores[p], order.get(p, p)))
+        return self.products[pos]
+
+    def _category_mask(self, category: str) -> int:
+        # Categories match exactly or by substring either way ("tshirt" ~ "tshirts");
+        # there are few distinct categories, so resolve once per spelling.
+        mask = self._category_cache.get(category)
+        if mask is None:
+            mask = 0
+            for cat, bits in self._by_category.items():
+                if cat == category or category in cat or (cat and cat in category):
+                    mask |= bits
+            self._category_cache[category] = mask
+        return mask
+
+    def _token_mask(self, token: str, table: Dict[str, Set[int]]) -> int:
+        hits: Set[int] = set()
+        i = bisect.bisect_left(self._vocab, token)
+        for term in self._vocab[i:]:
+            if not term.startswith(token):
+                break
+            hits |= table.get(term, set())
+        return _mask(hits, len(self.products))
+
+    def _price_mask(self, candidates: int, min_price: Optional[int], max_price: Optional[int]) -> int:
+        lo = 0 if min_price is None else bisect.bisect_left(self._prices, min_price)
+        hi = len(self._prices) if max_price is None else bisect.bisect_right(self._prices, max_price)
+        if hi - lo >= len(self.products):
+            return candidates
+        if hi - lo < _popcount(candidates):
+            return candidates & _mask(self._price_order[lo:hi], len(self.products))
+        # fewer candidates than products in the price band: check them directly
+        keep = []
+        for pos in _positions(candidates):
+            price = self.products[pos].get("price", 0)
+            if (min_price is None or price >= min_price) and (max_price is None or price <= max_price):
+                keep.append(pos)
+        return _mask(keep, len(self.products))
+
+    def filter(self, filters: Optional[Dict] = None, limit: Optional[int] = None) -> Tuple[int, List[Dict]]:
+        """Return (number of matches, matching products in ranked order, up to `limit`)."""
+        filters = filters or {}
+        mask = self._all
+        name_mask = 0
+
+        category = normalize_category(filters.get("category"))
+        if category:
+            mask &= self._category_mask(category)
+        color = filters.get("color")
+        if color:
+            mask &= self._by_color.get(color.lower(), 0) | self._no_color
+        size = filters.get("size")
+        if size:
+            mask &= self._by_size.get(size.upper(), 0)
+        query = (filters.get("q") or "").lower()
+        if query:
+            if "phone" in query or "mobile" in query:
+                mask &= self._by_category.get("mobile", 0)
+            else:
+                name_mask = self._all
+                for tok in dict.fromkeys(tokenize(query)):
+                    if not mask:
+                        break
+                    mask &= self._token_mask(tok, self._by_token)
+                    name_mask &= self._token_mask(tok, self._by_name_token)
+
+        max_price = _to_int(filters.get("max_price") or filters.get("to") or filters.get("max"))
+        min_price = _to_int(filters.get("min_price") or filters.get("from") or filters.get("min"))
+        if mask and (max_price is not None or min_price is not None):
+            mask = self._price_mask(mask, min_price, max_price)
+
+        total = _popcount(mask)
+        positions = list(_positions(mask & name_mask, limit)) if name_mask else []
+        if limit is None or len(positions) < limit:
+            rest = None if limit is None else limit - len(positions)
+            positions.extend(_positions(mask & ~name_mask, rest))
+        return total, [self.products[pos] for pos in positions]
+
+
+def _mask(positions: Iterable[int], size: int) -> int:
+    """Build a bitset from positions in O(len(positions) + size / 8)."""
+    buf = bytearray((size + 7) // 8)
+    for pos in positions:
+        buf[pos >> 3] |= 1 << (pos & 7)
+    return int.from_bytes(buf, "little")
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count("1")
+
+
+def _positions(mask: int, limit: Optional[int] = None):
+    """Yield set bit positions of `mask` in ascending order."""
+    if not mask or limit == 0:
+        return
+    data = mask.to_bytes((mask.bit_length() + 7) // 8, "little")
+    found = 0
+    for m in _NONZERO_BYTE.finditer(data):
+        base = m.start() * 8
+        for bit in _BYTE_BITS[data[m.start()]]:
+            yield base + bit
+            found += 1
+            if limit is not None and found >= limit:
+                return
@@ -0,0 +1,70 @@
+import pytest
+
+from cart import Cart
+
+TEE = {"id": "tee-001", "name": "Classic Cotton Tee", "price": 499}
+MUG = {"id": "mug-001", "name": "Stoneware Mug", "price": 299}
+
+
+def _recomputed(cart: Cart) -> int:
+    return sum(line.line_total for line in cart)
+
+
+def test_same_product_and_size_merges_into_one_line() -> None:
+    cart = Cart()
+    cart.add(TEE, 1, "m")
+    line = cart.add(TEE, 2, "M")
+    cart.add(TEE, 1, "L")
+
+    assert len(cart) == 2
+    assert line.quantity == 3 and line.size == "M"
+    assert cart.total == 4 * 499 == _recomputed(cart)
+
+
+def test_total_follows_add_update_and_remove() -> None:
+    cart = Cart()
+    cart.add(TEE, 2, "M")
+    cart.add(MUG, 1)
+    assert cart.total == 2 * 499 + 299
+
+    assert cart.update("tee-001", 5, "m").quantity == 5
+    assert cart.total == 5 * 499 + 299 == _recomputed(cart)
+
+    assert cart.update("mug-001", 0) is not None  # 0 removes the line
+    assert len(cart) == 1 and cart.total == 5 * 499
+
+    assert cart.remove("tee-001").size == "M"  # the product's only line
+    assert len(cart) == 0 and cart.total == 0
+
+
+def test_missing_or_ambiguous_lines_change_nothing() -> None:
+    cart = Cart()
+    cart.add(TEE, 1, "M")
+    cart.add(TEE, 1, "L")
+
+    assert cart.remove("mug-001") is None
+    assert cart.update("tee-001", 4) is None  # which size?
+    assert cart.remove("tee-001", "XL") is None
+    assert cart.total == 2 * 499 == _recomputed(cart)
+
+
+def test_invalid_quantities_are_rejected() -> None:
+    cart = Cart()
+    with pytest.raises(ValueError):
+        cart.add(MUG, 0)
+    cart.add(MUG, 1)
+    with pytest.raises(ValueError):
+        cart.update("mug-001", -1)
+    assert cart.total == 299
+
+
+def test_line_items_and_clear() -> None:
+    cart = Cart()
+    cart.add(TEE, 2, "s")
+    cart.add(MUG, 1)
+    assert cart.line_items() == [
+        {"product_id": "tee-001", "quantity": 2, "attrs": {"size": "S"}},
+        {"product_id": "mug-001", "quantity": 1, "attrs": {}},
+    ]
+    cart.clear()
+    assert len(cart) == 0 and cart.total == 0
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from order_journal import OrderJournal
+
+
+def _order(n: int) -> dict:
+    return {"id": f"ORD-{n:04d}", "items": [{"product_id": "mug-001", "quantity": n}], "total": 299 * n}
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return str(tmp_path / "orders.jsonl"), str(tmp_path / "orders.json")
+
+
+def test_last_and_get_by_id(paths) -> None:
+    journal = OrderJournal(*paths)
+    assert journal.last() is None and journal.get("ORD-0001") is None
+
+    for n in range(1, 301):  # several tail chunks' worth of lines
+        journal.append(_order(n))
+
+    assert journal.last()["id"] == "ORD-0300"
+    assert journal.get("ORD-0001")["total"] == 299
+    assert journal.get("ORD-0150")["items"][0]["quantity"] == 150
+    assert journal.get("ORD-9999") is None
+
+
+def test_orders_appended_by_another_process_are_found(paths) -> None:
+    mine, theirs = OrderJournal(*paths), OrderJournal(*paths)
+    mine.append(_order(1))
+    theirs.append(_order(2))
+    mine.append(_order(3))
+
+    assert mine.get("ORD-0002")["id"] == "ORD-0002"
+    assert theirs.get("ORD-0003")["id"] == "ORD-0003"
+    assert theirs.last()["id"] == "ORD-0003"
+
+
+def test_torn_trailing_line_is_skipped_and_fenced(paths) -> None:
+    journal = OrderJournal(*paths)
+    journal.append(_order(1))
+    with open(paths[0], "ab") as f:
+        f.write(b'{"id": "ORD-0002", "tot')  # writer crashed mid-line
+
+    assert journal.last()["id"] == "ORD-0001"
+    assert OrderJournal(*paths).get("ORD-0002") is None
+
+    journal.append(_order(3))
+    assert journal.last()["id"] == "ORD-0003"
+    assert OrderJournal(*paths).get("ORD-0003")["total"] == 897
+    with open(paths[0], "rb") as f:
+        assert f.read().splitlines()[-1] == json.dumps(_order(3), separators=(",", ":")).encode()
+
+
+def test_legacy_json_is_imported_once(paths) -> None:
+    journal_path, legacy_path = paths
+    with open(legacy_path, "w") as f:
+        json.dump([_order(1), _order(2)], f, indent=2)
+
+    journal = OrderJournal(journal_path, legacy_path)
+    assert journal.last()["id"] == "ORD-0002"
+    assert journal.get("ORD-0001")["total"] == 299
+
+    journal.append(_order(3))
+    with open(legacy_path, "w") as f:
+        json.dump([_order(9)], f)  # a journal that exists is never re-imported
+    reopened = OrderJournal(journal_path, legacy_path)
+    assert reopened.last()["id"] == "ORD-0003"
+    assert reopened.get("ORD-0009") is None
+
+
+def test_unreadable_legacy_file_starts_an_empty_journal(paths) -> None:
+    with open(paths[1], "w") as f:
+        f.write("[not json")
+    assert OrderJournal(*paths).last() is None
@@ -0,0 +1,90 @@
+import pytest
+
+from product_index import ProductIndex
+
+CATALOG = [
+    {"id": "tee-001", "name": "Classic Cotton Tee", "category": "tshirt", "color": "white", "price": 499, "sizes": ["S", "M", "L"]},
+    {"id": "tee-002", "name": "Graphic Tee", "category": "tshirt", "color": "black", "price": 699, "sizes": ["M", "L"]},
+    {"id": "hoodie-001", "name": "Zip Hoodie", "category": "hoodie", "color": "black", "price": 1499, "sizes": ["M", "L", "XL"]},
+    {"id": "mobile-001", "name": "Galaxy Phone", "category": "mobile", "color": "blue", "price": 19999},
+    {"id": "mobile-002", "name": "Pixel Phone", "category": "mobile", "color": "black", "price": 34999},
+    {"id": "mug-001", "name": "Stoneware Mug", "category": "mug", "price": 299},
+]
+
+
+@pytest.fixture
+def index():
+    return ProductIndex(CATALOG)
+
+
+def test_ordinal_indexes_last_listed_results(index) -> None:
+    listed = [index.get("hoodie-001"), index.get("tee-002"), index.get("mug-001")]
+    assert index.resolve("the second one", listed)["id"] == "tee-002"
+    assert index.resolve("the last one", listed)["id"] == "mug-001"
+    assert index.resolve("2", listed)["id"] == "tee-002"
+
+
+def test_ordinal_with_category_narrows_candidates(index) -> None:
+    listed = [index.get("tee-001"), index.get("mobile-001"), index.get("tee-002"), index.get("mobile-002")]
+    assert index.resolve("the second phone", listed)["id"] == "mobile-002"
+    assert index.resolve("the first tee", listed)["id"] == "tee-001"
+
+
+def test_ordinal_with_unlisted_category_counts_within_catalog_category(index) -> None:
+    listed = [index.get("tee-001"), index.get("tee-002")]
+    assert index.resolve("the second phone", listed)["id"] == "mobile-002"
+
+
+def test_ordinal_out_of_range_never_picks_another_category(index) -> None:
+    listed = [index.get("tee-001"), index.get("tee-002"), index.get("hoodie-001")]
+    assert index.resolve("the third phone", listed) is None
+    assert index.resolve("the fifth one", listed) is None
+
+
+def test_words_prefer_listed_results_then_catalog(index) -> None:
+    listed = [index.get("mobile-002"), index.get("hoodie-001")]
+    assert index.resolve("the black one", listed)["id"] == "mobile-002"
+    assert index.resolve("black hoodie", listed)["id"] == "hoodie-001"
+    assert index.resolve("the mug")["id"] == "mug-001"
+    assert index.resolve("MUG-001 please")["id"] == "mug-001"
+    assert index.resolve("something purple") is None
+
+
+def _ids(products) -> list:
+    return [p["id"] for p in products]
+
+
+def test_filter_folds_category_synonyms(index) -> None:
+    assert _ids(index.filter({"category": "phones"})[1]) == ["mobile-001", "mobile-002"]
+    assert _ids(index.filter({"category": "tees"})[1]) == ["tee-001", "tee-002"]
+    assert _ids(index.filter({"q": "mobile phone"})[1]) == ["mobile-001", "mobile-002"]
+
+
+def test_color_filter_keeps_uncoloured_products(index) -> None:
+    total, products = index.filter({"color": "Black"})
+    assert total == 4
+    assert _ids(products) == ["tee-002", "hoodie-001", "mobile-002", "mug-001"]
+
+
+def test_size_and_price_range_are_combined(index) -> None:
+    assert _ids(index.filter({"size": "m"})[1]) == ["tee-001", "tee-002", "hoodie-001"]
+    assert _ids(index.filter({"min_price": 500, "max_price": "1500"})[1]) == ["tee-002", "hoodie-001"]
+    assert _ids(index.filter({"size": "XL", "max_price": 1000})[1]) == []
+
+
+def test_query_matches_word_prefixes_and_ranks_name_hits_first() -> None:
+    index = ProductIndex(
+        [
+            {"id": "mug-001", "name": "Stoneware Mug", "category": "mug", "price": 299, "description": "Pairs with our hoodie"},
+            {"id": "hoodie-001", "name": "Zip Hoodie", "category": "hoodie", "price": 1499},
+        ]
+    )
+    total, products = index.filter({"q": "hood"})
+    assert total == 2
+    assert _ids(products) == ["hoodie-001", "mug-001"]
+
+
+def test_limit_caps_results_but_not_the_count(index) -> None:
+    total, products = index.filter({}, limit=2)
+    assert total == len(CATALOG)
+    assert _ids(products) == ["tee-001", "tee-002"]
@@ -27,8 +27,9 @@ from livekit.agents import (
     function_tool,
 )
 
-from livekit.plugins import murf, silero, google, deepgram, noise_cancellation
-from livekit.plugins.turn_detector.multilingual import MultilingualModel
+from livekit.plugins import murf, google, deepgram
+
+from model_registry import ModelRegistry
 
 logger = logging.getLogger("agent")
 load_dotenv(".env.local")
@@ -320,10 +321,10 @@ def test_order_saving():
 # 🔧 SYSTEM INITIALIZATION & PREWARMING
 # ======================================================
 def prewarm(proc: JobProcess):
-    """🔥 Preload VAD model for better performance"""
-    print("🔥 Prewarming VAD model...")
-    proc.userdata["vad"] = silero.VAD.load()
-    print("✅ VAD model loaded successfully!")
+    """🔥 Preload shared models once per worker process"""
+    print("🔥 Prewarming models...")
+    ModelRegistry.for_process(proc).prewarm()
+    print("✅ Models loaded successfully!")
 
 # ======================================================
 # 🎬 AGENT SESSION MANAGEMENT
@@ -350,6 +351,8 @@ async def entrypoint(ctx: JobContext):
     print(f"📝 Initial order state: {userdata.order.get_summary()}\n")
 
     # Create session with userdata
+    models = ModelRegistry.for_process(ctx.proc)
+
     session = AgentSession(
         stt=deepgram.STT(model="nova-3"),
         llm=google.LLM(model="gemini-2.5-flash"),
@@ -358,8 +361,8 @@ async def entrypoint(ctx: JobContext):
             style="Conversation",
             text_pacing=True,
         ),
-        turn_detection=MultilingualModel(),
-        vad=ctx.proc.userdata["vad"],
+        turn_detection=models.turn_detector(),
+        vad=models.vad(),
         userdata=userdata,  # Pass userdata to session
     )
 
@@ -373,7 +376,7 @@ async def entrypoint(ctx: JobContext):
         agent=BaristaAgent(),
         room=ctx.room,
         room_input_options=RoomInputOptions(
-            noise_cancellation=noise_cancellation.BVC()
+            noise_cancellation=models.noise_cancellation()
         ),
     )
 